@@ -1,42 +1,153 @@
 # backtesting/backtest.py
 
+import contextlib
+import inspect
+import os
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 import numpy as np
 from config import *
+from backtesting.execution import ENGINES
+from backtesting.metrics import batch_metrics
+from backtesting.profiling import Profiler, active_profiler, stage
+from backtesting.signals import compact_signals
+
+
+def _run_symbol(symbol, data, strategy, engine=None):
+    """Backtest one symbol and return its metrics; errors are reported, not raised."""
+    try:
+        backtest = Backtest(data, strategy, engine)
+        metrics = backtest.calculate_metrics(backtest.run())
+        metrics['error'] = None
+    except Exception as e:
+        metrics = {'error': f"{type(e).__name__}: {e}"}
+    return symbol, metrics
+
+
+def _builds_compact(strategy):
+    """Whether the strategy builds compact signals itself (takes compact and float_dtype)."""
+    try:
+        parameters = inspect.signature(strategy).parameters
+    except (TypeError, ValueError):
+        return False
+    return 'compact' in parameters and 'float_dtype' in parameters
 
 
 class Backtest:
-    def __init__(self, data, strategy):
+    def __init__(self, data, strategy, engine=None, profile=False, compact=False, float_dtype=None):
+        """
+        :param data: DataFrame of price data
+        :param strategy: Strategy function returning a signals DataFrame
+        :param engine: Optional execution engine ('vectorized', 'loop' or 'event') passed to
+                       executors that accept one; None keeps the strategy's default
+        :param profile: Time run() and calculate_metrics() stage by stage, either True or a
+                        Profiler shared with other code; see profile_report()
+        :param compact: Return memory-lean signals from run(): int8 orders and only the
+                        columns calculate_metrics needs (see backtesting.signals.compact_signals);
+                        metrics are unchanged. Executors that take compact build these columns
+                        directly; other strategies are compacted after they return
+        :param float_dtype: With compact, optional dtype such as 'float32' for prices
+        """
+        if engine is not None and engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Expected one of {ENGINES}")
         self.data = data
         self.strategy = strategy
+        self.engine = engine
+        self.compact = compact
+        self.float_dtype = float_dtype
         self.signals = None
+        if isinstance(profile, Profiler):
+            self.profiler = profile
+        else:
+            self.profiler = Profiler() if profile else None
+
+    def _profiling(self):
+        # An enclosing profile() block takes precedence over the backtest's own profiler
+        if self.profiler is None or active_profiler() is not None:
+            return contextlib.nullcontext()
+        return self.profiler.activate()
+
+    def profile_report(self):
+        """
+        Per-stage report of the profiled calls so far.
+
+        Stages are 'signals' (the strategy call) with nested 'indicators' and
+        'execution', and 'metrics'. The self time of 'signals' is signal generation.
+
+        :return: Dict as returned by backtesting.profiling.Profiler.report, None if profiling is off
+        """
+        return self.profiler.report() if self.profiler is not None else None
 
     def run(self):
-        self.signals = self.strategy(self.data)
+        kwargs = {} if self.engine is None else {'engine': self.engine}
+        builds_compact = self.compact and _builds_compact(self.strategy)
+        if builds_compact:
+            kwargs.update(compact=True, float_dtype=self.float_dtype)
+        with self._profiling(), stage('signals', rows=len(self.data)):
+            self.signals = self.strategy(self.data, **kwargs)
+        if self.compact and not builds_compact:
+            self.signals = compact_signals(self.signals, self.float_dtype)
         return self.signals
 
+    @classmethod
+    def iter_run_many(cls, symbol_frames, strategy, workers=None, engine=None):
+        """
+        Backtest many symbols over a process pool, yielding results as they finish.
+
+        :param symbol_frames: Mapping (or iterable of pairs) of symbol -> price DataFrame
+        :param strategy: Module-level strategy function, so it can be sent to workers
+        :param workers: Number of worker processes, defaults to the CPU count;
+                        1 runs everything in the calling process
+        :param engine: Optional execution engine forwarded to each Backtest
+        :return: Iterator of (symbol, metrics) in completion order; a failed symbol
+                 has its exception message under metrics['error']
+        """
+        items = symbol_frames.items() if isinstance(symbol_frames, Mapping) else symbol_frames
+        workers = workers or os.cpu_count() or 1
+
+        if workers == 1:
+            for symbol, data in items:
+                yield _run_symbol(symbol, data, strategy, engine)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_symbol, symbol, data, strategy, engine) for symbol, data in items]
+            for future in as_completed(futures):
+                yield future.result()
+
+    @classmethod
+    def run_many(cls, symbol_frames, strategy, workers=None, engine=None):
+        """
+        Backtest many symbols in parallel and collect their metrics into one table.
+
+        :return: DataFrame indexed by symbol with one column per metric plus 'error'
+        """
+        pairs = list(symbol_frames.items() if isinstance(symbol_frames, Mapping) else symbol_frames)
+        rows = dict(cls.iter_run_many(pairs, strategy, workers, engine))
+        table = pd.DataFrame.from_dict(rows, orient='index')
+        if 'error' not in table.columns:
+            table['error'] = None
+        table = table.reindex([symbol for symbol, _ in pairs])
+        table.index.name = 'symbol'
+        return table
+
     def calculate_metrics(self, signals):
-        initial_investment = INITIAL_CAPITAL
-        final_value = signals['cumulative_strategy_returns'].iloc[-1]
-        total_return = (final_value / initial_investment - 1) * 100
-
-        num_trades = len(signals[signals['positions'] != 0])
-        
-        # Calculate Sharpe Ratio
-        returns = signals['cumulative_strategy_returns'].pct_change().dropna()
-        sharpe_ratio = np.sqrt(252) * returns.mean() / returns.std()
-        
-        # Calculate Maximum Drawdown
-        cumulative_returns = signals['cumulative_strategy_returns']
-        running_max = np.maximum.accumulate(cumulative_returns)
-        drawdown = (cumulative_returns - running_max) / running_max
-        max_drawdown = drawdown.min() * 100
-        
-        return {
-            "initial_investment": initial_investment,
-            "final_value": final_value,
-            "total_return": total_return,
-            "num_trades": num_trades,
-            "sharpe_ratio": sharpe_ratio,
-            "max_drawdown": max_drawdown
-        }
\ No newline at end of file
+        """
+        Metrics of one signals DataFrame, computed by backtesting.metrics.batch_metrics.
+
+        :return: Dict with the batch_metrics columns
+        """
+        with self._profiling(), stage('metrics', rows=len(signals)):
+            equity = signals['cumulative_strategy_returns'].to_numpy(dtype=float)
+            positions = signals['positions'].to_numpy(dtype=float, na_value=np.nan)
+            metrics = batch_metrics(equity[None], positions[None], INITIAL_CAPITAL).iloc[0].to_dict()
+
+            if 'trades' in signals.attrs:
+                # Closed round trips from the event engine's trade ledger
+                metrics['num_trades'] = len(signals.attrs['trades'])
+            else:
+                metrics['num_trades'] = int(metrics['num_trades'])
+            metrics['max_drawdown_duration'] = int(metrics['max_drawdown_duration'])
+            return metrics
@@ -0,0 +1,446 @@
+# backtesting/events.py
+
+import math
+from collections import namedtuple
+
+import numpy as np
+from config import INITIAL_CAPITAL
+from backtesting.execution import _last_event
+
+# Order types
+MARKET = 0
+LIMIT = 1
+STOP = 2
+
+# Order sides
+BUY = 1
+SELL = -1
+
+# Order statuses
+PENDING = 0
+FILLED = 1
+CANCELLED = 2
+REJECTED = 3
+
+FILL_MODES = ('next_open', 'close')
+
+ORDER_DTYPE = np.dtype([
+    ('id', np.int64),
+    ('bar', np.int64),          # Bar the order was submitted on
+    ('side', np.int8),          # BUY or SELL
+    ('type', np.int8),          # MARKET, LIMIT or STOP
+    ('quantity', np.float64),   # NaN sizes the order when it fills: all-in buy or close the position
+    ('price', np.float64),      # Limit or stop price, NaN for market orders
+    ('status', np.int8),
+])
+
+FILL_DTYPE = np.dtype([
+    ('order_id', np.int64),
+    ('bar', np.int64),
+    ('side', np.int8),
+    ('quantity', np.float64),
+    ('price', np.float64),
+    ('commission', np.float64),
+])
+
+TRADE_DTYPE = np.dtype([
+    ('entry_bar', np.int64),
+    ('exit_bar', np.int64),
+    ('side', np.int8),            # BUY for a long trade, SELL for a short trade
+    ('quantity', np.float64),     # Total quantity opened over the trade
+    ('entry_price', np.float64),  # Average entry price
+    ('exit_price', np.float64),   # Average exit price
+    ('pnl', np.float64),          # Net of commissions
+    ('return_pct', np.float64),   # pnl relative to the entry value, in percent
+])
+
+EventResult = namedtuple('EventResult', ['cash', 'position', 'equity', 'orders', 'fills', 'trades'])
+EventResult.__doc__ = """
+Outcome of an event-driven run.
+
+:param cash: Cash held at the end of each bar
+:param position: Signed quantity held at the end of each bar
+:param equity: Mark-to-market portfolio value at the end of each bar
+:param orders: Structured array of every submitted order (ORDER_DTYPE), indexed by order id
+:param fills: Structured array of fills (FILL_DTYPE) in execution order
+:param trades: Structured array of closed round-trip trades (TRADE_DTYPE)
+"""
+
+
+class RecordBuffer:
+    """
+    Append-only store of fixed-dtype records.
+
+    Records are staged as tuples and packed into structured array blocks every
+    block_size appends, so memory stays at the packed size and appends stay cheap.
+    """
+
+    __slots__ = ('dtype', 'block_size', 'blocks', 'staged', 'size')
+
+    def __init__(self, dtype, block_size=65536):
+        self.dtype = dtype
+        self.block_size = block_size
+        self.blocks = []
+        self.staged = []
+        self.size = 0
+
+    def append(self, record):
+        self.staged.append(record)
+        self.size += 1
+        if len(self.staged) == self.block_size:
+            self._pack()
+
+    def _pack(self):
+        if self.staged:
+            self.blocks.append(np.fromiter(self.staged, dtype=self.dtype, count=len(self.staged)))
+            self.staged = []
+
+    def array(self):
+        self._pack()
+        if len(self.blocks) > 1:
+            self.blocks = [np.concatenate(self.blocks)]
+        return self.blocks[0] if self.blocks else np.empty(0, dtype=self.dtype)
+
+
+class Order:
+    """A working order waiting for its fill condition."""
+
+    __slots__ = ('id', 'bar', 'side', 'type', 'quantity', 'price')
+
+    def __init__(self, id, bar, side, type, quantity, price):
+        self.id = id
+        self.bar = bar
+        self.side = side
+        self.type = type
+        self.quantity = quantity
+        self.price = price
+
+
+class _OpenTrade:
+    """Running totals of the round trip currently held."""
+
+    __slots__ = ('entry_bar', 'side', 'entry_quantity', 'entry_value', 'exit_quantity', 'exit_value',
+                 'commission')
+
+    def __init__(self, entry_bar, side):
+        self.entry_bar = entry_bar
+        self.side = side
+        self.entry_quantity = 0.0
+        self.entry_value = 0.0
+        self.exit_quantity = 0.0
+        self.exit_value = 0.0
+        self.commission = 0.0
+
+
+class EventEngine:
+    """
+    Event-driven backtester with market, limit and stop orders.
+
+    Orders come from a structured array (see orders_from_positions), from an
+    on_bar callback calling submit(), or both. Orders, fills and trades are kept
+    in structured NumPy arrays; the per-bar cash, position and equity curves are
+    rebuilt from the bars that filled with array scans.
+
+    With fill_on='next_open' an order is first eligible on the bar after it was
+    submitted: market orders fill at the open, limit and stop orders when the
+    bar's range reaches their price. With fill_on='close' orders are matched
+    against closing prices only, starting on the bar they were submitted.
+    """
+
+    def __init__(self, initial_capital: float = INITIAL_CAPITAL, commission: float = 0.0,
+                 fill_on: str = 'next_open', allow_short: bool = False):
+        """
+        :param initial_capital: Starting cash
+        :param commission: Commission as a fraction of each fill's notional value
+        :param fill_on: 'next_open' or 'close'
+        :param allow_short: Let sell orders take the position below zero
+        """
+        if fill_on not in FILL_MODES:
+            raise ValueError(f"Unknown fill_on '{fill_on}'. Expected one of {FILL_MODES}")
+        self.initial_capital = initial_capital
+        self.commission = commission
+        self.fill_on = fill_on
+        self.allow_short = allow_short
+        self._reset()
+
+    def _reset(self):
+        self.cash = float(self.initial_capital)
+        self.position = 0.0
+        self.bar = 0
+        self._pending = []
+        self._orders = RecordBuffer(ORDER_DTYPE)
+        self._status = bytearray()  # Order statuses by id, written into the order records at the end
+        self._fills = RecordBuffer(FILL_DTYPE)
+        self._trades = RecordBuffer(TRADE_DTYPE)
+        self._state_bars = []
+        self._state_cash = []
+        self._state_position = []
+        self._open_trade = None
+
+    def submit(self, side, quantity=math.nan, order_type=MARKET, price=math.nan):
+        """
+        Submit an order on the current bar; meant to be called from an on_bar callback.
+
+        :param side: BUY or SELL
+        :param quantity: Quantity to trade; NaN buys with all available cash or closes the position
+        :param order_type: MARKET, LIMIT or STOP
+        :param price: Limit or stop price
+        :return: Order id
+        """
+        if side not in (BUY, SELL):
+            raise ValueError(f"Unknown side {side}. Expected BUY (1) or SELL (-1)")
+        if order_type not in (MARKET, LIMIT, STOP):
+            raise ValueError(f"Unknown order type {order_type}. Expected MARKET, LIMIT or STOP")
+        if order_type != MARKET and math.isnan(price):
+            raise ValueError("Limit and stop orders need a price")
+        return self._submit(side, quantity, order_type, price)
+
+    def _submit(self, side, quantity, order_type, price):
+        order_id = self._orders.size
+        self._orders.append((order_id, self.bar, side, order_type, quantity, price, PENDING))
+        self._status.append(PENDING)
+        self._pending.append(Order(order_id, self.bar, side, order_type, quantity, price))
+        return order_id
+
+    def cancel(self, order_id):
+        """Cancel a working order; returns False if it is no longer pending."""
+        for i, order in enumerate(self._pending):
+            if order.id == order_id:
+                del self._pending[i]
+                self._status[order_id] = CANCELLED
+                return True
+        return False
+
+    def _fill_price(self, order, open_, high, low):
+        if order.type == MARKET:
+            return open_
+        if order.type == LIMIT:
+            if order.side == BUY:
+                return min(open_, order.price) if low <= order.price else None
+            return max(open_, order.price) if high >= order.price else None
+        # Stop orders trigger once the price trades through the stop
+        if order.side == BUY:
+            return max(open_, order.price) if high >= order.price else None
+        return min(open_, order.price) if low <= order.price else None
+
+    def _size(self, order, price):
+        if order.side == BUY:
+            if self.position < 0:
+                # Buys against a short are not limited by cash
+                return -self.position if math.isnan(order.quantity) else order.quantity
+            affordable = self.cash // (price * (1 + self.commission))
+            return affordable if math.isnan(order.quantity) else min(order.quantity, affordable)
+
+        if math.isnan(order.quantity):
+            return max(self.position, 0.0)
+        if self.allow_short:
+            return order.quantity
+        return min(order.quantity, max(self.position, 0.0))
+
+    def _match(self, t, open_, high, low):
+        still_pending = []
+        # Orders from this bar wait for the next one unless filling at the close
+        last_eligible_bar = t - 1 if self.fill_on == 'next_open' else t
+        for order in self._pending:
+            if order.bar > last_eligible_bar:
+                still_pending.append(order)
+                continue
+
+            price = self._fill_price(order, open_, high, low)
+            if price is None:
+                still_pending.append(order)
+                continue
+
+            quantity = self._size(order, price)
+            if quantity > 0:
+                self._fill(order, t, quantity, price)
+                self._status[order.id] = FILLED
+            else:
+                self._status[order.id] = REJECTED
+        self._pending = still_pending
+
+    def _fill(self, order, t, quantity, price):
+        commission = quantity * price * self.commission
+        self._fills.append((order.id, t, order.side, quantity, price, commission))
+        self.cash -= order.side * quantity * price + commission
+
+        # Update the ledger of the round trip in progress
+        remaining = quantity
+        if self.position != 0 and order.side != (1 if self.position > 0 else -1):
+            closing = min(quantity, abs(self.position))
+            trade = self._open_trade
+            trade.exit_quantity += closing
+            trade.exit_value += closing * price
+            trade.commission += commission * closing / quantity
+            remaining -= closing
+            self.position += order.side * closing
+            if self.position == 0:
+                self._close_trade(t)
+        if remaining > 0:
+            if self._open_trade is None:
+                self._open_trade = _OpenTrade(t, order.side)
+            trade = self._open_trade
+            trade.entry_quantity += remaining
+            trade.entry_value += remaining * price
+            trade.commission += commission * remaining / quantity
+            self.position += order.side * remaining
+
+        if self._state_bars and self._state_bars[-1] == t:
+            self._state_cash[-1] = self.cash
+            self._state_position[-1] = self.position
+        else:
+            self._state_bars.append(t)
+            self._state_cash.append(self.cash)
+            self._state_position.append(self.position)
+
+    def _close_trade(self, t):
+        trade = self._open_trade
+        pnl = trade.side * (trade.exit_value - trade.entry_value) - trade.commission
+        self._trades.append((trade.entry_bar, t, trade.side, trade.entry_quantity,
+                             trade.entry_value / trade.entry_quantity, trade.exit_value / trade.exit_quantity,
+                             pnl, pnl / trade.entry_value * 100))
+        self._open_trade = None
+
+    def run(self, close, open_=None, high=None, low=None, orders=None, on_bar=None) -> EventResult:
+        """
+        Run the engine over a price history.
+
+        Bars with a NaN close do not fill any order.
+
+        :param close: Array of closing prices
+        :param open_: Optional array of opening prices, defaults to close
+        :param high: Optional array of highs, defaults to close
+        :param low: Optional array of lows, defaults to close
+        :param orders: Optional structured array with ORDER_DTYPE 'bar', 'side', 'type', 'quantity'
+                       and 'price' fields, submitted at their bar
+        :param on_bar: Optional callback on_bar(engine, bar) called once per bar after the
+                       array orders of that bar are submitted
+        :return: EventResult
+        """
+        self._reset()
+        close = np.asarray(close, dtype=float)
+        n = len(close)
+        prices = [close if values is None else np.asarray(values, dtype=float) for values in (open_, high, low)]
+        for values in prices:
+            if len(values) != n:
+                raise ValueError(f"Mismatch in lengths. close: {n}, other: {len(values)}")
+        open_, high, low = (values.tolist() for values in prices)
+        close_list = close.tolist()
+
+        if orders is None:
+            orders = np.empty(0, dtype=ORDER_DTYPE)
+        _validate_orders(orders)
+        orders = orders[np.argsort(orders['bar'], kind='stable')]
+        order_bars = orders['bar'].tolist()
+        order_rows = orders[['side', 'type', 'quantity', 'price']].tolist()
+        next_order = 0
+
+        t = 0
+        while t < n:
+            if on_bar is None and not self._pending:
+                # Nothing can happen before the next array order
+                if next_order == len(order_bars):
+                    break
+                t = max(t, order_bars[next_order])
+                if t >= n:
+                    break
+            self.bar = t
+            valid = not math.isnan(close_list[t])
+
+            if self.fill_on == 'next_open' and self._pending and valid:
+                bar_open = close_list[t] if math.isnan(open_[t]) else open_[t]
+                self._match(t, bar_open, high[t], low[t])
+
+            while next_order < len(order_bars) and order_bars[next_order] == t:
+                side, order_type, quantity, price = order_rows[next_order]
+                self._submit(side, quantity, order_type, price)
+                next_order += 1
+            if on_bar is not None:
+                on_bar(self, t)
+
+            if self.fill_on == 'close' and self._pending and valid:
+                price = close_list[t]
+                self._match(t, price, price, price)
+            t += 1
+
+        return self._result(close)
+
+    def _result(self, close):
+        n = len(close)
+        event_rows = np.array(self._state_bars, dtype=np.int64)
+        last = _last_event(n, event_rows)
+        has_state = last >= 0
+        safe = np.where(has_state, last, 0)
+        if len(event_rows):
+            cash = np.where(has_state, np.array(self._state_cash)[safe], self.initial_capital)
+            position = np.where(has_state, np.array(self._state_position)[safe], 0.0)
+        else:
+            cash = np.full(n, self.initial_capital, dtype=float)
+            position = np.zeros(n)
+
+        # Mark to the last known close
+        valid_rows = np.flatnonzero(~np.isnan(close))
+        last_valid = _last_event(n, valid_rows)
+        mark = close[valid_rows][np.maximum(last_valid, 0)] if len(valid_rows) else np.zeros(n)
+        equity = np.where(position != 0, cash + position * mark, cash)
+
+        orders = self._orders.array()
+        orders['status'] = np.frombuffer(bytes(self._status), dtype=np.int8)
+        return EventResult(cash, position, equity, orders, self._fills.array(), self._trades.array())
+
+
+def _validate_orders(orders):
+    if not np.isin(orders['side'], (BUY, SELL)).all():
+        raise ValueError("Order sides must be BUY (1) or SELL (-1)")
+    if not np.isin(orders['type'], (MARKET, LIMIT, STOP)).all():
+        raise ValueError("Order types must be MARKET, LIMIT or STOP")
+    if np.isnan(orders['price'][orders['type'] != MARKET]).any():
+        raise ValueError("Limit and stop orders need a price")
+
+
+def orders_from_positions(positions, price=None) -> np.ndarray:
+    """
+    Turn a 'positions' column into market orders: buy with all cash on +1, close the position on -1.
+
+    :param positions: Array of position changes
+    :param price: Optional array of prices; bars with a NaN price get no order
+    :return: Structured array with ORDER_DTYPE
+    """
+    positions = np.asarray(positions, dtype=float)
+    mask = (positions == 1) | (positions == -1)
+    if price is not None:
+        mask &= ~np.isnan(np.asarray(price, dtype=float))
+    bars = np.flatnonzero(mask)
+
+    orders = np.empty(len(bars), dtype=ORDER_DTYPE)
+    orders['id'] = np.arange(len(bars))
+    orders['bar'] = bars
+    orders['side'] = np.where(positions[bars] == 1, BUY, SELL)
+    orders['type'] = MARKET
+    orders['quantity'] = np.nan
+    orders['price'] = np.nan
+    orders['status'] = PENDING
+    return orders
+
+
+def trade_stats(trades) -> dict:
+    """
+    Summary statistics of a trade ledger.
+
+    :param trades: Structured array with TRADE_DTYPE
+    :return: Dict with the number of trades, win rate (%), average and total pnl,
+             average return (%), profit factor and average holding period in bars
+    """
+    pnl = trades['pnl']
+    wins = pnl[pnl > 0].sum()
+    losses = -pnl[pnl < 0].sum()
+    num_trades = len(trades)
+    return {
+        "num_trades": num_trades,
+        "win_rate": (pnl > 0).mean() * 100 if num_trades else np.nan,
+        "average_pnl": pnl.mean() if num_trades else np.nan,
+        "total_pnl": pnl.sum(),
+        "average_return": trades['return_pct'].mean() if num_trades else np.nan,
+        "profit_factor": wins / losses if losses > 0 else np.nan,
+        "average_holding_bars": (trades['exit_bar'] - trades['entry_bar']).mean() if num_trades else np.nan,
+    }
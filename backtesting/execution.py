@@ -0,0 +1,293 @@
+# backtesting/execution.py
+
+from collections import namedtuple
+
+import numpy as np
+from config import INITIAL_CAPITAL
+from backtesting.profiling import stage
+
+ENGINES = ('vectorized', 'loop', 'event')
+
+ExecutionResult = namedtuple('ExecutionResult', ['cash', 'shares', 'equity', 'trades', 'state'],
+                             defaults=(None, None))
+ExecutionResult.__doc__ = """
+Per-bar account state before that bar's trade is applied.
+
+:param cash: Cash held at each bar
+:param shares: Shares held at each bar
+:param equity: Mark-to-market portfolio value at each bar
+:param trades: Trade ledger (backtesting.events.TRADE_DTYPE) from the 'event' engine, otherwise None
+:param state: ExecutionState after the last bar from the 'vectorized' engine, otherwise None
+"""
+
+ExecutionState = namedtuple('ExecutionState', ['cash', 'shares', 'equity'])
+ExecutionState.__doc__ = """
+Account state carried from one stretch of bars to the next, see execute(state=...).
+
+:param cash: Cash after the last bar's trade
+:param shares: Shares held after the last bar's trade
+:param equity: Last mark-to-market portfolio value, carried over bars without a price
+"""
+
+
+def _last_event(n, event_rows, before=False):
+    """
+    Index of the most recent event at (or strictly before) every row, -1 if none.
+
+    This is the cumulative-state scan that replaces carrying state row by row.
+    """
+    last = np.full(n, -1, dtype=np.int64)
+    last[event_rows] = np.arange(len(event_rows))
+    if n:
+        np.maximum.accumulate(last, out=last)
+    if before and n:
+        last[1:] = last[:-1]
+        last[0] = -1
+    return last
+
+
+def _broadcast_state(n, event_rows, cash_after, shares_after, initial_capital, initial_shares=0.0):
+    """Spread the state recorded at event rows over every row, as seen before that row trades."""
+    if not len(event_rows):
+        return np.full(n, initial_capital, dtype=float), np.full(n, initial_shares, dtype=float)
+    last = _last_event(n, event_rows, before=True)
+    no_state = last < 0
+    last[no_state] = 0
+    cash = cash_after[last]
+    cash[no_state] = initial_capital
+    shares = shares_after[last]
+    shares[no_state] = initial_shares
+    return cash, shares
+
+
+def _end_state(cash_after, shares_after, cash, shares):
+    """Cash and shares after the last event row, or the starting state without events."""
+    if len(cash_after):
+        return cash_after[-1], shares_after[-1]
+    return cash, shares
+
+
+def _scan_positions(prices, positions, initial_capital, shares=0):
+    """Apply the all-in buy on +1 / flatten on -1 rule to the event rows only."""
+    capital = initial_capital
+    cash_after = []
+    shares_after = []
+
+    for price, position in zip(prices, positions):
+        if position == 1:  # Buy signal
+            shares_to_buy = capital // price
+            if shares_to_buy > 0:
+                shares += shares_to_buy
+                capital -= shares_to_buy * price
+
+        elif position == -1:  # Sell signal
+            if shares > 0:
+                capital += shares * price
+                shares = 0
+
+        cash_after.append(capital)
+        shares_after.append(shares)
+
+    return np.array(cash_after, dtype=float), np.array(shares_after, dtype=float)
+
+
+def _scan_signal_levels(prices, signals, initial_capital, shares=0):
+    """Apply the buy while +1 / sell while -1 rule to the event rows only."""
+    capital = initial_capital
+    cash_after = []
+    shares_after = []
+
+    for price, signal in zip(prices, signals):
+        if signal == 1.0 and capital >= price:  # Buy if sufficient capital
+            shares += capital // price
+            capital -= shares * price
+
+        elif signal == -1.0:
+            capital += shares * price
+            shares = 0
+
+        cash_after.append(capital)
+        shares_after.append(shares)
+
+    return np.array(cash_after, dtype=float), np.array(shares_after, dtype=float)
+
+
+def _vectorized_positions(price, positions, initial_capital, state=None):
+    start = state if state is not None else ExecutionState(initial_capital, 0, initial_capital)
+    n = len(price)
+    valid = ~np.isnan(price)
+    event_rows = np.flatnonzero(valid & ((positions == 1) | (positions == -1)))
+    cash_after, shares_after = _scan_positions(price[event_rows].tolist(),
+                                               positions[event_rows].tolist(),
+                                               start.cash, start.shares)
+    cash, shares = _broadcast_state(n, event_rows, cash_after, shares_after, start.cash, start.shares)
+    end_cash, end_shares = _end_state(cash_after, shares_after, start.cash, start.shares)
+
+    if valid.all():
+        equity = shares * price
+        equity += cash
+        return ExecutionResult(cash, shares, equity,
+                               state=ExecutionState(end_cash, end_shares, equity[-1] if n else start.equity))
+
+    # Bars without a price carry the last valued bar forward
+    valid_rows = np.flatnonzero(valid)
+    if not len(valid_rows):
+        return ExecutionResult(cash, shares, np.full(n, start.equity, dtype=float),
+                               state=ExecutionState(end_cash, end_shares, start.equity))
+
+    value = (cash + shares * price)[valid_rows]
+    last_valid = _last_event(n, valid_rows)
+    equity = np.where(last_valid >= 0, value[np.maximum(last_valid, 0)], start.equity)
+    return ExecutionResult(cash, shares, equity,
+                           state=ExecutionState(end_cash, end_shares, equity[-1] if n else start.equity))
+
+
+def _vectorized_signal_levels(price, signal, initial_capital, state=None):
+    start = state if state is not None else ExecutionState(initial_capital, 0, initial_capital)
+    n = len(price)
+    # Bars without a positive price (missing closes become 0 in rsi_strategy) cannot trade
+    tradable = price > 0
+    event_rows = np.flatnonzero(tradable & ((signal == 1.0) | (signal == -1.0)))
+    cash_after, shares_after = _scan_signal_levels(price[event_rows].tolist(),
+                                                   signal[event_rows].tolist(),
+                                                   start.cash, start.shares)
+    cash, shares = _broadcast_state(n, event_rows, cash_after, shares_after, start.cash, start.shares)
+    end_cash, end_shares = _end_state(cash_after, shares_after, start.cash, start.shares)
+    equity = shares * price
+    equity += cash
+    # Flat bars are worth their cash, even at a missing price
+    np.copyto(equity, cash, where=~(shares > 0))
+    return ExecutionResult(cash, shares, equity,
+                           state=ExecutionState(end_cash, end_shares, equity[-1] if n else start.equity))
+
+
+def _loop_positions(price, positions, initial_capital):
+    """Row-by-row reference for the positions rule."""
+    shares = 0
+    capital = initial_capital
+    total_value = initial_capital
+    cash, held, equity = [], [], []
+
+    for row_price, position in zip(price.tolist(), positions.tolist()):
+        cash.append(capital)
+        held.append(shares)
+        if np.isnan(row_price):  # Skip NaN prices
+            equity.append(total_value)
+            continue
+
+        total_value = capital + (shares * row_price)
+        equity.append(total_value)
+
+        if position == 1:
+            shares_to_buy = capital // row_price
+            if shares_to_buy > 0:
+                shares += shares_to_buy
+                capital -= shares_to_buy * row_price
+
+        elif position == -1:
+            if shares > 0:
+                capital += shares * row_price
+                shares = 0
+
+    return ExecutionResult(np.array(cash, dtype=float), np.array(held, dtype=float),
+                           np.array(equity, dtype=float))
+
+
+def _loop_signal_levels(price, signal, initial_capital):
+    """Row-by-row reference for the signal-level rule."""
+    shares = 0
+    capital = initial_capital
+    cash, held, equity = [], [], []
+
+    for row_price, row_signal in zip(price.tolist(), signal.tolist()):
+        cash.append(capital)
+        held.append(shares)
+        equity.append(capital + (shares * row_price) if shares > 0 else capital)
+        if not row_price > 0:  # Skip missing and zero prices
+            continue
+
+        if row_signal == 1.0 and capital >= row_price:
+            shares += capital // row_price
+            capital -= shares * row_price
+
+        elif row_signal == -1.0:
+            capital += shares * row_price
+            shares = 0
+
+    return ExecutionResult(np.array(cash, dtype=float), np.array(held, dtype=float),
+                           np.array(equity, dtype=float))
+
+
+def _event_positions(price, positions, initial_capital):
+    """Run the positions rule through the event-driven engine as market orders filled at the close."""
+    # Imported here because backtesting.events builds on this module
+    from backtesting.events import EventEngine, orders_from_positions
+
+    engine = EventEngine(initial_capital, fill_on='close')
+    run = engine.run(price, orders=orders_from_positions(positions, price))
+
+    # The event engine reports end-of-bar state; shift it to the state before each bar trades
+    cash = np.concatenate(([float(initial_capital)], run.cash[:-1]))
+    shares = np.concatenate(([0.0], run.position[:-1]))
+    valid_rows = np.flatnonzero(~np.isnan(price))
+    if not len(valid_rows):
+        return ExecutionResult(cash, shares, np.full(len(price), initial_capital, dtype=float), run.trades)
+
+    value = (cash + shares * price)[valid_rows]
+    last_valid = _last_event(len(price), valid_rows)
+    equity = np.where(last_valid >= 0, value[np.maximum(last_valid, 0)], initial_capital)
+    return ExecutionResult(cash, shares, equity, run.trades)
+
+
+_RULES = {
+    ('positions', 'vectorized'): _vectorized_positions,
+    ('positions', 'loop'): _loop_positions,
+    ('signal', 'vectorized'): _vectorized_signal_levels,
+    ('signal', 'loop'): _loop_signal_levels,
+    ('positions', 'event'): _event_positions,
+}
+
+
+def execute(price, orders, initial_capital: float = INITIAL_CAPITAL, rule: str = 'positions',
+            engine: str = 'vectorized', state: ExecutionState = None) -> ExecutionResult:
+    """
+    Simulate an all-in long-only account over a price array.
+
+    Only the bars that can trade are visited one at a time; the cash, shares and
+    equity curves are rebuilt for every bar with array scans.
+
+    :param price: Array of prices
+    :param orders: Array of orders, the 'positions' column for rule='positions'
+                   or the 'signal' column for rule='signal'
+    :param initial_capital: Starting cash
+    :param rule: 'positions' buys on +1 and flattens on -1 (Bollinger Bands);
+                 'signal' buys on every +1 bar it can afford and flattens on -1 (RSI);
+                 bars without a price (or, for 'signal', a positive price) do not trade
+    :param engine: 'vectorized', the row-by-row 'loop' reference or 'event', which also
+                   returns the trade ledger; 'event' supports rule='positions' only
+    :param state: ExecutionState to continue from (the state of the previous stretch's
+                  result), so a long history can be executed chunk by chunk with the same
+                  result as in one call; 'vectorized' engine only
+    :return: ExecutionResult with per-bar cash, shares and equity
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Expected one of {ENGINES}")
+    if rule not in ('positions', 'signal'):
+        raise ValueError(f"Unknown rule '{rule}'. Expected 'positions' or 'signal'")
+    if (rule, engine) not in _RULES:
+        raise ValueError(f"Engine '{engine}' does not support rule='{rule}'")
+    if state is not None and engine != 'vectorized':
+        raise ValueError(f"Engine '{engine}' cannot continue from a state; use engine='vectorized'")
+
+    price = np.asarray(price, dtype=float)
+    # Integer orders (compact signals) are compared as they are, without a float copy
+    orders = np.asarray(orders)
+    if orders.dtype.kind not in 'iuf':
+        orders = orders.astype(float)
+    if len(price) != len(orders):
+        raise ValueError(f"Mismatch in lengths. price: {len(price)}, orders: {len(orders)}")
+
+    with stage('execution', rows=len(price)):
+        if state is not None:
+            return _RULES[(rule, engine)](price, orders, initial_capital, state)
+        return _RULES[(rule, engine)](price, orders, initial_capital)
@@ -0,0 +1,101 @@
+# backtesting/metrics.py
+
+import numpy as np
+import pandas as pd
+from config import INITIAL_CAPITAL
+
+# Metrics that need the positions column; NaN when only equity is given
+POSITION_METRICS = ('num_trades', 'turnover', 'exposure')
+
+
+def _holdings(positions):
+    """Whether each run is in the market at each bar: the latest non-zero order was a buy."""
+    bars = np.arange(positions.shape[1])
+    orders = (positions != 0) & ~np.isnan(positions)
+    last_order = np.maximum.accumulate(np.where(orders, bars, -1), axis=1)
+    latest = np.take_along_axis(positions, np.maximum(last_order, 0), axis=1)
+    return (last_order >= 0) & (latest > 0)
+
+
+def batch_metrics(equity, positions=None, initial_capital: float = INITIAL_CAPITAL) -> pd.DataFrame:
+    """
+    Compute Backtest.calculate_metrics for many equity curves at once.
+
+    Every metric is computed for all runs in one vectorized pass over the
+    (runs x time) arrays:
+
+    - total_return, max_drawdown: percent; max_drawdown_duration: longest stretch
+      in bars spent below a previous peak
+    - sharpe_ratio, sortino_ratio: annualized (252 bars) mean bar return over its
+      standard deviation or over its downside deviation (root mean square of the
+      negative returns)
+    - calmar_ratio: annualized compound return over the absolute max drawdown
+    - hit_rate: share of bars with a non-zero return whose return was positive
+    - num_trades: non-zero orders; turnover: entries and exits per 252 bars;
+      exposure: share of bars in the market, where a run is in the market after
+      a positive order until a negative one (only with positions)
+
+    :param equity: 2-D array (runs x time) of portfolio values ('cumulative_strategy_returns')
+    :param positions: Optional 2-D array (runs x time) of the 'positions' column, used to count trades
+    :param initial_capital: Initial capital of every run
+    :return: DataFrame with one row per run and the calculate_metrics columns
+    """
+    equity = np.atleast_2d(np.asarray(equity, dtype=float))
+    runs, num_bars = equity.shape
+
+    final_value = equity[:, -1]
+    total_return = (final_value / initial_capital - 1) * 100
+
+    if positions is None:
+        num_trades = turnover = exposure = np.full(runs, np.nan)
+    else:
+        positions = np.atleast_2d(np.asarray(positions, dtype=float))
+        num_trades = (positions != 0).sum(axis=1)
+        held = _holdings(positions)
+        exposure = held.mean(axis=1)
+        changes = held[:, :1].sum(axis=1) + (held[:, 1:] != held[:, :-1]).sum(axis=1)
+        turnover = changes * 252 / num_bars
+
+    # Ratios on bar-to-bar returns, skipping undefined returns like pct_change().dropna()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = equity[:, 1:] / equity[:, :-1] - 1
+        valid = ~np.isnan(returns)
+        count = valid.sum(axis=1)
+        mean = np.nansum(returns, axis=1) / count
+        var = np.nansum((returns - mean[:, None]) ** 2, axis=1) / (count - 1)
+        sharpe_ratio = np.sqrt(252) * mean / np.sqrt(var)
+
+        downside = np.nansum(np.minimum(returns, 0.0) ** 2, axis=1) / count
+        sortino_ratio = np.sqrt(252) * mean / np.sqrt(downside)
+
+        moved = valid & (returns != 0)
+        hit_rate = (moved & (returns > 0)).sum(axis=1) / moved.sum(axis=1)
+
+        # Maximum Drawdown
+        running_max = np.maximum.accumulate(equity, axis=1)
+        drawdown = (equity - running_max) / running_max
+        max_drawdown = np.nanmin(drawdown, axis=1) * 100
+
+        annual_return = (final_value / initial_capital) ** (252 / max(num_bars - 1, 1)) - 1
+        calmar_ratio = annual_return / np.abs(max_drawdown / 100)
+
+    # Bars since the latest peak, so the longest underwater stretch is its maximum
+    bars = np.arange(num_bars)
+    at_peak = equity >= np.fmax.accumulate(equity, axis=1)
+    last_peak = np.maximum.accumulate(np.where(at_peak, bars, 0), axis=1)
+    max_drawdown_duration = (bars - last_peak).max(axis=1)
+
+    return pd.DataFrame({
+        "initial_investment": np.full(runs, initial_capital),
+        "final_value": final_value,
+        "total_return": total_return,
+        "num_trades": num_trades,
+        "sharpe_ratio": sharpe_ratio,
+        "max_drawdown": max_drawdown,
+        "sortino_ratio": sortino_ratio,
+        "calmar_ratio": calmar_ratio,
+        "max_drawdown_duration": max_drawdown_duration,
+        "hit_rate": hit_rate,
+        "turnover": turnover,
+        "exposure": exposure
+    })
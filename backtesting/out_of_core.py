@@ -0,0 +1,592 @@
+# backtesting/out_of_core.py
+
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from config import *
+from backtesting.execution import execute
+from backtesting.profiling import stage
+from backtesting.signals import CORE_COLUMNS, DISCRETE_COLUMNS, EQUITY_COLUMN
+from utils.indicators import rolling_extrema
+
+OUT_OF_CORE_STRATEGIES = ('moving_average_crossover', 'rsi', 'bollinger_bands', 'ichimoku_cloud')
+
+PriceArrays = namedtuple('PriceArrays', ['index', 'columns', 'tz'])
+PriceArrays.__doc__ = """
+Price history stored as memory-mapped arrays, see write_price_arrays.
+
+:param index: int64 array of nanosecond timestamps
+:param columns: Dict of column name -> float64 array
+:param tz: Time zone name of the timestamps, '' for naive ones
+"""
+
+_META_FILE = 'meta.json'
+
+
+def _column_file(directory, name):
+    return os.path.join(directory, f"{name}.f8")
+
+
+def write_price_arrays(chunks, directory):
+    """
+    Store a stream of OHLCV chunks as raw arrays that can be memory-mapped.
+
+    Chunks are appended one at a time, so histories larger than memory can be
+    written from utils.ingestion.iter_bars or utils.synthetic_data.iter_ohlcv_chunks.
+    Column names are capitalized ('close' -> 'Close').
+
+    :param chunks: Iterable of DataFrames indexed by time, with the same columns
+    :param directory: Directory for the arrays; existing arrays there are replaced
+    :return: PriceArrays opened with open_price_arrays
+    """
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    rows = 0
+    columns = None
+    tz = ''
+    try:
+        index_file = open(os.path.join(directory, 'index.i8'), 'wb')
+        files['index'] = index_file
+        for chunk in chunks:
+            if columns is None:
+                columns = [str(column).capitalize() for column in chunk.columns]
+                tz = str(chunk.index.tz) if chunk.index.tz is not None else ''
+                for name in columns:
+                    files[name] = open(_column_file(directory, name), 'wb')
+            index = chunk.index.tz_convert('UTC').tz_localize(None) if chunk.index.tz is not None else chunk.index
+            index_file.write(index.as_unit('ns').asi8.astype(np.int64).tobytes())
+            for name, column in zip(columns, chunk.columns):
+                files[name].write(chunk[column].to_numpy(dtype=np.float64).tobytes())
+            rows += len(chunk)
+    finally:
+        for file in files.values():
+            file.close()
+
+    with open(os.path.join(directory, _META_FILE), 'w') as meta:
+        json.dump({'columns': columns or [], 'rows': rows, 'tz': tz}, meta)
+    return open_price_arrays(directory)
+
+
+def open_price_arrays(directory):
+    """Memory-map arrays stored by write_price_arrays; nothing is read until sliced."""
+    with open(os.path.join(directory, _META_FILE)) as meta:
+        meta = json.load(meta)
+    rows = meta['rows']
+
+    def mapped(path, dtype):
+        return np.memmap(path, dtype=dtype, mode='r', shape=(rows,)) if rows else np.empty(0, dtype=dtype)
+
+    return PriceArrays(mapped(os.path.join(directory, 'index.i8'), np.int64),
+                       {name: mapped(_column_file(directory, name), np.float64) for name in meta['columns']},
+                       meta['tz'])
+
+
+def _price_arrays(prices):
+    if isinstance(prices, PriceArrays):
+        return prices
+    if isinstance(prices, (str, os.PathLike)):
+        return open_price_arrays(prices)
+    index = prices.index
+    tz = str(index.tz) if index.tz is not None else ''
+    if tz:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return PriceArrays(index.as_unit('ns').asi8,
+                       {str(column).capitalize(): prices[column].to_numpy(dtype=np.float64)
+                        for column in prices.columns},
+                       tz)
+
+
+def window_sums(values, window, offset=0):
+    """
+    Sum of the window of bars ending at every bar, computed from that window alone.
+
+    Bars are grouped into blocks of window bars aligned to absolute positions
+    (multiples of window from the start of the history). A window is a suffix of
+    one block plus a prefix of the next, each summed within its block, so a bar's
+    sum is bit for bit the same in whichever chunk it is computed, unlike the
+    running sums of pandas rolling().sum(). Time O(n) like running sums.
+
+    :param values: Array of values, NaN-free
+    :param window: Window length in bars
+    :param offset: Absolute position of values[0] in the history
+    :return: Array of sums; near the start of the history they cover the bars so far.
+             Bars whose window starts before the first whole block in values are NaN
+    """
+    n = len(values)
+    sums = np.full(n, np.nan)
+    lead = (-offset) % window  # Bars before the first block boundary
+    m = n - lead
+    if m <= 0:
+        return sums
+
+    num_blocks = -(-m // window)
+    blocks = np.zeros((num_blocks, window))
+    blocks.ravel()[:m] = values[lead:]
+    suffix = np.cumsum(blocks[:, ::-1], axis=1)[:, ::-1]
+    prefix = np.add.accumulate(blocks, axis=1, out=blocks)
+    # Bars closing a block cover exactly that block; the others add the previous block's tail
+    prefix[1:, :-1] += suffix[:-1, 1:]
+    del suffix
+    if offset + lead != 0:
+        prefix[0, :-1] = np.nan  # Their windows start before values
+    # At the start of the history the windows are cut short: the prefix alone
+    sums[lead:] = prefix.ravel()[:m]
+    return sums
+
+
+def window_mean(values, window, min_periods=None, offset=0):
+    """
+    Chunk-invariant rolling mean skipping NaNs, like Series.rolling(window, min_periods).mean().
+
+    :param min_periods: Non-NaN bars needed for a value, defaults to window
+    """
+    values = np.asarray(values, dtype=float)
+    min_periods = window if min_periods is None else min_periods
+    valid = ~np.isnan(values)
+    if valid.all():
+        mean = window_sums(values, window, offset)
+        # Without gaps a window holds every bar since the start of the history, up to window
+        count = np.minimum(np.arange(offset + 1, offset + len(values) + 1), window).astype(float)
+    else:
+        mean = window_sums(np.where(valid, values, 0.0), window, offset)
+        count = window_sums(valid.astype(float), window, offset)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean /= count
+    mean[~(count >= min_periods)] = np.nan
+    return mean
+
+
+def window_std(values, window, offset=0):
+    """
+    Chunk-invariant rolling sample standard deviation over full windows, like Series.rolling(window).std().
+
+    Blocks are aligned as in window_sums. Every window ending in a block holds
+    the block's first bar, so its deviations are summed from that bar's value:
+    the prefix of the block plus the tail of the previous block, both taken from
+    the same reference. The result depends on the window's values only. Time O(n).
+
+    :param offset: Absolute position of values[0] in the history
+    :return: Array of deviations; NaN for windows holding a NaN, cut short by the start
+             of the history or starting before the first whole block in values
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    std = np.full(n, np.nan)
+    lead = (-offset) % window
+    m = n - lead
+    if m <= 0:
+        return std
+
+    num_blocks = -(-m // window)
+    blocks = np.full((num_blocks, window), np.nan)
+    blocks.ravel()[:m] = values[lead:]
+    reference = blocks[:, :1].copy()
+    # Deviations of each block, and of the block before it, from the block's first bar
+    here = blocks - reference
+    before = np.full_like(blocks, np.nan)
+    np.subtract(blocks[:-1], reference[1:], out=before[1:])
+
+    sums = []
+    for power in (1, 2):
+        total = np.cumsum(here ** power, axis=1)
+        total[:, :-1] += np.cumsum((before ** power)[:, ::-1], axis=1)[:, ::-1][:, 1:]
+        sums.append(total)
+    first, second = sums
+    with np.errstate(invalid='ignore', divide='ignore'):
+        variance = (second - first * first / window) / (window - 1)
+    np.maximum(variance, 0, out=variance)
+    if offset + lead == 0:
+        variance[0, :-1] = np.nan  # Cut short by the start of the history
+    std[lead:] = np.sqrt(variance).ravel()[:m]
+    return std
+
+
+def _lagged(values, previous):
+    """values shifted one bar later, with the previous chunk's last value first."""
+    return np.concatenate(([previous], values[:-1]))
+
+
+def _fillna(values, value=0.0):
+    return np.where(np.isnan(values), value, values)
+
+
+def _ffill(values, previous):
+    filled = np.concatenate(([previous], values))
+    rows = np.where(~np.isnan(filled), np.arange(len(filled)), 0)
+    return filled[np.maximum.accumulate(rows)][1:]
+
+
+class _MovingAverageCrossover:
+    """Chunked execute_moving_average_crossover_strategy."""
+
+    inputs = ('Close',)
+    lookahead = 0
+
+    def __init__(self, initial_capital=INITIAL_CAPITAL, short_window=MOVING_AVERAGE_SHORT_WINDOW,
+                 long_window=MOVING_AVERAGE_LONG_WINDOW):
+        self.initial_capital = initial_capital
+        self.short_window = short_window
+        self.long_window = long_window
+        self.halo = 2 * max(short_window, long_window)
+
+    def initial_state(self):
+        return {'price': np.nan, 'signal': np.nan, 'positions': np.nan, 'cumulative_returns': 1.0}
+
+    def process(self, segment, offset, first, stop, state):
+        close = segment['Close']
+        short_mavg = window_mean(close, self.short_window, 1, offset)[first:stop]
+        long_mavg = window_mean(close, self.long_window, 1, offset)[first:stop]
+        price = close[first:stop]
+
+        signal = np.where(short_mavg > long_mavg, 1.0, np.where(short_mavg <= long_mavg, -1.0, 0.0))
+        positions = signal - _lagged(signal, state['signal'])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = price / _lagged(price, state['price']) - 1
+        strategy_returns = _fillna(_lagged(positions, state['positions']) * returns)
+        cumulative_returns = np.cumprod(np.concatenate(([state['cumulative_returns']], 1 + strategy_returns)))[1:]
+
+        columns = {
+            'price': price,
+            'short_mavg': short_mavg,
+            'long_mavg': long_mavg,
+            'signal': signal,
+            'positions': positions,
+            'returns': returns,
+            'strategy_returns': strategy_returns,
+            'cumulative_returns': cumulative_returns,
+            'cumulative_strategy_returns': self.initial_capital * cumulative_returns,
+        }
+        state = {'price': price[-1], 'signal': signal[-1], 'positions': positions[-1],
+                 'cumulative_returns': cumulative_returns[-1]}
+        return columns, state
+
+
+class _RSI:
+    """Chunked execute_rsi_strategy."""
+
+    inputs = ('Close',)
+    lookahead = 0
+
+    def __init__(self, initial_capital=INITIAL_CAPITAL, period=RSI_WINDOW, overbought=RSI_OVERBOUGHT,
+                 oversold=RSI_OVERSOLD):
+        self.initial_capital = initial_capital
+        self.period = period
+        self.overbought = overbought
+        self.oversold = oversold
+        self.halo = 2 * period + 1
+
+    def initial_state(self):
+        return {'price': np.nan, 'signal': np.nan, 'execution': None}
+
+    def process(self, segment, offset, first, stop, state):
+        close = segment['Close']
+        delta = np.diff(close)
+        # delta[i] is the change into bar i + 1; at the start of the history the first change is 0
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = -np.where(delta < 0, delta, 0.0)
+        if offset == 0:
+            gain, loss = np.concatenate(([0.0], gain)), np.concatenate(([-0.0], loss))
+            start = 0
+        else:
+            start = offset + 1
+        average_gain = window_mean(gain, self.period, offset=start)
+        average_loss = window_mean(loss, self.period, offset=start)
+        if offset != 0:
+            average_gain = np.concatenate(([np.nan], average_gain))
+            average_loss = np.concatenate(([np.nan], average_loss))
+        average_loss = np.where(average_loss == 0, np.nan, average_loss)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rsi = (100 - 100 / (1 + average_gain / average_loss))[first:stop]
+
+        signal = np.where(rsi < self.oversold, 1.0, 0.0)
+        signal = np.where(rsi > self.overbought, -1.0, signal)
+        positions = _fillna(signal - _lagged(signal, state['signal']))
+
+        raw_price = close[first:stop]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns = _fillna(raw_price / _lagged(raw_price, state['price']) - 1)
+        price = _fillna(raw_price)
+
+        result = execute(price, signal, self.initial_capital, rule='signal', state=state['execution'])
+        equity = result.equity
+        if offset + first == 0:
+            cumulative_strategy_returns = np.concatenate(([self.initial_capital], equity[1:]))
+        else:
+            cumulative_strategy_returns = equity
+
+        columns = {
+            'price': price,
+            'rsi': _fillna(rsi),
+            'signal': signal,
+            'positions': positions,
+            'returns': returns,
+            'cumulative_returns': equity,
+            'strategy_returns': (equity - self.initial_capital) / self.initial_capital,
+            'cumulative_strategy_returns': cumulative_strategy_returns,
+        }
+        state = {'price': raw_price[-1], 'signal': signal[-1], 'execution': result.state}
+        return columns, state
+
+
+class _BollingerBands:
+    """Chunked execute_bollinger_bands_strategy."""
+
+    inputs = ('Close',)
+    lookahead = 0
+
+    def __init__(self, initial_capital=INITIAL_CAPITAL, window=BOLLINGER_WINDOW, num_std=BOLLINGER_NUM_STD):
+        self.initial_capital = initial_capital
+        self.window = window
+        self.num_std = num_std
+        self.halo = 2 * window
+
+    def initial_state(self):
+        return {'price': np.nan, 'signal': np.nan, 'equity': float(self.initial_capital), 'execution': None}
+
+    def process(self, segment, offset, first, stop, state):
+        close = segment['Close']
+        middle = window_mean(close, self.window, offset=offset)[first:stop]
+        std = window_std(close, self.window, offset)[first:stop]
+        upper = middle + (std * self.num_std)
+        lower = middle - (std * self.num_std)
+        price = _ffill(close[first:stop], state['price'])
+
+        signal = np.where(price < lower, 1.0, 0.0)
+        signal = np.where(price > upper, -1.0, signal)
+        positions = _fillna(signal - _lagged(signal, state['signal']))
+
+        result = execute(price, positions, self.initial_capital, rule='positions', state=state['execution'])
+        # Portfolio value is reported one bar late, starting from the initial capital
+        cumulative_returns = _lagged(result.equity, state['equity'])
+
+        columns = {
+            'price': price,
+            'middle': middle,
+            'upper': upper,
+            'lower': lower,
+            'signal': signal,
+            'positions': positions,
+            'cumulative_returns': cumulative_returns,
+            'strategy_returns': (cumulative_returns - self.initial_capital) / self.initial_capital,
+            'cumulative_strategy_returns': cumulative_returns,
+        }
+        state = {'price': price[-1], 'signal': signal[-1], 'equity': result.equity[-1], 'execution': result.state}
+        return columns, state
+
+
+class _IchimokuCloud:
+    """Chunked ichimoku_cloud_strategy; rolling extremes are exact, so it equals the in-memory strategy."""
+
+    inputs = ('High', 'Low', 'Close')
+
+    def __init__(self, conversion_line_period=CONVERSION_LINE_PERIOD, base_line_period=BASE_LINE_PERIOD,
+                 leading_span_b_period=LEADING_SPAN_B_PERIOD, lagging_span_period=LAGGING_SPAN_PERIOD):
+        self.periods = [conversion_line_period, base_line_period, leading_span_b_period]
+        self.conversion_line_period = conversion_line_period
+        self.base_line_period = base_line_period
+        self.leading_span_b_period = leading_span_b_period
+        self.lagging_span_period = lagging_span_period
+        self.halo = base_line_period + max(self.periods)
+        self.lookahead = max(lagging_span_period, 0)
+
+    def initial_state(self):
+        return {'signal': np.nan}
+
+    def process(self, segment, offset, first, stop, state):
+        highs = rolling_extrema(segment['High'], self.periods, 'max')
+        lows = rolling_extrema(segment['Low'], self.periods, 'min')
+        close = segment['Close']
+        rows = np.arange(first, stop)
+
+        def shifted(values, lag):
+            source = rows - lag
+            inside = (source >= 0) & (source < len(values))
+            return np.where(inside, values[np.clip(source, 0, len(values) - 1)], np.nan)
+
+        conversion_line = (highs[self.conversion_line_period] + lows[self.conversion_line_period]) / 2
+        base_line = (highs[self.base_line_period] + lows[self.base_line_period]) / 2
+        span_b = (highs[self.leading_span_b_period] + lows[self.leading_span_b_period]) / 2
+        price = close[first:stop]
+        leading_span_a = shifted((conversion_line + base_line) / 2, self.base_line_period)
+        leading_span_b = shifted(span_b, self.base_line_period)
+        conversion_line = conversion_line[first:stop]
+        base_line = base_line[first:stop]
+
+        signal = np.zeros(len(rows))
+        signal = np.where((price > leading_span_a) & (price > leading_span_b) & (conversion_line > base_line),
+                          1.0, signal)
+        signal = np.where((price < leading_span_a) & (price < leading_span_b) & (conversion_line < base_line),
+                          -1.0, signal)
+        positions = _fillna(signal - _lagged(signal, state['signal']))
+
+        columns = {
+            'price': price,
+            'conversion_line': conversion_line,
+            'base_line': base_line,
+            'leading_span_a': leading_span_a,
+            'leading_span_b': leading_span_b,
+            'lagging_span': shifted(close, -self.lagging_span_period),
+            'signal': signal,
+            'positions': positions,
+        }
+        return columns, {'signal': signal[-1]}
+
+
+_STRATEGIES = {
+    'moving_average_crossover': _MovingAverageCrossover,
+    'rsi': _RSI,
+    'bollinger_bands': _BollingerBands,
+    'ichimoku_cloud': _IchimokuCloud,
+}
+
+
+class OutOfCoreResult:
+    """Signal columns of an out-of-core run, as arrays (memory-mapped .npy files with output_dir)."""
+
+    def __init__(self, index, columns, tz):
+        self.index = index
+        self.columns = columns
+        self.tz = tz
+
+    def __len__(self):
+        return len(self.index)
+
+    def to_frame(self, columns=None, start=None, stop=None):
+        """
+        Signals DataFrame of rows start:stop, like the in-memory strategy returns.
+
+        :param columns: Columns to load, all by default
+        :param start: First row position
+        :param stop: Row position after the last row
+        """
+        rows = slice(start, stop)
+        index = pd.DatetimeIndex(np.asarray(self.index[rows]).view('datetime64[ns]'))
+        if self.tz:
+            index = index.tz_localize('UTC').tz_convert(self.tz)
+        names = list(self.columns) if columns is None else columns
+        return pd.DataFrame({name: np.asarray(self.columns[name][rows]) for name in names}, index=index)
+
+
+def run_out_of_core(prices, strategy, chunk_size=OUT_OF_CORE_CHUNK_ROWS, output_dir=None, **params):
+    """
+    Run a strategy's indicators, signals and execution chunk by chunk.
+
+    Each chunk is read with a halo of the bars before it that its rolling windows
+    need (and, for the Ichimoku lagging span, the bars after it); the state that
+    runs through the whole history (last price, signal, position, compounded
+    return, cash and shares) is carried from chunk to chunk. Only one chunk is in
+    memory at a time, so peak memory does not grow with the history when the
+    prices are memory-mapped and output_dir is given.
+
+    Rolling means and standard deviations use window_mean and window_std, whose
+    values depend on their window only, so the results are bit for bit the same
+    for every chunk_size, including one chunk for the whole history. They agree
+    with the in-memory executors to rounding (pandas sums windows with running
+    sums); the Ichimoku signals equal ichimoku_cloud_strategy exactly.
+
+    Example:
+        arrays = write_price_arrays(iter_bars('minutes.csv', rule='1min'), 'prices/')
+        result = run_out_of_core(arrays, 'bollinger_bands', output_dir='signals/')
+        metrics = Backtest(None, None).calculate_metrics(
+            result.to_frame(['positions', 'cumulative_strategy_returns']))
+
+    :param prices: PriceArrays, a directory written by write_price_arrays or a DataFrame
+    :param strategy: One of OUT_OF_CORE_STRATEGIES
+    :param chunk_size: Bars per chunk
+    :param output_dir: Optional directory for the output columns as .npy files, which are
+                       memory-mapped instead of held in memory
+    :param params: Strategy parameters as for the in-memory executor, e.g. window=20
+    :return: OutOfCoreResult
+    """
+    if strategy not in _STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Expected one of {OUT_OF_CORE_STRATEGIES}")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    prices = _price_arrays(prices)
+    runner = _STRATEGIES[strategy](**params)
+    missing = [name for name in runner.inputs if name not in prices.columns]
+    if missing:
+        raise ValueError(f"Missing price columns {missing}")
+
+    n = len(prices.index)
+    outputs = None
+    for start, stop, columns in _iter_chunks(prices.columns, runner, n, chunk_size):
+        if outputs is None:
+            outputs = {name: _allocate(output_dir, name, n) for name in columns}
+        for name, values in columns.items():
+            outputs[name][start:stop] = values
+    if outputs is None:
+        outputs = {}
+    for values in outputs.values():
+        if isinstance(values, np.memmap):
+            values.flush()
+    return OutOfCoreResult(prices.index, outputs, prices.tz)
+
+
+def run_compact(data, strategy, columns=CORE_COLUMNS, float_dtype=None, chunk_size=None, **params):
+    """
+    Some columns of a strategy run over an in-memory DataFrame, built chunk by chunk into narrow arrays.
+
+    This is the compact path of the strategy executors. Chunks are run as by
+    run_out_of_core, so orders and equity equal the executor's (indicators agree
+    to rounding), but only the given columns are kept: orders as int8 and the
+    other columns, except the equity curve, as float_dtype. Peak memory is these
+    arrays plus one chunk of indicators.
+
+    :param data: DataFrame with the strategy's price columns
+    :param strategy: One of OUT_OF_CORE_STRATEGIES
+    :param columns: Columns to keep
+    :param float_dtype: Optional dtype such as 'float32' for prices
+    :param chunk_size: Bars per chunk, defaults to COMPACT_CHUNK_ROWS
+    :param params: Strategy parameters as for the in-memory executor
+    :return: Dict of column -> array; orders missing on some bars (the first diff) are a nullable Int8 array
+    """
+    runner = _STRATEGIES[strategy](**params)
+    prices = {name: data[name].to_numpy(dtype=np.float64) for name in runner.inputs}
+    n = len(data)
+
+    outputs = {}
+    for name in columns:
+        if name in DISCRETE_COLUMNS:
+            outputs[name] = np.zeros(n, dtype=np.int8)
+        else:
+            outputs[name] = np.empty(n, dtype=float_dtype if name != EQUITY_COLUMN and float_dtype else np.float64)
+    missing = {}
+    for start, stop, chunk in _iter_chunks(prices, runner, n, chunk_size or COMPACT_CHUNK_ROWS):
+        for name in columns:
+            values = chunk[name]
+            if name in DISCRETE_COLUMNS:
+                gaps = np.isnan(values)
+                if gaps.any():
+                    missing.setdefault(name, []).append(start + np.flatnonzero(gaps))
+                    values = np.where(gaps, 0.0, values)
+            outputs[name][start:stop] = values
+    for name, rows in missing.items():
+        mask = np.zeros(n, dtype=bool)
+        mask[np.concatenate(rows)] = True
+        outputs[name] = pd.arrays.IntegerArray(outputs[name], mask)
+    return outputs
+
+
+def _iter_chunks(columns, runner, n, chunk_size):
+    """Run a strategy chunk by chunk, yielding (start, stop, columns of bars start:stop)."""
+    state = runner.initial_state()
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        offset = max(start - runner.halo, 0)
+        end = min(stop + runner.lookahead, n)
+        with stage('out_of_core', rows=stop - start):
+            segment = {name: np.array(columns[name][offset:end], dtype=np.float64) for name in runner.inputs}
+            chunk, state = runner.process(segment, offset, start - offset, stop - offset, state)
+            yield start, stop, chunk
+
+
+def _allocate(output_dir, name, n):
+    if output_dir is None:
+        return np.empty(n)
+    os.makedirs(output_dir, exist_ok=True)
+    return np.lib.format.open_memmap(os.path.join(output_dir, f"{name}.npy"), mode='w+', dtype=np.float64,
+                                     shape=(n,))
@@ -0,0 +1,161 @@
+# backtesting/profiling.py
+
+import contextlib
+import json
+import time
+import tracemalloc
+from contextvars import ContextVar
+
+# The profiler collecting stages in the current context, None when profiling is off
+_active = ContextVar('profiler', default=None)
+_DISABLED = contextlib.nullcontext()
+
+
+class Profiler:
+    """
+    Collects the wall time, row counts and memory of named stages.
+
+    Stages nest: a stage entered inside another is reported under 'outer/inner',
+    and self_seconds is a stage's time minus the time of the stages inside it.
+    Calls of the same stage are aggregated.
+    """
+
+    def __init__(self, trace_memory=True):
+        """
+        :param trace_memory: Record net allocations and peak memory per stage with tracemalloc
+        """
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._stack = []
+        self._started_tracing = False
+        self._start = None
+        self._elapsed = 0.0
+        self._peak = 0
+        self._depth = 0
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Make this the profiler of the current context while the block runs."""
+        token = _active.set(self)
+        self._depth += 1
+        if self._depth == 1:
+            self._start = time.perf_counter()
+            if self.trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self._elapsed += time.perf_counter() - self._start
+                if self.trace_memory and tracemalloc.is_tracing():
+                    self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+                if self._started_tracing:
+                    tracemalloc.stop()
+                    self._started_tracing = False
+            _active.reset(token)
+
+    @contextlib.contextmanager
+    def stage(self, name, rows=None):
+        path = '/'.join([frame['path'] for frame in self._stack[-1:]] + [name])
+        frame = {'path': path, 'children': 0.0, 'peak': 0, 'rows': rows}
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Keep the parent's peak so far before resetting it for this stage
+                self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            self._peak = max(self._peak, peak)
+            tracemalloc.reset_peak()
+            frame['memory_start'] = current
+        record = self.stages.setdefault(path, {
+            'stage': path, 'calls': 0, 'seconds': 0.0, 'self_seconds': 0.0, 'rows': None,
+            'allocated_bytes': None, 'peak_bytes': None,
+        })
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self._stack.pop()
+            record['calls'] += 1
+            record['seconds'] += seconds
+            record['self_seconds'] += seconds - frame['children']
+            if frame['rows'] is not None:
+                record['rows'] = (record['rows'] or 0) + frame['rows']
+            if 'memory_start' in frame:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, frame['peak'])
+                record['allocated_bytes'] = (record['allocated_bytes'] or 0) + current - frame['memory_start']
+                record['peak_bytes'] = max(record['peak_bytes'] or 0, peak - frame['memory_start'])
+                self._peak = max(self._peak, peak)
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+            if self._stack:
+                self._stack[-1]['children'] += seconds
+
+    def report(self) -> dict:
+        """
+        Structured report of the stages recorded so far.
+
+        :return: Dict with 'total_seconds', 'peak_bytes' (None without memory tracing) and
+                 'stages', a list of per-stage dicts in order of first entry
+        """
+        elapsed = self._elapsed
+        if self._depth:
+            elapsed += time.perf_counter() - self._start
+        return {
+            'total_seconds': elapsed,
+            'peak_bytes': self._peak if self.trace_memory else None,
+            'stages': [dict(record) for record in self.stages.values()],
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.report(), **kwargs)
+
+
+def stage(name, rows=None):
+    """
+    Time a block as a named stage of the active profiler.
+
+    Returns a shared no-op context manager when profiling is off, so instrumented
+    code pays only for one context variable lookup.
+
+    :param name: Stage name, e.g. 'indicators' or 'execution'
+    :param rows: Optional number of rows the stage processes
+    """
+    profiler = _active.get()
+    if profiler is None:
+        return _DISABLED
+    return profiler.stage(name, rows)
+
+
+def add_rows(rows):
+    """Add to the row count of the innermost running stage, e.g. once a loaded frame's length is known."""
+    profiler = _active.get()
+    if profiler is not None and profiler._stack:
+        frame = profiler._stack[-1]
+        frame['rows'] = (frame['rows'] or 0) + rows
+
+
+def active_profiler():
+    """The profiler of the current context, or None."""
+    return _active.get()
+
+
+@contextlib.contextmanager
+def profile(trace_memory=True):
+    """
+    Profile every instrumented stage run inside the block.
+
+    Example:
+        with profile() as profiler:
+            data = fetch_data('AAPL', '2020-01-01', '2023-01-01')
+            backtest = Backtest(data, execute_rsi_strategy)
+            backtest.calculate_metrics(backtest.run())
+        print(profiler.to_json(indent=2))
+    """
+    profiler = Profiler(trace_memory)
+    with profiler.activate():
+        yield profiler
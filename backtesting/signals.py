@@ -0,0 +1,120 @@
+# backtesting/signals.py
+
+import numpy as np
+import pandas as pd
+
+# Columns holding small integer orders (-2..2)
+DISCRETE_COLUMNS = ('signal', 'positions')
+
+# Columns kept by compact_signals; calculate_metrics needs only these
+CORE_COLUMNS = ('price', 'signal', 'positions', 'cumulative_strategy_returns')
+
+# The equity curve stays float64 so metrics are unchanged
+EQUITY_COLUMN = 'cumulative_strategy_returns'
+
+
+def _discrete(column):
+    values = column.to_numpy(dtype=float)
+    finite = values[~np.isnan(values)]
+    if len(finite) and (np.any(finite != np.round(finite)) or finite.min() < -128 or finite.max() > 127):
+        return column
+    if len(finite) < len(values):
+        # Missing orders (the first diff) survive as <NA>, so they still count as trades
+        return column.astype('Int8')
+    return column.astype(np.int8)
+
+
+def compact_signals(signals, float_dtype=None, keep=None):
+    """
+    Memory-lean copy of a signals DataFrame.
+
+    Discrete columns become int8 (nullable Int8 if they hold NaN), intermediate
+    columns (indicators, returns) are dropped and, optionally, prices and
+    indicators are narrowed to float_dtype. The equity curve stays float64, so
+    Backtest.calculate_metrics returns the same values. attrs (e.g. the trade
+    ledger) are kept.
+
+    :param signals: DataFrame returned by a strategy executor
+    :param float_dtype: Optional dtype such as 'float32' for the other float columns
+    :param keep: Columns to keep besides CORE_COLUMNS, or 'all' to drop nothing
+    :return: New DataFrame
+    """
+    if keep == 'all':
+        columns = list(signals.columns)
+    else:
+        wanted = set(CORE_COLUMNS).union(keep or ())
+        columns = [column for column in signals.columns if column in wanted]
+
+    compact = {}
+    for column in columns:
+        values = signals[column]
+        if column in DISCRETE_COLUMNS:
+            values = _discrete(values)
+        elif float_dtype is not None and column != EQUITY_COLUMN and pd.api.types.is_float_dtype(values):
+            values = values.astype(float_dtype)
+        compact[column] = values
+
+    result = pd.DataFrame(compact, index=signals.index)
+    result.attrs = dict(signals.attrs)
+    return result
+
+
+def signal_orders(buy, sell):
+    """int8 signal: 1 on buy bars, -1 on sell bars (sell wins), 0 elsewhere."""
+    signal = np.zeros(len(buy), dtype=np.int8)
+    signal[np.asarray(buy)] = 1
+    signal[np.asarray(sell)] = -1
+    return signal
+
+
+def diff_orders(signal, first=np.nan):
+    """
+    Orders signal.diff() of an int8 signal, as int8.
+
+    :param first: The first order; NaN keeps it missing in a nullable Int8 array, like the diff
+    """
+    orders = np.zeros(len(signal), dtype=np.int8)
+    orders[1:] = np.diff(signal)
+    if not np.isnan(first):
+        orders[:1] = first
+        return orders
+    missing = np.zeros(len(orders), dtype=bool)
+    missing[:1] = True
+    return pd.arrays.IntegerArray(orders, missing)
+
+
+def order_equity(price, signal, initial_capital):
+    """
+    Equity of holding each bar's order, initial_capital x cumprod(1 + positions.shift(1) x returns).
+
+    The rule of the moving average crossover and MACD executors, where positions is
+    signal.diff(), computed in place in one float64 array with the same operations,
+    so the values are identical.
+
+    :param signal: int8 signal whose diff are the orders
+    """
+    price = np.asarray(price, dtype=float)
+    equity = np.zeros(len(price))
+    if len(price) > 2:
+        # The first order is missing, so the first two bars earn nothing
+        np.divide(price[2:], price[1:-1], out=equity[2:])
+        equity[2:] -= 1
+        equity[2:] *= np.diff(signal)[:-1]
+        equity[np.isnan(equity)] = 0
+    equity += 1
+    np.cumprod(equity, out=equity)
+    equity *= initial_capital
+    return equity
+
+
+def compact_frame(index, columns, float_dtype=None):
+    """
+    Signals DataFrame of the arrays a compact executor built, without copying them.
+
+    :param columns: Dict of column -> array; float columns other than the equity curve
+                    are narrowed to float_dtype if given
+    """
+    columns = {column: values.astype(float_dtype, copy=False)
+               if float_dtype is not None and column != EQUITY_COLUMN and pd.api.types.is_float_dtype(values)
+               else values for column, values in columns.items()}
+    return pd.DataFrame(columns, index=index, copy=False)
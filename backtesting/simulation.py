@@ -0,0 +1,176 @@
+# backtesting/simulation.py
+
+import numpy as np
+import pandas as pd
+from config import INITIAL_CAPITAL, SIMULATION_BLOCK_SIZE, SIMULATION_MAX_BYTES
+from backtesting.metrics import POSITION_METRICS, batch_metrics
+from backtesting.profiling import stage
+
+SIMULATION_METHODS = ('stationary', 'block', 'gbm')
+
+# Arrays of paths x bars alive at once while a chunk is simulated and measured
+_ARRAYS_PER_CHUNK = 8
+
+
+def _to_returns(returns):
+    returns = np.asarray(returns.to_numpy() if isinstance(returns, (pd.Series, pd.DataFrame)) else returns,
+                         dtype=float).ravel()
+    returns = returns[~np.isnan(returns)]
+    if len(returns) < 2:
+        raise ValueError("At least two non-NaN returns are needed to simulate")
+    return returns
+
+
+def stationary_bootstrap_indices(num_bars, num_paths, block_size, rng, restart_rng=None):
+    """
+    Indices of a stationary bootstrap (Politis and Romano).
+
+    Each path starts a new block at a uniformly drawn bar with probability
+    1 / block_size and otherwise continues with the next bar, wrapping around,
+    so block lengths are geometric with mean block_size.
+
+    :param rng: Generator drawing the block starts
+    :param restart_rng: Generator drawing the block restarts, defaults to rng
+    :return: Integer array (num_paths x num_bars)
+    """
+    restart_rng = rng if restart_rng is None else restart_rng
+    restart = restart_rng.random((num_paths, num_bars)) < 1.0 / block_size
+    restart[:, 0] = True
+    starts = (rng.random((num_paths, num_bars)) * num_bars).astype(np.int64)
+
+    bars = np.arange(num_bars)
+    # Bar of the latest restart at or before each bar
+    last_restart = np.maximum.accumulate(np.where(restart, bars, 0), axis=1)
+    indices = np.take_along_axis(starts, last_restart, axis=1)
+    indices += bars - last_restart
+    indices %= num_bars
+    return indices
+
+
+def block_bootstrap_indices(num_bars, num_paths, block_size, rng):
+    """
+    Indices of a circular block bootstrap with fixed blocks of block_size bars.
+
+    :return: Integer array (num_paths x num_bars)
+    """
+    num_blocks = -(-num_bars // block_size)
+    starts = (rng.random((num_paths, num_blocks)) * num_bars).astype(np.int64)
+    indices = (starts[:, :, None] + np.arange(block_size)).reshape(num_paths, -1)[:, :num_bars]
+    indices %= num_bars
+    return indices
+
+
+def gbm_returns(num_bars, num_paths, drift, volatility, rng):
+    """
+    Simple returns of geometric Brownian motion paths.
+
+    :param drift: Mean log return per bar
+    :param volatility: Standard deviation of the log return per bar
+    :return: Array (num_paths x num_bars)
+    """
+    returns = rng.standard_normal((num_paths, num_bars))
+    returns *= volatility
+    returns += drift
+    np.expm1(returns, out=returns)
+    return returns
+
+
+class _Sampler:
+    """Draws consecutive chunks of paths from independent streams, so the paths do not depend on the chunk size."""
+
+    def __init__(self, returns, method, block_size, seed):
+        if method not in SIMULATION_METHODS:
+            raise ValueError(f"Unknown method '{method}'. Expected one of {SIMULATION_METHODS}")
+        self.returns = returns
+        self.method = method
+        self.block_size = block_size
+        self.starts_rng, self.restart_rng = (np.random.default_rng(child)
+                                             for child in np.random.SeedSequence(seed).spawn(2))
+        log_returns = np.log1p(returns)
+        self.drift = log_returns.mean()
+        self.volatility = log_returns.std(ddof=1)
+
+    def sample(self, num_paths):
+        num_bars = len(self.returns)
+        if self.method == 'gbm':
+            return gbm_returns(num_bars, num_paths, self.drift, self.volatility, self.starts_rng)
+        if self.method == 'stationary':
+            indices = stationary_bootstrap_indices(num_bars, num_paths, self.block_size, self.starts_rng,
+                                                   self.restart_rng)
+        else:
+            indices = block_bootstrap_indices(num_bars, num_paths, self.block_size, self.starts_rng)
+        return self.returns[indices]
+
+
+def _chunk_paths(num_bars, max_bytes):
+    return max(1, int(max_bytes // (num_bars * 8 * _ARRAYS_PER_CHUNK)))
+
+
+def simulate_returns(returns, num_paths=1000, method='stationary', block_size=SIMULATION_BLOCK_SIZE, seed=None):
+    """
+    Resample a return series (bootstrap) or simulate returns of matching GBM paths.
+
+    :param returns: Series or array of per-bar strategy returns; NaNs are dropped
+    :param num_paths: Number of simulated paths
+    :param method: 'stationary' (random block lengths with mean block_size), 'block'
+                   (fixed blocks of block_size bars) or 'gbm' (log-normal returns with the
+                   drift and volatility of the series)
+    :param block_size: Mean or fixed block length in bars
+    :param seed: Seed of the random streams
+    :return: Array (num_paths x bars) of simulated returns
+    """
+    return _Sampler(_to_returns(returns), method, block_size, seed).sample(num_paths)
+
+
+def simulate_metrics(returns, num_paths=10000, method='stationary', block_size=SIMULATION_BLOCK_SIZE, seed=None,
+                     initial_capital=INITIAL_CAPITAL, max_bytes=SIMULATION_MAX_BYTES):
+    """
+    Distribution of the Backtest metrics over simulated paths of a strategy's returns.
+
+    Paths are simulated and measured in chunks sized so the arrays alive at once
+    stay within max_bytes; the paths drawn for a seed do not depend on max_bytes.
+
+    Example:
+        signals = backtest.run()
+        returns = signals['cumulative_strategy_returns'].pct_change()
+        summarize_simulation(simulate_metrics(returns, num_paths=10000, seed=42))
+
+    :param returns: Series or array of per-bar strategy returns; NaNs are dropped
+    :param num_paths: Number of simulated paths
+    :param method: One of SIMULATION_METHODS, see simulate_returns
+    :param block_size: Mean or fixed block length in bars
+    :param seed: Seed of the random streams
+    :param initial_capital: Starting value of every simulated equity curve
+    :param max_bytes: Memory budget for the arrays of one chunk
+    :return: DataFrame with one row of batch_metrics columns per path, without the position metrics
+    """
+    returns = _to_returns(returns)
+    sampler = _Sampler(returns, method, block_size, seed)
+    chunk = _chunk_paths(len(returns) + 1, max_bytes)
+
+    frames = []
+    for start in range(0, num_paths, chunk):
+        paths = min(chunk, num_paths - start)
+        with stage('simulation', rows=paths * len(returns)):
+            equity = np.empty((paths, len(returns) + 1))
+            equity[:, 0] = 1.0
+            np.cumprod(1 + sampler.sample(paths), axis=1, out=equity[:, 1:])
+            equity *= initial_capital
+            frames.append(batch_metrics(equity, initial_capital=initial_capital))
+    metrics = pd.concat(frames, ignore_index=True)
+    return metrics.drop(columns=list(POSITION_METRICS))
+
+
+def summarize_simulation(metrics, percentiles=(5, 25, 50, 75, 95)):
+    """
+    Summary statistics of simulated metrics.
+
+    :param metrics: DataFrame from simulate_metrics
+    :param percentiles: Percentiles to report
+    :return: DataFrame with one row per metric and mean, std and percentile columns
+    """
+    values = metrics.drop(columns=['initial_investment'], errors='ignore')
+    summary = pd.DataFrame({'mean': values.mean(), 'std': values.std()})
+    for q, column in zip(percentiles, np.nanpercentile(values.to_numpy(), percentiles, axis=0)):
+        summary[f'p{q:g}'] = column
+    return summary
@@ -0,0 +1,331 @@
+# backtesting/stops.py
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from config import ATR_WINDOW, STOP_MAX_BYTES
+from backtesting.profiling import stage
+
+STOP_ENGINES = ('vectorized', 'loop')
+
+# Arrays of bars x positions alive at once while a block of positions is checked
+_ARRAYS_PER_BLOCK = 10
+
+# Bars in the first window checked per block; later windows double
+_FIRST_WINDOW = 32
+
+StopResult = namedtuple('StopResult', ['exit_bars', 'exit_prices'])
+StopResult.__doc__ = """
+Where each position was stopped out.
+
+:param exit_bars: Integer array, the bar each position was stopped on, -1 if it was not
+:param exit_prices: Array of fill prices, NaN for positions that were not stopped
+"""
+
+StoppedOrders = namedtuple('StoppedOrders', ['orders', 'fill_price', 'stop_price'])
+StoppedOrders.__doc__ = """
+Orders of a strategy with its stop exits, see apply_stops.
+
+:param orders: The orders with a -1 on every stop exit bar
+:param fill_price: Prices to execute them at: the stop fills on stop exit bars, the price elsewhere
+:param stop_price: Stop fills on stop exit bars, NaN elsewhere
+"""
+
+
+def average_true_range(high, low, close, window=ATR_WINDOW):
+    """
+    Wilder's average true range along the first axis.
+
+    :param high: Array (bars,) or (bars x columns) of highs; low and close alike
+    :return: Array of the same shape, NaN over the first window - 1 bars
+    """
+    high, low, close = (np.asarray(values, dtype=float) for values in (high, low, close))
+    previous = np.concatenate((np.full((1,) + close.shape[1:], np.nan), close[:-1]))
+    ranges = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+    smoothed = pd.DataFrame(ranges.reshape(len(ranges), -1)).ewm(alpha=1.0 / window, adjust=False,
+                                                                  min_periods=window).mean()
+    return smoothed.to_numpy().reshape(ranges.shape)
+
+
+def ohlc_arrays(data):
+    """High, low and open arrays of an OHLC DataFrame, as simulate_stops keyword arguments."""
+    names = {'High': 'high', 'Low': 'low', 'Open': 'open_price'}
+    return {name: data[column].to_numpy(dtype=float) for column, name in names.items() if column in data.columns}
+
+
+def _columns(values, shape=None, name='price'):
+    values = np.asarray(values, dtype=float)
+    values = values.reshape(len(values), -1)
+    if shape is not None and values.shape != shape:
+        raise ValueError(f"{name} has shape {values.shape}, expected {shape} like price")
+    return values
+
+
+def _check_stops(stop_loss, trailing, atr_multiplier):
+    if stop_loss is None and trailing is None and atr_multiplier is None:
+        raise ValueError("Give at least one of stop_loss, trailing or atr_multiplier")
+    for name, value in (('stop_loss', stop_loss), ('trailing', trailing), ('atr_multiplier', atr_multiplier)):
+        if value is not None and not value >= 0:
+            raise ValueError(f"{name} must be non-negative, got {value}")
+
+
+def _levels(entry_prices, peak, previous_atr, stop_loss, trailing, atr_multiplier):
+    """Highest enabled stop level; NaN parts (ATR before its warm-up) are ignored."""
+    level = np.full(peak.shape, -np.inf)
+    if stop_loss is not None:
+        level = np.fmax(level, entry_prices * (1 - stop_loss))
+    if trailing is not None:
+        level = np.fmax(level, peak * (1 - trailing))
+    if atr_multiplier is not None:
+        level = np.fmax(level, peak - atr_multiplier * previous_atr)
+    return level
+
+
+def _check_window(arrays, columns, entries, ends, entry_prices, peak, first, last, stops):
+    """
+    Check bars [first, last) of some positions with bars x positions arrays.
+
+    :param peak: Highest high of each position before first, its entry price if it entered later
+    :return: (stopped, exit bars, fills, highest high before last)
+    """
+    price, high, low, open_price, atr = arrays
+    rows = np.arange(first, last)[:, None]
+    after_entry = rows > entries
+    held = after_entry & (rows <= ends)
+
+    # Highest high since entry up to the previous bar: the stop is set before each bar trades
+    highs = np.where(after_entry, high[first:last][:, columns], -np.inf)
+    running = np.fmax(np.fmax.accumulate(highs, axis=0), peak)
+    peaks = np.concatenate((peak[None, :], running[:-1]))
+    previous_atr = atr[first - 1:last - 1][:, columns] if atr is not None else None
+    level = _levels(entry_prices, peaks, previous_atr, *stops)
+
+    hit = held & (low[first:last][:, columns] <= level)
+    stopped = hit.any(axis=0)
+    offsets = hit.argmax(axis=0)
+    # A bar that opens below the stop fills at its open
+    fills = np.fmin(open_price[first + offsets, columns], level[offsets, np.arange(len(columns))])
+    return stopped, first + offsets, fills, running[-1]
+
+
+def _check_block(arrays, columns, entries, ends, entry_prices, stops):
+    """
+    Stop out one block of positions.
+
+    Bars are checked in windows that double in length, and positions leave the block
+    once stopped or past their end, so early stops do not pay for the whole span.
+    """
+    exit_bars = np.full(len(entries), -1, dtype=np.int64)
+    exit_prices = np.full(len(entries), np.nan)
+    peak = entry_prices.copy()
+    active = np.arange(len(entries))
+    first = int(entries.min()) + 1
+    last = int(ends.max()) + 1
+    window = _FIRST_WINDOW
+
+    while first < last and len(active):
+        stop = min(first + window, last)
+        stopped, bars, fills, peak[active] = _check_window(
+            arrays, columns[active], entries[active], ends[active], entry_prices[active], peak[active],
+            first, stop, stops)
+        exit_bars[active[stopped]] = bars[stopped]
+        exit_prices[active[stopped]] = fills[stopped]
+        active = active[~stopped & (ends[active] >= stop)]
+        first = stop
+        window *= 2
+
+    return exit_bars, exit_prices
+
+
+def _blocks(entries, ends, max_cells):
+    """Positions grouped by entry so each block spans at most max_cells bars x positions."""
+    order = np.argsort(entries, kind='stable')
+    start = 0
+    while start < len(order):
+        first = entries[order[start]]
+        last = ends[order[start]]
+        stop = start + 1
+        while stop < len(order):
+            widest = max(last, ends[order[stop]])
+            if (widest - first) * (stop - start + 1) > max_cells:
+                break
+            last = widest
+            stop += 1
+        yield order[start:stop]
+        start = stop
+
+
+def _stops_vectorized(arrays, columns, entries, ends, entry_prices, stops):
+    exit_bars = np.full(len(entries), -1, dtype=np.int64)
+    exit_prices = np.full(len(entries), np.nan)
+    checked = np.flatnonzero(ends > entries)
+    max_cells = max(1, STOP_MAX_BYTES // (8 * _ARRAYS_PER_BLOCK))
+    for block in _blocks(entries[checked], ends[checked], max_cells):
+        positions = checked[block]
+        exit_bars[positions], exit_prices[positions] = _check_block(
+            arrays, columns[positions], entries[positions], ends[positions], entry_prices[positions], stops)
+    return StopResult(exit_bars, exit_prices)
+
+
+def _stops_loop(arrays, columns, entries, ends, entry_prices, stops):
+    """Position-by-position, bar-by-bar reference."""
+    price, high, low, open_price, atr = arrays
+    stop_loss, trailing, atr_multiplier = stops
+    exit_bars = np.full(len(entries), -1, dtype=np.int64)
+    exit_prices = np.full(len(entries), np.nan)
+
+    for position, (column, entry, end, entry_price) in enumerate(zip(columns.tolist(), entries.tolist(),
+                                                                      ends.tolist(), entry_prices.tolist())):
+        peak = entry_price
+        for bar in range(entry + 1, end + 1):
+            level = -np.inf
+            if stop_loss is not None:
+                level = max(level, entry_price * (1 - stop_loss))
+            if trailing is not None:
+                level = max(level, peak * (1 - trailing))
+            if atr_multiplier is not None and not np.isnan(atr[bar - 1, column]):
+                level = max(level, peak - atr_multiplier * atr[bar - 1, column])
+
+            if low[bar, column] <= level:
+                bar_open = open_price[bar, column]
+                exit_bars[position] = bar
+                exit_prices[position] = level if np.isnan(bar_open) else min(bar_open, level)
+                break
+            if not np.isnan(high[bar, column]):
+                peak = max(peak, high[bar, column])
+
+    return StopResult(exit_bars, exit_prices)
+
+
+_ENGINES = {'vectorized': _stops_vectorized, 'loop': _stops_loop}
+
+
+def _prepare(price, high, low, open_price, atr, atr_multiplier):
+    price = _columns(price)
+    high, low, open_price = (price if values is None else _columns(values, price.shape, name)
+                             for values, name in ((high, 'high'), (low, 'low'), (open_price, 'open_price')))
+    if atr_multiplier is not None:
+        atr = average_true_range(high, low, price) if atr is None else _columns(atr, price.shape, 'atr')
+    else:
+        atr = None
+    return price, high, low, open_price, atr
+
+
+def simulate_stops(price, entries, ends=None, columns=None, entry_prices=None, high=None, low=None,
+                   open_price=None, stop_loss=None, trailing=None, atr_multiplier=None, atr=None,
+                   engine='vectorized'):
+    """
+    Exit bars and prices of long positions under fixed, trailing and ATR stops.
+
+    Position p follows column columns[p] of the price arrays from its entry at the
+    close of bar entries[p] and is checked on every later bar up to ends[p]. Its stop
+    before each bar is the highest of the enabled levels:
+
+    - stop_loss: entry price x (1 - stop_loss)
+    - trailing: highest high since entry x (1 - trailing)
+    - atr_multiplier: highest high since entry minus atr_multiplier ATRs of the previous bar
+
+    A bar whose low reaches the stop exits at the stop, or at its open if it opened
+    below. Missing highs, lows and opens default to the closes, so the stop then
+    triggers and fills on the close.
+
+    :param price: Closes, an array (bars,) shared by all positions or (bars x columns)
+    :param entries: Integer array of entry bars, one per position
+    :param ends: Last bar each position may be stopped on (e.g. its strategy exit); defaults to the last bar
+    :param columns: Column each position follows; defaults to 0 for a shared path and to
+                    one column per position for a 2-D price
+    :param entry_prices: Entry fills, defaults to the close of the entry bar
+    :param atr: ATR array shaped like price; computed with average_true_range if not given
+    :param engine: 'vectorized' checks blocks of positions as bars x positions arrays of at most
+                   STOP_MAX_BYTES, 'loop' is the position-by-position reference
+    :return: StopResult
+    """
+    if engine not in STOP_ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Expected one of {STOP_ENGINES}")
+    _check_stops(stop_loss, trailing, atr_multiplier)
+    arrays = _prepare(price, high, low, open_price, atr, atr_multiplier)
+    num_bars, num_columns = arrays[0].shape
+
+    entries = np.asarray(entries, dtype=np.int64).ravel()
+    if np.any((entries < 0) | (entries >= num_bars)):
+        raise ValueError(f"Entry bars must lie in [0, {num_bars})")
+    ends = np.full(len(entries), num_bars - 1) if ends is None else np.asarray(ends, dtype=np.int64).ravel()
+    ends = np.minimum(ends, num_bars - 1)
+    if columns is None:
+        if np.ndim(price) == 2 and num_columns != len(entries):
+            raise ValueError("Give columns when price has a column per symbol rather than per position")
+        columns = np.zeros(len(entries), dtype=np.int64) if num_columns == 1 else np.arange(len(entries))
+    columns = np.asarray(columns, dtype=np.int64).ravel()
+    if len(ends) != len(entries) or len(columns) != len(entries):
+        raise ValueError("entries, ends and columns must have one value per position")
+    entry_prices = (arrays[0][entries, columns] if entry_prices is None
+                    else np.asarray(entry_prices, dtype=float).ravel())
+    if not np.isfinite(entry_prices).all():
+        raise ValueError("Entry prices must be finite")
+
+    with stage('stops', rows=num_bars):
+        return _ENGINES[engine](arrays, columns, entries, ends, entry_prices, (stop_loss, trailing, atr_multiplier))
+
+
+def _next_rows(mask):
+    """First row at or after every row (and after the last one) where mask is set, len(mask) if none."""
+    num_bars = len(mask)
+    rows = np.where(mask, np.arange(num_bars)[:, None], num_bars)
+    rows = np.concatenate((rows, np.full((1, mask.shape[1]), num_bars)))
+    return np.minimum.accumulate(rows[::-1], axis=0)[::-1]
+
+
+def apply_stops(price, orders, high=None, low=None, open_price=None, stop_loss=None, trailing=None,
+                atr_multiplier=None, atr=None, engine='vectorized'):
+    """
+    Add stop exits to the orders of a long-only strategy, for backtesting.execution.execute.
+
+    Trades are followed in order: each opens at the first +1 order while flat and is
+    checked for stops up to its -1 order. A stopped trade gets a -1 on its stop bar,
+    filled at the stop price, and the next trade opens at the first +1 after that, so
+    after a stop a later buy order opens a new trade. Further +1 orders inside a trade
+    keep its entry. Works on one price path (bars,) or a universe (bars x symbols),
+    where the n-th trades of all symbols are checked in one pass.
+
+    :param orders: 'positions' or 'signal' orders as passed to execute, shaped like price
+    :return: StoppedOrders, shaped like price
+    """
+    _check_stops(stop_loss, trailing, atr_multiplier)
+    shape = np.shape(price)
+    arrays = _prepare(price, high, low, open_price, atr, atr_multiplier)
+    price = arrays[0]
+    orders = _columns(orders, price.shape, 'orders').copy()
+    num_bars, num_symbols = price.shape
+    stops = (stop_loss, trailing, atr_multiplier)
+    check = _ENGINES[engine] if engine in STOP_ENGINES else None
+    if check is None:
+        raise ValueError(f"Unknown engine '{engine}'. Expected one of {STOP_ENGINES}")
+
+    valid = ~np.isnan(price)
+    next_entry = _next_rows(valid & (orders == 1))
+    next_exit = _next_rows(valid & (orders == -1))
+    stop_price = np.full(price.shape, np.nan)
+    symbols = np.arange(num_symbols)
+    entries = next_entry[0].copy()
+
+    with stage('stops', rows=num_bars):
+        while True:
+            trading = entries < num_bars
+            if not trading.any():
+                break
+            columns = symbols[trading]
+            entry_bars = entries[trading]
+            exits = next_exit[entry_bars + 1, columns]
+            result = check(arrays, columns, entry_bars, np.minimum(exits, num_bars - 1),
+                           price[entry_bars, columns], stops)
+
+            stopped = result.exit_bars >= 0
+            stop_price[result.exit_bars[stopped], columns[stopped]] = result.exit_prices[stopped]
+            exits = np.where(stopped, result.exit_bars, exits)
+            entries[trading] = next_entry[np.minimum(exits + 1, num_bars), columns]
+
+    stopped = ~np.isnan(stop_price)
+    orders[stopped] = -1
+    fill_price = np.where(stopped, stop_price, price)
+    return StoppedOrders(orders.reshape(shape), fill_price.reshape(shape), stop_price.reshape(shape))
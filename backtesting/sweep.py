@@ -0,0 +1,319 @@
+# backtesting/sweep.py
+
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from config import INITIAL_CAPITAL
+from backtesting.execution import execute
+from backtesting.metrics import batch_metrics
+
+DEFAULT_CHUNK_SIZE = 512
+
+
+def _grid(**params):
+    """Cartesian product of the parameter lists as a DataFrame, one row per combination."""
+    names = list(params)
+    return pd.DataFrame(list(product(*(list(params[name]) for name in names))), columns=names)
+
+
+def _chunks(n, chunk_size):
+    for start in range(0, n, chunk_size):
+        yield slice(start, min(start + chunk_size, n))
+
+
+def _chunk_windows(*columns):
+    """
+    Distinct windows of a chunk of combinations, and each column's row in them.
+
+    Rolling arrays are built per chunk for these windows only, so memory is bounded
+    by the chunk size rather than by every distinct window of the grid.
+    """
+    windows, inverse = np.unique(np.concatenate(columns), return_inverse=True)
+    return windows, np.split(inverse, np.cumsum([len(column) for column in columns])[:-1])
+
+
+def _rolling_sums(x, windows, min_periods=None):
+    """
+    Rolling sums and observation counts of x for every window at once (windows x time).
+
+    Uses one prefix sum shared by all windows. Windows with fewer than
+    min_periods observations (default: the window length) are NaN.
+    """
+    valid = ~np.isnan(x)
+    prefix = np.concatenate(([0.0], np.cumsum(np.where(valid, x, 0.0))))
+    prefix_count = np.concatenate(([0], np.cumsum(valid)))
+
+    end = np.arange(1, len(x) + 1)
+    windows = np.asarray(windows, dtype=np.int64)[:, None]
+    start = np.maximum(end - windows, 0)
+
+    sums = prefix[end] - prefix[start]
+    counts = prefix_count[end] - prefix_count[start]
+    required = windows if min_periods is None else np.minimum(min_periods, windows)
+    sums = np.where(counts >= np.maximum(required, 1), sums, np.nan)
+    return sums, counts
+
+
+def _constant_windows(x, windows):
+    """True where every value in the window ending at each bar is identical (windows x time)."""
+    changes = np.concatenate(([0, 0], np.cumsum(x[1:] != x[:-1])))
+    end = np.arange(1, len(x) + 1)
+    start = np.maximum(end - np.asarray(windows, dtype=np.int64)[:, None], 0)
+    return changes[end] == changes[start + 1]
+
+
+def _rolling_means(x, windows, min_periods=None):
+    """Rolling means for several windows (windows x time), centred to limit prefix-sum round-off."""
+    offset = np.nanmean(x) if np.isfinite(x).any() else 0.0
+    sums, counts = _rolling_sums(x - offset, windows, min_periods)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts + offset
+    # Flat windows are exact, as they are in pandas
+    return np.where(_constant_windows(x, windows) & ~np.isnan(means), x, means)
+
+
+def _rolling_stds(x, windows):
+    """Rolling sample standard deviations for several windows (windows x time)."""
+    offset = np.nanmean(x) if np.isfinite(x).any() else 0.0
+    centred = x - offset
+    sums, counts = _rolling_sums(centred, windows)
+    squares, _ = _rolling_sums(centred ** 2, windows)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = (squares - sums ** 2 / counts) / (counts - 1)
+    stds = np.sqrt(np.clip(var, 0, None))
+    return np.where(_constant_windows(x, windows) & ~np.isnan(stds), 0.0, stds)
+
+
+def _rolling_rsis(gain, loss, periods):
+    """RSI for several periods (periods x time) from the per-bar gains and losses."""
+    gain_sums, counts = _rolling_sums(gain, periods)
+    loss_sums, _ = _rolling_sums(loss, periods)
+    # Count losing bars so a window without losses divides by exactly zero
+    losing_bars, _ = _rolling_sums((loss > 0).astype(float), periods)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        loss_means = np.where(losing_bars > 0, loss_sums / counts, np.nan)
+        rs = (gain_sums / counts) / loss_means
+        return 100 - (100 / (1 + rs))
+
+
+def _ewm(x, span):
+    """ewm(span=span, adjust=False).mean() along the last axis of x."""
+    # scipy.signal takes about a second to import, so only sweeps that need it pay for it
+    from scipy.signal import lfilter
+
+    alpha = 2.0 / (span + 1.0)
+    x = np.atleast_2d(x)
+    initial = (1 - alpha) * x[:, :1]
+    return lfilter([alpha], [1.0, alpha - 1.0], x, axis=-1, zi=initial)[0]
+
+
+def _price_returns(price):
+    returns = np.empty_like(price)
+    returns[0] = np.nan
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns[1:] = price[1:] / price[:-1] - 1
+    return returns
+
+
+def _diff(signal):
+    positions = np.empty_like(signal)
+    positions[:, 0] = np.nan
+    positions[:, 1:] = np.diff(signal, axis=1)
+    return positions
+
+
+def _shifted_equity(positions, returns, initial_capital):
+    """Equity of the positions.shift(1) * returns executors (moving average crossover, MACD)."""
+    strategy_returns = np.zeros_like(positions)
+    strategy_returns[:, 1:] = positions[:, :-1] * returns[1:]
+    strategy_returns = np.nan_to_num(strategy_returns, nan=0.0, posinf=np.inf, neginf=-np.inf)
+    return initial_capital * np.cumprod(1 + strategy_returns, axis=1)
+
+
+def _collect(grid, metrics):
+    table = pd.concat(metrics, ignore_index=True) if metrics else batch_metrics(np.empty((0, 1)))
+    return pd.concat([grid.reset_index(drop=True), table], axis=1)
+
+
+def sweep_moving_average_crossover(data, short_windows, long_windows, initial_capital=INITIAL_CAPITAL,
+                                   chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Evaluate every (short_window, long_window) combination of the Moving Average Crossover strategy.
+
+    :param data: DataFrame with 'Close' price column
+    :param short_windows: Short-term moving average windows
+    :param long_windows: Long-term moving average windows
+    :param initial_capital: Initial capital for the strategy
+    :param chunk_size: Number of combinations evaluated per batch
+    :return: DataFrame with one row per combination and its metrics
+    """
+    grid = _grid(short_window=short_windows, long_window=long_windows)
+    price = data['Close'].to_numpy(dtype=float)
+    returns = _price_returns(price)
+
+    short_windows = grid['short_window'].to_numpy()
+    long_windows = grid['long_window'].to_numpy()
+
+    metrics = []
+    for rows in _chunks(len(grid), chunk_size):
+        windows, (short_rows, long_rows) = _chunk_windows(short_windows[rows], long_windows[rows])
+        means = _rolling_means(price, windows, min_periods=1)
+        short_mavg = means[short_rows]
+        long_mavg = means[long_rows]
+        signal = np.where(short_mavg > long_mavg, 1.0, np.where(short_mavg <= long_mavg, -1.0, 0.0))
+        positions = _diff(signal)
+        equity = _shifted_equity(positions, returns, initial_capital)
+        metrics.append(batch_metrics(equity, positions, initial_capital))
+
+    return _collect(grid, metrics)
+
+
+def sweep_bollinger_bands(data, windows, num_stds, initial_capital=INITIAL_CAPITAL,
+                          chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Evaluate every (window, num_std) combination of the Bollinger Bands strategy.
+
+    :param data: DataFrame with 'Close' price column
+    :param windows: Moving average windows
+    :param num_stds: Band widths in standard deviations
+    :param initial_capital: Initial capital for the strategy
+    :param chunk_size: Number of combinations evaluated per batch
+    :return: DataFrame with one row per combination and its metrics
+    """
+    grid = _grid(window=windows, num_std=num_stds)
+    close = data['Close'].to_numpy(dtype=float)
+    price = data['Close'].ffill().to_numpy(dtype=float)
+
+    grid_windows = grid['window'].to_numpy()
+    num_std = grid['num_std'].to_numpy(dtype=float)
+
+    metrics = []
+    for rows in _chunks(len(grid), chunk_size):
+        windows, (window_rows,) = _chunk_windows(grid_windows[rows])
+        middle = _rolling_means(close, windows)[window_rows]
+        width = _rolling_stds(close, windows)[window_rows] * num_std[rows, None]
+        signal = np.where(price > middle + width, -1.0, np.where(price < middle - width, 1.0, 0.0))
+        positions = np.nan_to_num(_diff(signal), nan=0.0)
+
+        equity = np.empty_like(positions)
+        for i, run_positions in enumerate(positions):
+            result = execute(price, run_positions, initial_capital, rule='positions')
+            equity[i, 0] = initial_capital
+            equity[i, 1:] = result.equity[:-1]
+        metrics.append(batch_metrics(equity, positions, initial_capital))
+
+    return _collect(grid, metrics)
+
+
+def sweep_rsi(data, periods, overboughts, oversolds, initial_capital=INITIAL_CAPITAL,
+              chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Evaluate every (period, overbought, oversold) combination of the RSI strategy.
+
+    :param data: DataFrame with 'Close' price column
+    :param periods: RSI periods
+    :param overboughts: Overbought thresholds
+    :param oversolds: Oversold thresholds
+    :param initial_capital: Initial capital for the strategy
+    :param chunk_size: Number of combinations evaluated per batch
+    :return: DataFrame with one row per combination and its metrics
+    """
+    grid = _grid(period=periods, overbought=overboughts, oversold=oversolds)
+    close = data['Close'].to_numpy(dtype=float)
+    price = np.nan_to_num(close, nan=0.0)
+
+    delta = np.empty_like(close)
+    delta[0] = np.nan
+    delta[1:] = np.diff(close)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+
+    grid_periods = grid['period'].to_numpy()
+    overbought = grid['overbought'].to_numpy(dtype=float)
+    oversold = grid['oversold'].to_numpy(dtype=float)
+
+    metrics = []
+    for rows in _chunks(len(grid), chunk_size):
+        periods, (period_rows,) = _chunk_windows(grid_periods[rows])
+        rsi = _rolling_rsis(gain, loss, periods)[period_rows]
+        signal = np.where(rsi < oversold[rows, None], 1.0, 0.0)
+        signal = np.where(rsi > overbought[rows, None], -1.0, signal)
+        positions = np.nan_to_num(_diff(signal), nan=0.0)
+
+        equity = np.empty_like(signal)
+        for i, run_signal in enumerate(signal):
+            result = execute(price, run_signal, initial_capital, rule='signal')
+            equity[i, 0] = initial_capital
+            equity[i, 1:] = result.equity[1:]
+        metrics.append(batch_metrics(equity, positions, initial_capital))
+
+    return _collect(grid, metrics)
+
+
+def sweep_macd(data, fasts, slows, signals, initial_capital=INITIAL_CAPITAL, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Evaluate every (fast, slow, signal) combination of the MACD strategy.
+
+    Each distinct EMA span is computed once and shared by every combination using it.
+
+    :param data: DataFrame with 'Close' price column
+    :param fasts: Fast EMA spans
+    :param slows: Slow EMA spans
+    :param signals: Signal line spans
+    :param initial_capital: Initial capital for the strategy
+    :param chunk_size: Number of combinations evaluated per batch
+    :return: DataFrame with one row per combination and its metrics
+    """
+    grid = _grid(fast=fasts, slow=slows, signal=signals)
+    price = data['Close'].to_numpy(dtype=float)
+    returns = _price_returns(price)
+
+    spans = np.unique(grid[['fast', 'slow']].to_numpy())
+    emas = {span: _ewm(price, span)[0] for span in spans}
+
+    metrics = []
+    for rows in _chunks(len(grid), chunk_size):
+        chunk = grid.iloc[rows]
+        macd = np.stack([emas[fast] - emas[slow] for fast, slow in zip(chunk['fast'], chunk['slow'])])
+
+        # Signal lines are filtered once per distinct span across the whole chunk
+        signal_line = np.empty_like(macd)
+        chunk_signals = chunk['signal'].to_numpy()
+        for span in np.unique(chunk_signals):
+            selected = chunk_signals == span
+            signal_line[selected] = _ewm(macd[selected], span)
+
+        signal = np.where(macd > signal_line, 1.0, np.where(macd <= signal_line, -1.0, 0.0))
+        # Not enough data to compute MACD: macd_strategy leaves every column NaN
+        too_short = len(price) < chunk[['fast', 'slow', 'signal']].max(axis=1).to_numpy()
+        signal[too_short] = np.nan
+
+        positions = _diff(signal)
+        equity = _shifted_equity(positions, returns, initial_capital)
+        metrics.append(batch_metrics(equity, positions, initial_capital))
+
+    return _collect(grid, metrics)
+
+
+SWEEPS = {
+    'moving_average_crossover': sweep_moving_average_crossover,
+    'bollinger_bands': sweep_bollinger_bands,
+    'rsi': sweep_rsi,
+    'macd': sweep_macd,
+}
+
+
+def run_sweep(strategy, data, param_grid, initial_capital=INITIAL_CAPITAL, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Evaluate a strategy over a parameter grid in one batched pass.
+
+    :param strategy: One of 'moving_average_crossover', 'bollinger_bands', 'rsi' or 'macd'
+    :param data: DataFrame with 'Close' price column
+    :param param_grid: Mapping of parameter name to the list of values to try,
+                       e.g. {'short_windows': [10, 20], 'long_windows': [50, 100]}
+    :return: DataFrame with one row per combination and its metrics
+    """
+    if strategy not in SWEEPS:
+        raise ValueError(f"Unknown strategy '{strategy}'. Expected one of {list(SWEEPS)}")
+    return SWEEPS[strategy](data, initial_capital=initial_capital, chunk_size=chunk_size, **param_grid)
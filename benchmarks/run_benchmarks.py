@@ -0,0 +1,334 @@
+# benchmarks/run_benchmarks.py
+
+"""
+Performance benchmarks for the strategies, executors, metrics, ML pipeline and portfolio optimizer.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1k,10k,100k --output results.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --update-baseline
+    python benchmarks/run_benchmarks.py --imports --sizes ""
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from backtesting.backtest import Backtest
+from backtesting.execution import execute
+from backtesting.metrics import batch_metrics
+from strategies.bollinger_bands import bollinger_bands, execute_bollinger_bands_strategy
+from strategies.ichimoku_cloud_strategy import calculate_ichimoku_cloud, ichimoku_cloud_strategy
+from strategies.macd_strategy import execute_macd_strategy
+from strategies.ml_strategy import ml_strategy
+from strategies.moving_average_crossover import execute_moving_average_crossover_strategy
+from strategies.rsi_strategy import execute_rsi_strategy
+from strategies.stochastic_oscillator_strategy import stochastic_oscillator_strategy
+from utils.indicators import get_indicator_cache
+from utils.portfolio_optimization import efficient_frontier, optimize_portfolio
+from utils.synthetic_data import generate_ohlcv
+
+DEFAULT_SIZES = '1k,10k,100k,1M,10M'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_THRESHOLD = 1.5  # Slowdown (or memory growth) ratio reported as a regression
+PORTFOLIO_ASSETS = 10
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules whose cold import is timed by --imports: what worker processes, the CLI and the app load first
+IMPORT_MODULES = ['strategies', 'strategies.moving_average_crossover', 'backtesting.backtest', 'backtesting.sweep',
+                  'utils.data_fetcher', 'utils.portfolio_optimization', 'cli']
+# Slow-to-import dependencies that should only load when the code using them runs
+HEAVY_MODULES = ('sklearn', 'scipy', 'yfinance', 'plotly', 'streamlit', 'joblib')
+
+_IMPORT_SCRIPT = """
+import importlib, json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+importlib.import_module({module!r})
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+Case = namedtuple('Case', ['name', 'setup', 'run', 'max_bars'])
+Case.__doc__ = """
+One benchmark.
+
+:param name: Case name used in results and for --cases
+:param setup: Callable (data) -> tuple of arguments for run, excluded from the timing
+:param run: Callable timed on the arguments returned by setup
+:param max_bars: Largest size the case runs at, None for no limit
+"""
+
+
+def _lowercase(data):
+    return (data.rename(columns=str.lower),)
+
+
+def _signals(strategy):
+    return lambda data: (strategy(data),)
+
+
+def _price_and_positions(data):
+    signals = bollinger_bands(data)
+    return signals['price'].to_numpy(), signals['positions'].to_numpy()
+
+
+def _portfolio_returns(data):
+    # Several correlated assets built from the same bars
+    rng = np.random.default_rng(0)
+    base = data['Close'].pct_change().fillna(0).to_numpy()
+    noise = rng.normal(0, base.std() or 0.01, (len(base), PORTFOLIO_ASSETS))
+    returns = pd.DataFrame(base[:, None] * rng.uniform(0.5, 1.5, PORTFOLIO_ASSETS) + noise,
+                           columns=[f'ASSET{i}' for i in range(PORTFOLIO_ASSETS)])
+    return (returns,)
+
+
+def _metrics(signals):
+    return Backtest(None, None).calculate_metrics(signals)
+
+
+def _batch_metrics(signals):
+    equity = np.tile(signals['cumulative_strategy_returns'].to_numpy(), (8, 1))
+    positions = np.tile(signals['positions'].to_numpy(), (8, 1))
+    return batch_metrics(equity, positions)
+
+
+CASES = [
+    Case('moving_average_crossover', lambda data: (data,), execute_moving_average_crossover_strategy, None),
+    Case('rsi', lambda data: (data,), execute_rsi_strategy, None),
+    Case('bollinger_bands', lambda data: (data,), bollinger_bands, None),
+    Case('bollinger_bands_execute', lambda data: (data,), execute_bollinger_bands_strategy, None),
+    Case('macd', lambda data: (data,), execute_macd_strategy, None),
+    Case('ichimoku_cloud', _lowercase, ichimoku_cloud_strategy, None),
+    Case('calculate_ichimoku_cloud', _lowercase, calculate_ichimoku_cloud, None),
+    Case('stochastic_oscillator', _lowercase, stochastic_oscillator_strategy, None),
+    Case('execute_vectorized', _price_and_positions,
+         lambda price, positions: execute(price, positions, engine='vectorized'), None),
+    Case('execute_loop', _price_and_positions,
+         lambda price, positions: execute(price, positions, engine='loop'), 1_000_000),
+    Case('execute_event', _price_and_positions,
+         lambda price, positions: execute(price, positions, engine='event'), 1_000_000),
+    Case('calculate_metrics', _signals(execute_bollinger_bands_strategy), _metrics, None),
+    Case('batch_metrics', _signals(execute_bollinger_bands_strategy), _batch_metrics, 1_000_000),
+    Case('ml_strategy', lambda data: (data,), lambda data: ml_strategy(data.copy(), n_estimators=20), 100_000),
+    Case('optimize_portfolio', _portfolio_returns, optimize_portfolio, 1_000_000),
+    Case('efficient_frontier', _portfolio_returns, lambda returns: efficient_frontier(returns, num_points=50), 1_000_000),
+]
+
+
+def parse_size(text):
+    """Parse a bar count such as '1000', '10k' or '10M'."""
+    text = text.strip()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(text[-1].lower(), 1)
+    number = text[:-1] if multiplier > 1 else text
+    return int(float(number) * multiplier)
+
+
+def _clear_caches():
+    # Each timing must compute its indicators rather than hit the shared cache
+    get_indicator_cache().clear()
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence the progress prints and log lines of the benchmarked code."""
+    logging.disable(logging.INFO)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def measure(case, data, repeat=3):
+    """
+    Time one case on one data set.
+
+    :return: Dict with the best wall time in seconds, bars per second and peak traced memory in bytes
+    """
+    with _quiet():
+        args = case.setup(data)
+        times = []
+        for _ in range(repeat):
+            _clear_caches()
+            start = time.perf_counter()
+            case.run(*args)
+            times.append(time.perf_counter() - start)
+
+        # Memory is traced in a separate run because tracing slows the code down
+        _clear_caches()
+        tracemalloc.start()
+        try:
+            case.run(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    seconds = min(times)
+    return {
+        "seconds": seconds,
+        "bars_per_sec": len(data) / seconds if seconds > 0 else float('inf'),
+        "peak_bytes": peak,
+    }
+
+
+def measure_imports(modules=None, repeat=3, log=print):
+    """
+    Time the cold import of each module in a fresh interpreter.
+
+    :param modules: Module names, defaults to IMPORT_MODULES
+    :param repeat: Interpreters started per module; the fastest import is reported
+    :param log: Callable receiving one progress line per module, or None
+    :return: List of result rows with case 'import <module>', bars 0 and the HEAVY_MODULES
+             the import loaded under 'heavy_modules'
+    """
+    rows = []
+    for module in modules or IMPORT_MODULES:
+        script = _IMPORT_SCRIPT.format(root=ROOT, module=module, heavy=HEAVY_MODULES)
+        runs = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+            runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+        best = min(runs, key=lambda run: run['seconds'])
+        row = {"case": f"import {module}", "bars": 0, "repeat": repeat, "seconds": best['seconds'],
+               "bars_per_sec": 0.0, "peak_bytes": 0, "heavy_modules": best['heavy']}
+        rows.append(row)
+        if log is not None:
+            log(f"{row['case']:>40}  {row['seconds']:8.3f}s  loads {', '.join(row['heavy_modules']) or 'no heavy modules'}")
+    return rows
+
+
+def run_suite(sizes, cases=None, repeat=3, log=print):
+    """
+    Run every selected case at every size it supports.
+
+    :param sizes: List of bar counts
+    :param cases: Optional list of case names, defaults to all cases
+    :param repeat: Timed runs per measurement; the fastest is reported
+    :param log: Callable receiving one progress line per measurement, or None
+    :return: Results dict with 'meta' and 'results'
+    """
+    selected = [case for case in CASES if cases is None or case.name in cases]
+    unknown = set(cases or []) - {case.name for case in CASES}
+    if unknown:
+        raise ValueError(f"Unknown cases: {sorted(unknown)}")
+
+    results = []
+    for bars in sizes:
+        runnable = [case for case in selected if case.max_bars is None or bars <= case.max_bars]
+        if not runnable:
+            continue
+        data = generate_ohlcv(bars, freq='min', seed=0)
+        for case in runnable:
+            row = {"case": case.name, "bars": bars, "repeat": repeat, **measure(case, data, repeat)}
+            results.append(row)
+            if log is not None:
+                log(f"{case.name:>26} {bars:>10,} bars  {row['seconds']:10.4f}s  "
+                    f"{row['bars_per_sec']:14,.0f} bars/s  {row['peak_bytes'] / 2**20:9.1f} MiB")
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results against a baseline run.
+
+    :param results: Results dict from run_suite
+    :param baseline: Results dict of an earlier run
+    :param threshold: Ratio of time (or peak memory) to the baseline above which a case regressed
+    :return: List of dicts, one per case and size present in both runs, with the time and
+             memory ratios and a 'regression' flag
+    """
+    previous = {(row['case'], row['bars']): row for row in baseline['results']}
+    rows = []
+    for row in results['results']:
+        old = previous.get((row['case'], row['bars']))
+        if old is None:
+            continue
+        time_ratio = row['seconds'] / old['seconds'] if old['seconds'] > 0 else float('inf')
+        memory_ratio = row['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] > 0 else 1.0
+        rows.append({
+            "case": row['case'],
+            "bars": row['bars'],
+            "time_ratio": time_ratio,
+            "memory_ratio": memory_ratio,
+            "regression": time_ratio > threshold or memory_ratio > threshold,
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the performance benchmark suite.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help="Comma separated bar counts, e.g. 1k,10k,1M")
+    parser.add_argument('--cases', help="Comma separated case names, defaults to all")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per measurement")
+    parser.add_argument('--output', help="Write the results as JSON to this file")
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE,
+                        help="Compare against a baseline JSON file (default benchmarks/baseline.json)")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Time or memory ratio flagged as a regression")
+    parser.add_argument('--update-baseline', action='store_true', help="Store the results as the new baseline")
+    parser.add_argument('--imports', action='store_true',
+                        help="Also time cold imports of the main modules (--sizes '' for imports only)")
+    parser.add_argument('--list', action='store_true', help="List the cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for case in CASES:
+            print(case.name)
+        return 0
+
+    sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+    cases = [name.strip() for name in args.cases.split(',')] if args.cases else None
+    results = run_suite(sizes, cases, args.repeat)
+    if args.imports:
+        results['results'] += measure_imports(repeat=args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        with open(DEFAULT_BASELINE, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold)
+        for row in rows:
+            flag = "REGRESSION" if row['regression'] else "ok"
+            print(f"{row['case']:>26} {row['bars']:>10,} bars  time x{row['time_ratio']:.2f}  "
+                  f"memory x{row['memory_ratio']:.2f}  {flag}")
+        if any(row['regression'] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
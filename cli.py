@@ -0,0 +1,246 @@
+# cli.py
+"""
+Headless batch runner, the command-line alternative to the Streamlit app.
+
+    python cli.py jobs.json [--workers N] [--output DIR] [--quiet]
+
+jobs.json holds a list of jobs, or {"defaults": {...}, "jobs": [...]}, for example:
+
+    {
+        "defaults": {"start": "2020-01-01", "end": "2023-04-30"},
+        "jobs": [
+            {"name": "rsi", "strategy": "rsi", "symbols": ["AAPL", "MSFT"], "params": {"period": 10}},
+            {"strategy": "bollinger_bands", "files": {"ES": "es_minutes.csv"}, "rule": "5min"}
+        ]
+    }
+
+Every (job, symbol) pair is backtested in a worker process. Metrics of all runs go to
+<output>/metrics.csv and signals to <output>/signals/<job>/<symbol>.csv. The exit
+code is 0 when every run succeeded, 1 when some failed and 2 for an invalid job spec.
+
+Only the backtesting stack is imported, never streamlit or plotly.
+"""
+
+import argparse
+import functools
+import importlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from config import DEFAULT_START_DATE, DEFAULT_END_DATE
+
+EXIT_OK, EXIT_FAILED, EXIT_INVALID = 0, 1, 2
+
+# Strategy name -> (module, executor); imported by the worker that runs it
+STRATEGIES = {
+    'moving_average_crossover': ('strategies.moving_average_crossover', 'execute_moving_average_crossover_strategy'),
+    'rsi': ('strategies.rsi_strategy', 'execute_rsi_strategy'),
+    'bollinger_bands': ('strategies.bollinger_bands', 'execute_bollinger_bands_strategy'),
+    'macd': ('strategies.macd_strategy', 'execute_macd_strategy'),
+}
+
+JOB_KEYS = {'name', 'strategy', 'symbols', 'files', 'rule', 'start', 'end', 'params', 'engine', 'compact',
+            'signals'}
+
+_JOB_DEFAULTS = {'start': DEFAULT_START_DATE, 'end': DEFAULT_END_DATE, 'params': {}, 'engine': None,
+                 'compact': False, 'signals': True, 'rule': None}
+
+
+def _safe_name(name):
+    return re.sub(r'[^A-Za-z0-9._-]', '_', str(name))
+
+
+def load_jobs(spec):
+    """
+    Validate a job spec and expand it into one task per (job, symbol).
+
+    :param spec: Parsed JSON: a list of jobs, a single job or {"defaults": {...}, "jobs": [...]}
+    :return: List of task dicts
+    :raises ValueError: If the spec is malformed
+    """
+    if isinstance(spec, dict) and 'jobs' in spec:
+        defaults, jobs = spec.get('defaults', {}), spec['jobs']
+    else:
+        defaults, jobs = {}, spec if isinstance(spec, list) else [spec]
+    if not isinstance(defaults, dict) or not isinstance(jobs, list) or not jobs:
+        raise ValueError("The spec needs a non-empty list of jobs")
+
+    tasks = []
+    names = set()
+    for number, job in enumerate(jobs):
+        if not isinstance(job, dict):
+            raise ValueError(f"Job {number} is not an object")
+        job = {**_JOB_DEFAULTS, **defaults, **job}
+        unknown = set(job) - JOB_KEYS
+        if unknown:
+            raise ValueError(f"Job {number} has unknown keys {sorted(unknown)}")
+        if job.get('strategy') not in STRATEGIES:
+            raise ValueError(f"Job {number}: unknown strategy {job.get('strategy')!r}. "
+                             f"Expected one of {sorted(STRATEGIES)}")
+        if not isinstance(job['params'], dict):
+            raise ValueError(f"Job {number}: params must be an object")
+
+        files = job.get('files') or {}
+        symbols = list(job.get('symbols') or []) + [symbol for symbol in files if symbol not in (job.get('symbols') or [])]
+        if not symbols:
+            raise ValueError(f"Job {number} has no symbols or files")
+
+        name = _safe_name(job.get('name') or job['strategy'])
+        if name in names:
+            name = f"{name}_{number}"
+        names.add(name)
+
+        for symbol in symbols:
+            tasks.append({
+                'job': name,
+                'symbol': symbol,
+                'strategy': job['strategy'],
+                'params': job['params'],
+                'engine': job['engine'],
+                'compact': bool(job['compact']),
+                'signals': bool(job['signals']),
+                'file': files.get(symbol),
+                'rule': job['rule'],
+                'start': str(job['start']),
+                'end': str(job['end']),
+            })
+    return tasks
+
+
+def _load_data(task):
+    if task['file'] is not None:
+        # Imported here so jobs on downloaded data do not pay for it
+        from utils.ingestion import load_bars
+        data = load_bars(task['file'], rule=task['rule'])
+        data = data.loc[task['start']:task['end']] if not data.empty else data
+    else:
+        from utils.data_fetcher import FetchError, fetch_data
+        if task.get('fetch_error'):
+            raise FetchError(task['symbol'], task['fetch_error'])
+        data = fetch_data(task['symbol'], task['start'], task['end'])
+    if data.empty:
+        raise ValueError(f"No data for {task['symbol']} between {task['start']} and {task['end']}")
+    return data
+
+
+def run_task(task, output_dir=None):
+    """
+    Backtest one symbol of a job and write its signals; errors are reported, not raised.
+
+    :return: Dict with the job, symbol and strategy, the metrics, 'error' and 'seconds'
+    """
+    from backtesting.backtest import Backtest
+
+    started = time.perf_counter()
+    row = {'job': task['job'], 'symbol': task['symbol'], 'strategy': task['strategy']}
+    try:
+        module, name = STRATEGIES[task['strategy']]
+        executor = getattr(importlib.import_module(module), name)
+        data = _load_data(task)
+        params = task['params']
+        backtest = Backtest(data, functools.partial(executor, **params), task['engine'],
+                            compact=task['compact'])
+        signals = backtest.run()
+        row.update(backtest.calculate_metrics(signals))
+        if output_dir is not None and task['signals']:
+            directory = os.path.join(output_dir, 'signals', task['job'])
+            os.makedirs(directory, exist_ok=True)
+            signals.to_csv(os.path.join(directory, f"{_safe_name(task['symbol'])}.csv"))
+        row['error'] = None
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+    row['seconds'] = time.perf_counter() - started
+    return row
+
+
+def prefetch(tasks):
+    """
+    Download the symbols of all tasks concurrently into the shared data cache.
+
+    Worker processes then read them from disk. Tasks whose download failed get a
+    'fetch_error' and fail without retrying it.
+    """
+    ranges = {}
+    for task in tasks:
+        if task['file'] is None:
+            ranges.setdefault((task['start'], task['end']), []).append(task)
+    if not ranges:
+        return
+    from utils.data_fetcher import fetch_many
+    for (start, end), group in ranges.items():
+        report = fetch_many([task['symbol'] for task in group], start, end)
+        for task in group:
+            if task['symbol'] in report.errors:
+                task['fetch_error'] = report.errors[task['symbol']].split(': ', 1)[-1]
+
+
+def run_jobs(tasks, output_dir, workers=None, log=print):
+    """
+    Run tasks over a process pool and write <output_dir>/metrics.csv.
+
+    :param workers: Number of worker processes, defaults to the CPU count; 1 runs in this process
+    :param log: Callable receiving one progress line per finished task, or None
+    :return: DataFrame of metrics rows in task order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+
+    def finished(done, row):
+        if log is not None:
+            status = 'ok' if row['error'] is None else f"FAILED {row['error']}"
+            log(f"[{done}/{len(tasks)}] {row['job']} {row['symbol']}: {status}")
+
+    prefetch(tasks)
+    rows = [None] * len(tasks)
+    if workers == 1:
+        for i, task in enumerate(tasks):
+            rows[i] = run_task(task, output_dir)
+            finished(i + 1, rows[i])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_task, task, output_dir): i for i, task in enumerate(tasks)}
+            for done, future in enumerate(as_completed(futures), 1):
+                rows[futures[future]] = future.result()
+                finished(done, rows[futures[future]])
+
+    table = pd.DataFrame(rows)
+    table.to_csv(os.path.join(output_dir, 'metrics.csv'), index=False)
+    return table
+
+
+def main(argv=None):
+    """Command-line entry point; returns the exit code."""
+    parser = argparse.ArgumentParser(description="Run backtest jobs from a JSON spec without the GUI.")
+    parser.add_argument('spec', help="Path of the JSON job spec")
+    parser.add_argument('--output', '-o', default='results', help="Directory for metrics.csv and signals")
+    parser.add_argument('--workers', '-w', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--quiet', '-q', action='store_true', help="Only print the summary")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.spec) as spec:
+            tasks = load_jobs(json.load(spec))
+    except (OSError, ValueError) as e:
+        print(f"Invalid job spec {args.spec}: {e}", file=sys.stderr)
+        return EXIT_INVALID
+    if args.workers is not None and args.workers < 1:
+        print("--workers must be at least 1", file=sys.stderr)
+        return EXIT_INVALID
+
+    started = time.perf_counter()
+    log = None if args.quiet else (lambda line: print(line, file=sys.stderr))
+    table = run_jobs(tasks, args.output, args.workers, log)
+
+    failed = table['error'].notna()
+    print(f"Ran {len(table)} backtests in {time.perf_counter() - started:.1f} s: "
+          f"{(~failed).sum()} succeeded, {failed.sum()} failed. Metrics: {os.path.join(args.output, 'metrics.csv')}")
+    return EXIT_FAILED if failed.any() else EXIT_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
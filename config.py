@@ -24,6 +24,10 @@ BOLLINGER_NUM_STD = 2
 ML_LOOKBACK = 30
 ML_TEST_SIZE = 0.2
 ML_N_ESTIMATORS = 100
+ML_N_JOBS = None  # Cores per forest: None is one, -1 is all of them
+ML_TRAIN_SIZE = 252  # Walk-forward training window in bars
+ML_RETRAIN_EVERY = 21  # Walk-forward retraining cadence in bars
+ML_MODEL_CACHE_DIR = ".cache/ml_models"
 
 # Moving Average Convergence Divergence
 MACD_FAST = 12
@@ -40,4 +44,37 @@ STOCHASTIC_OVERSOLD = 20
 CONVERSION_LINE_PERIOD = 9
 BASE_LINE_PERIOD = 26
 LEADING_SPAN_B_PERIOD = 52
-LAGGING_SPAN_PERIOD = 26
\ No newline at end of file
+LAGGING_SPAN_PERIOD = 26
+
+# Market data cache
+DATA_CACHE_DIR = ".cache/market_data"
+DATA_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Market data downloads
+YAHOO_CHART_URL = "https://query2.finance.yahoo.com/v8/finance/chart/"
+FETCH_MAX_WORKERS = 16  # Concurrent downloads, and pooled connections per host
+FETCH_TIMEOUT = 10  # Seconds to connect and to wait for each read
+FETCH_RETRIES = 4  # Retries after a failed download, e.g. a timeout or rate limit
+FETCH_BACKOFF = 0.5  # Seconds before the first retry, doubled for each later one
+
+# Indicator cache
+INDICATOR_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Monte Carlo simulation
+SIMULATION_BLOCK_SIZE = 20  # Mean (stationary) or fixed (block) bootstrap block length in bars
+SIMULATION_MAX_BYTES = 256 * 1024 * 1024  # Memory budget of the arrays simulated at once
+
+# Stops
+ATR_WINDOW = 14  # Bars of Wilder's average true range used by ATR stops
+STOP_MAX_BYTES = 64 * 1024 * 1024  # Memory budget of the bars x positions block checked at once
+
+# Chart rendering
+PLOT_MAX_CANDLES = 2000  # Candles drawn per chart; longer ranges merge consecutive bars
+PLOT_MAX_POINTS = 4000  # Points per line trace after LTTB downsampling
+
+# Local file ingestion
+INGESTION_CHUNK_ROWS = 1_000_000  # Rows read from a CSV/Parquet file at a time
+
+# Out-of-core backtests
+OUT_OF_CORE_CHUNK_ROWS = 250_000  # Bars per chunk, plus the halo of bars the rolling windows need
+COMPACT_CHUNK_ROWS = 5_000  # Bars per chunk of the compact executors, which hold one chunk of indicators at a time
@@ -1,17 +1,21 @@
 import streamlit as st
-import plotly.graph_objs as go
-from plotly.subplots import make_subplots
-import yfinance as yf
 import pandas as pd
 import numpy as np
-from strategies import *
+from strategies import (execute_moving_average_crossover_strategy, execute_rsi_strategy,
+                        execute_bollinger_bands_strategy)
 from datetime import timedelta
 from utils.portfolio_optimization import *
 from config import *
 from backtesting.backtest import Backtest
-from utils.data_fetcher import fetch_data
+from backtesting.profiling import Profiler
+from utils.data_fetcher import FetchError, fallback_sample_data, fetch_data, fetch_many
 from utils.risk_management import calculate_position_size, trailing_stop_loss 
-import time
+from utils.downsampling import aggregate_ohlc, lttb, signal_markers, visible_slice
+import json
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # Strategy descriptions
 strategy_descriptions = {
@@ -19,26 +23,112 @@ strategy_descriptions = {
     'RSI': 'The Relative Strength Index (RSI) identify potential buy and sell signals based on momentum. It measures the speed and change of price movements, with values ranging from 0 to 100. An RSI above 70 indicates that an asset may be overbought, signaling a potential sell opportunity. Conversely, an RSI below 30 suggests the asset is oversold, presenting a potential buy opportunity. Monitoring these levels helps gauge market conditions effectively.',
     'Bollinger Bands': 'Bollinger Bands identify buy and sell signals based on price movements relative to three bands: a middle band (simple moving average), an upper band, and a lower band, calculated using standard deviations. A buy signal occurs when the price falls below the lower band, indicating possible overselling and a potential price bounce back. Conversely, a sell signal is generated when the price rises above the upper band, suggesting overbuying and a likely price correction.'
 }
-    
-@st.cache_data  # the caching decorator
+
+STRATEGY_EXECUTORS = {
+    'Moving Average Crossover': execute_moving_average_crossover_strategy,
+    'RSI': execute_rsi_strategy,
+    'Bollinger Bands': execute_bollinger_bands_strategy,
+}
+
+# Finished or running portfolio optimizations kept per process, most recent last
+MAX_PORTFOLIO_JOBS = 32
+
+@st.cache_data(show_spinner="Loading data...")
+def load_data(ticker, start_date, end_date):
+    """
+    Price history for a ticker, memoized per (ticker, start_date, end_date).
+
+    A failed download raises FetchError, which st.cache_data does not memoize, so
+    the next rerun tries again; see load_data_or_sample.
+    """
+    return fetch_data(ticker, start_date, end_date)
+
+def load_data_or_sample(ticker, start_date, end_date):
+    """load_data, or sample data if the download fails; the sample data is not memoized, main() says so."""
+    try:
+        return load_data(ticker, start_date, end_date)
+    except FetchError as e:
+        return fallback_sample_data(e, start_date, end_date)
+
+def backtest_signals(data, start_date, end_date, strategy, profile=False):
+    """
+    Signals and metrics of a strategy over [start_date, end_date].
+
+    :return: (signals, metrics); metrics is None when the strategy produces no equity curve
+    """
+    backtest = Backtest(data, STRATEGY_EXECUTORS[strategy], profile=profile)
+    signals = backtest.run().loc[start_date:end_date]
+    metrics = backtest.calculate_metrics(signals) if 'cumulative_strategy_returns' in signals.columns else None
+    return signals, metrics
+
+@st.cache_data(show_spinner="Running backtest...")
+def run_backtest(ticker, start_date, end_date, strategy):
+    """
+    backtest_signals memoized per input; like load_data, nothing is memoized if the download fails.
+
+    Data is loaded from 30 days before start_date so indicators are warmed up.
+    """
+    data = load_data(ticker, start_date - timedelta(days=30), end_date)
+    return backtest_signals(data, start_date, end_date, strategy)
+
+def profile_backtest(ticker, start_date, end_date, strategy):
+    """Uncached run_backtest that profiles data loading and every backtest stage."""
+    profiler = Profiler()
+    with profiler.activate():
+        data = fetch_data(ticker, start_date - timedelta(days=30), end_date, sample_fallback=True)
+        if data.empty:
+            return data, None, None, None
+        signals, metrics = backtest_signals(data, start_date, end_date, strategy, profile=profiler)
+    return data, signals, metrics, profiler.report()
+
+@st.cache_data(show_spinner=False)
+def strategy_chart(ticker, start_date, end_date, strategy, visible_range=None):
+    """plot_strategy_results of the cached backtest, memoized per input and visible range."""
+    data = load_data(ticker, start_date - timedelta(days=30), end_date)
+    signals, _ = run_backtest(ticker, start_date, end_date, strategy)
+    return plot_strategy_results(data.loc[start_date:end_date], signals, strategy, visible_range)
+
 # Function to plot strategy results
-def plot_strategy_results(data, signals, strategy_name):
+def plot_strategy_results(data, signals, strategy_name, visible_range=None, max_candles=PLOT_MAX_CANDLES,
+                          max_points=PLOT_MAX_POINTS):
+    """
+    Plot price candles with buy/sell markers, volume and the strategy equity.
+
+    Only the visible range is drawn, at a level of detail bounded by max_candles
+    candles (bars merged by aggregate_ohlc) and max_points line points (LTTB), and
+    lines and markers use WebGL traces, so long minute histories stay responsive.
+
+    :param visible_range: Optional (start, end) of the time range to draw
+    """
+    # plotly is imported on first use so the app starts faster
+    import plotly.graph_objs as go
+    from plotly.subplots import make_subplots
+
+    if visible_range is not None:
+        data = data.iloc[visible_slice(data.index, *visible_range)]
+        signals = signals.iloc[visible_slice(signals.index, *visible_range)]
+    candles = aggregate_ohlc(data, max_candles)
+    detail = '' if len(candles) == len(data) else f' ({len(data):,} bars shown as {len(candles):,} candles)'
+
     fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.12, 
-                        subplot_titles=(f'{strategy_name} Strategy', 'Volume', 'Strategy Returns'), 
+                        subplot_titles=(f'{strategy_name} Strategy{detail}', 'Volume', 'Strategy Returns'), 
                         row_heights=[0.5, 0.2, 0.3])
     
     # Plot candlestick chart
-    fig.add_trace(go.Candlestick(x=data.index, open=data['Open'], high=data['High'], low=data['Low'], close=data['Close'], name='Price'), row=1, col=1)
+    fig.add_trace(go.Candlestick(x=candles.index, open=candles['Open'], high=candles['High'], low=candles['Low'], close=candles['Close'], name='Price'), row=1, col=1)
+    markers = signal_markers(signals, max_markers=max_points)
     # Plot buy signals
-    fig.add_trace(go.Scatter(x=signals[signals['positions'] == 1].index, y=signals[signals['positions'] == 1]['price'], mode='markers', marker=dict(symbol='triangle-up', size=10, color='green'), name='Buy Signal'), row=1, col=1)
+    fig.add_trace(go.Scattergl(x=markers['buy'].index, y=markers['buy'], mode='markers', marker=dict(symbol='triangle-up', size=10, color='green'), name='Buy Signal'), row=1, col=1)
     # Plot sell signals
-    fig.add_trace(go.Scatter(x=signals[signals['positions'] == -1].index, y=signals[signals['positions'] == -1]['price'], mode='markers', marker=dict(symbol='triangle-down', size=10, color='red'), name='Sell Signal'), row=1, col=1)
+    fig.add_trace(go.Scattergl(x=markers['sell'].index, y=markers['sell'], mode='markers', marker=dict(symbol='triangle-down', size=10, color='red'), name='Sell Signal'), row=1, col=1)
     
     # Plot volume
-    fig.add_trace(go.Bar(x=data.index, y=data['Volume'], name='Volume'), row=2, col=1)
+    fig.add_trace(go.Bar(x=candles.index, y=candles['Volume'], name='Volume'), row=2, col=1)
     
     # Plot strategy returns
-    fig.add_trace(go.Scatter(x=signals.index, y=signals['cumulative_strategy_returns'], name='Cumulative Strategy Returns', line=dict(color='orange')), row=3, col=1)
+    equity = signals['cumulative_strategy_returns']
+    kept = lttb(equity.index, equity.to_numpy(), max_points)
+    fig.add_trace(go.Scattergl(x=equity.index[kept], y=equity.to_numpy()[kept], name='Cumulative Strategy Returns', line=dict(color='orange')), row=3, col=1)
     
     fig.update_layout(
         height=1000,  # Increased height
@@ -131,9 +221,24 @@ def risk_management_section(data):
     Always ensure that your potential loss aligns with your risk tolerance.
     """)
     
-def optimize_and_plot_portfolio(tickers, start_date, end_date, strategy, min_weight=0.05, max_weight=0.4, min_assets=3, risk_free_rate=0.02):
-    data = yf.download(tickers, start=start_date, end=end_date)['Adj Close']
-    returns = data.pct_change().dropna()
+@functools.lru_cache(maxsize=16)
+def load_portfolio_prices(tickers, start_date, end_date):
+    """Adjusted closes of the tickers (a tuple), downloaded concurrently and memoized per input."""
+    report = fetch_many(tickers, start_date, end_date)
+    if report.errors:
+        raise ValueError("Could not load " + "; ".join(report.errors.values()))
+    return pd.DataFrame({ticker: frame['Adj Close' if 'Adj Close' in frame.columns else 'Close']
+                         for ticker, frame in report.data.items()})
+
+def compute_portfolio(tickers, start_date, end_date, strategy, min_weight=0.05, max_weight=0.4, min_assets=3, risk_free_rate=0.02):
+    """
+    Optimize a portfolio and its efficient frontier; plain data only, so it can run in a background thread.
+
+    :return: Dict with the weights, expected return and volatility, the strategy metric,
+             per-asset returns and volatilities and the frontier (None if it cannot be computed)
+    """
+    tickers = tuple(tickers)
+    returns = load_portfolio_prices(tickers, start_date, end_date).pct_change().dropna()
 
     weights = safe_optimize_portfolio(returns, strategy, min_weight, max_weight, min_assets, risk_free_rate)
 
@@ -149,11 +254,34 @@ def optimize_and_plot_portfolio(tickers, start_date, end_date, strategy, min_wei
         performance_metric = portfolio_volatility
         metric_name = "Expected Annual Volatility"
 
-    fig = go.Figure(data=[go.Pie(labels=tickers, values=weights, textinfo='label+percent', hole=.3)])
+    try:
+        frontier = efficient_frontier(returns, num_points=100, min_weight=min_weight, max_weight=max_weight)
+    except Exception as e:
+        print(f"Error computing efficient frontier: {str(e)}")
+        frontier = None
+
+    return {
+        'tickers': list(tickers),
+        'weights': weights,
+        'portfolio_return': portfolio_return,
+        'portfolio_volatility': portfolio_volatility,
+        'performance_metric': performance_metric,
+        'metric_name': metric_name,
+        'asset_returns': returns.mean() * 252,
+        'asset_volatilities': returns.std() * np.sqrt(252),
+        'frontier': frontier,
+    }
+
+def plot_portfolio(result):
+    """Weights pie chart and risk-return scatter of a compute_portfolio result."""
+    import plotly.graph_objs as go
+
+    tickers = result['tickers']
+    fig = go.Figure(data=[go.Pie(labels=tickers, values=result['weights'], textinfo='label+percent', hole=.3)])
     fig.update_layout(title_text="Optimal Portfolio Weights")
 
-    asset_returns = returns.mean() * 252
-    asset_volatilities = returns.std() * np.sqrt(252)
+    asset_returns = result['asset_returns']
+    asset_volatilities = result['asset_volatilities']
 
     scatter_fig = go.Figure()
     scatter_fig.add_trace(go.Scatter(
@@ -164,9 +292,18 @@ def optimize_and_plot_portfolio(tickers, start_date, end_date, strategy, min_wei
         text=tickers,
         textposition="top center"
     ))
+    frontier = result['frontier']
+    if frontier is not None:
+        scatter_fig.add_trace(go.Scatter(
+            x=frontier.volatilities,
+            y=frontier.returns,
+            mode='lines',
+            line=dict(color='gray', dash='dash'),
+            name='Efficient Frontier'
+        ))
     scatter_fig.add_trace(go.Scatter(
-        x=[portfolio_volatility],
-        y=[portfolio_return],
+        x=[result['portfolio_volatility']],
+        y=[result['portfolio_return']],
         mode='markers+text',
         marker=dict(size=15, color='red', symbol='star'),
         text=['Optimized Portfolio'],
@@ -178,8 +315,130 @@ def optimize_and_plot_portfolio(tickers, start_date, end_date, strategy, min_wei
         yaxis_title='Expected Return',
         showlegend=False
     )
+    return fig, scatter_fig
+
+def optimize_and_plot_portfolio(tickers, start_date, end_date, strategy, min_weight=0.05, max_weight=0.4, min_assets=3, risk_free_rate=0.02):
+    result = compute_portfolio(tickers, start_date, end_date, strategy, min_weight, max_weight, min_assets, risk_free_rate)
+    fig, scatter_fig = plot_portfolio(result)
+    return (fig, scatter_fig, result['weights'], result['portfolio_return'], result['portfolio_volatility'],
+            result['performance_metric'], result['metric_name'])
+
+@st.cache_resource
+def _portfolio_jobs():
+    """
+    Background executor and the optimization futures keyed by their inputs, shared by all sessions,
+    with the lock that guards the futures.
+    """
+    return ThreadPoolExecutor(max_workers=2), OrderedDict(), threading.Lock()
+
+def submit_portfolio_optimization(*args):
+    """
+    Start compute_portfolio(*args) in the background unless the same inputs already ran or are running.
+
+    A run that failed is started again, so a transient error is not kept for good.
+
+    :return: Future of the compute_portfolio result
+    """
+    executor, jobs, lock = _portfolio_jobs()
+    with lock:
+        job = jobs.get(args)
+        if job is None or (job.done() and job.exception() is not None):
+            jobs[args] = executor.submit(compute_portfolio, *args)
+        jobs.move_to_end(args)
+        while len(jobs) > MAX_PORTFOLIO_JOBS:
+            jobs.popitem(last=False)
+        return jobs[args]
+
+def show_profile_report(report):
+    with st.expander("Backtest Profile", expanded=True):
+        st.write(f"Total time: {report['total_seconds']:.3f}s, peak memory: {report['peak_bytes'] / 2**20:.1f} MiB")
+        st.dataframe(pd.DataFrame(report['stages']).set_index('stage'), use_container_width=True)
+        st.download_button("Download Profile (JSON)", json.dumps(report, indent=2), "backtest_profile.json", "application/json")
+
+@st.fragment
+def portfolio_optimization_section(start_date, end_date):
+    """
+    Portfolio optimization widgets and results.
+
+    Runs as a fragment, so its widgets rerun only this section. The optimization
+    runs in a background thread keyed by its inputs; the rest of the page is
+    already shown while it runs, and repeated inputs reuse the finished result.
+    """
+    # Portfolio Optimization Section
+    st.header("Portfolio Optimization")
+    st.write("Optimize a portfolio by selecting multiple stocks:")
+
+    portfolio_tickers = st.multiselect("Select stocks for portfolio (3-10 recommended)", 
+                                    ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'META', 'TSLA', 'NVDA', 'JPM', 'JNJ', 'V'],
+                                    default=['AAPL', 'GOOGL', 'MSFT'])
 
-    return fig, scatter_fig, weights, portfolio_return, portfolio_volatility, performance_metric, metric_name
+    if len(portfolio_tickers) >= 3:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            min_weight = st.slider("Minimum weight per asset", 0.01, 0.1, 0.05, 0.01)
+        with col2:
+            max_weight = st.slider("Maximum weight per asset", 0.2, 0.5, 0.4, 0.05)
+        with col3:
+            min_assets = st.slider("Minimum number of assets", 2, len(portfolio_tickers), 3, 1)
+        
+        longer_period = st.checkbox("Use 5-year historical data for optimization")
+        opt_start_date = start_date - pd.DateOffset(years=4) if longer_period else start_date
+        
+        risk_free_rate = st.slider("Risk-free rate (%)", 0.0, 5.0, 2.0, 0.1) / 100
+
+        optimization_strategy = st.selectbox(
+            "Select optimization strategy",
+            ["Sharpe Ratio", "Sortino Ratio", "Maximum Return", "Minimum Volatility"],
+            index=0
+        )
+
+        strategy_mapping = {
+            "Sharpe Ratio": "sharpe",
+            "Sortino Ratio": "sortino",
+            "Maximum Return": "max_return",
+            "Minimum Volatility": "min_volatility"
+        }
+
+        job = submit_portfolio_optimization(
+            tuple(portfolio_tickers), opt_start_date, end_date, strategy_mapping[optimization_strategy],
+            min_weight, max_weight, min_assets, risk_free_rate
+        )
+        if not job.done():
+            with st.spinner('Optimizing portfolio in the background...'):
+                job.exception()
+        if job.exception() is not None:
+            st.error(f"Portfolio optimization failed: {job.exception()}")
+            return
+        result = job.result()
+        pie_fig, scatter_fig = plot_portfolio(result)
+        weights = result['weights']
+        portfolio_return, portfolio_volatility = result['portfolio_return'], result['portfolio_volatility']
+        performance_metric, metric_name = result['performance_metric'], result['metric_name']
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.plotly_chart(pie_fig, use_container_width=True)
+        with col2:
+            st.plotly_chart(scatter_fig, use_container_width=True)
+        
+        st.subheader("Optimization Results")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Expected Annual Return", f"{portfolio_return:.2%}")
+        col2.metric("Expected Annual Volatility", f"{portfolio_volatility:.2%}")
+        col3.metric(metric_name, f"{performance_metric:.2f}")
+        
+        st.subheader("Optimal Portfolio Weights")
+        weight_df = pd.DataFrame({'Stock': portfolio_tickers, 'Weight': weights})
+        weight_df = weight_df.sort_values('Weight', ascending=False).reset_index(drop=True)
+        st.dataframe(weight_df.style.format({'Weight': '{:.2%}'}), use_container_width=True)
+        
+        csv = weight_df.to_csv(index=False).encode('utf-8')
+        st.download_button("Download Optimal Weights (CSV)", csv, "optimal_portfolio_weights.csv", "text/csv")
+        
+        st.info(f"This optimization aims to {optimization_strategy.lower()}. The results show the optimal allocation of your investment across the selected stocks based on historical data.")
+        
+    else:
+        st.warning("Please select at least three stocks for portfolio optimization.")
 
 def strategy_configuration_sidebar():
     # Sidebar for user input
@@ -203,37 +462,46 @@ def main():
     st.title('Trading Strategy Visualization')
     
     ticker, start_date, end_date, strategy = strategy_configuration_sidebar()
+    profile_run = st.sidebar.checkbox('Profile backtest', help="Time data loading, indicators, signal generation, execution and metrics.")
 
     # Main content area
-    with st.spinner('Loading data...'):
-        progress_bar = st.progress(0)
-        for i in range(100):
-            time.sleep(0.01)
-            progress_bar.progress(i + 1)
-        data = fetch_data(ticker, start_date - timedelta(days=30), end_date)
+    report = None
+    if profile_run:
+        with st.spinner('Profiling backtest...'):
+            data, signals, metrics, report = profile_backtest(ticker, start_date, end_date, strategy)
+    else:
+        data = load_data_or_sample(ticker, start_date - timedelta(days=30), end_date)
     
     if data.empty:
         st.error("No data found for the selected ticker and date range.")
         return
-    
-    if strategy == 'Moving Average Crossover':
-        backtest = Backtest(data, execute_moving_average_crossover_strategy)
-    elif strategy == 'RSI':
-        backtest = Backtest(data, execute_rsi_strategy)
-    elif strategy == 'Bollinger Bands':
-        backtest = Backtest(data, execute_bollinger_bands_strategy)
-    
-    signals = backtest.run()
-    signals = signals.loc[start_date:end_date]
-    
-    fig = plot_strategy_results(data.loc[start_date:end_date], signals, strategy)
+    # Results on sample data are not memoized, so the download is retried on the next rerun
+    uncached = profile_run or 'sample_data' in data.attrs
+    if 'sample_data' in data.attrs:
+        st.warning(f"Could not download {ticker} ({data.attrs['sample_data']}). "
+                   "Showing randomly generated sample data instead.")
+    
+    if not profile_run:
+        if uncached:
+            signals, metrics = backtest_signals(data, start_date, end_date, strategy)
+        else:
+            signals, metrics = run_backtest(ticker, start_date, end_date, strategy)
+    
+    chart_data = data.loc[start_date:end_date]
+    visible_range = None
+    if len(chart_data) > PLOT_MAX_CANDLES:
+        first, last = chart_data.index[0].to_pydatetime(), chart_data.index[-1].to_pydatetime()
+        visible_range = st.slider('Visible range', min_value=first, max_value=last, value=(first, last),
+                                  help="Zoom in to see more detail; long ranges are drawn with merged candles.")
+    if uncached:
+        fig = plot_strategy_results(chart_data, signals, strategy, visible_range)
+    else:
+        fig = strategy_chart(ticker, start_date, end_date, strategy, visible_range)
     st.plotly_chart(fig, use_container_width=True)
     
     st.subheader('Strategy Performance')
     
-    if 'cumulative_strategy_returns' in signals.columns:
-        metrics = backtest.calculate_metrics(signals)
-        
+    if metrics is not None:
         col1, col2, col3 = st.columns(3)
         col1.metric("Initial Investment", f"${metrics['initial_investment']:,.2f}")
         col2.metric("Final Portfolio Value", f"${metrics['final_value']:,.2f}")
@@ -249,6 +517,9 @@ def main():
         
         csv = signals.to_csv().encode('utf-8')
         st.download_button("Download Full Strategy Results (CSV)", csv, "strategy_results.csv", "text/csv")
+
+        if report is not None:
+            show_profile_report(report)
     else:
         st.warning("Strategy performance data not available.")
     
@@ -268,71 +539,7 @@ def main():
     
     st.info("Note: Past performance does not guarantee future results. This tool is for educational purposes only and should not be considered as financial advice.")
 
-    # Portfolio Optimization Section
-    st.header("Portfolio Optimization")
-    st.write("Optimize a portfolio by selecting multiple stocks:")
-
-    portfolio_tickers = st.multiselect("Select stocks for portfolio (3-10 recommended)", 
-                                    ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'META', 'TSLA', 'NVDA', 'JPM', 'JNJ', 'V'],
-                                    default=['AAPL', 'GOOGL', 'MSFT'])
-
-    if len(portfolio_tickers) >= 3:
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            min_weight = st.slider("Minimum weight per asset", 0.01, 0.1, 0.05, 0.01)
-        with col2:
-            max_weight = st.slider("Maximum weight per asset", 0.2, 0.5, 0.4, 0.05)
-        with col3:
-            min_assets = st.slider("Minimum number of assets", 2, len(portfolio_tickers), 3, 1)
-        
-        longer_period = st.checkbox("Use 5-year historical data for optimization")
-        opt_start_date = start_date - pd.DateOffset(years=4) if longer_period else start_date
-        
-        risk_free_rate = st.slider("Risk-free rate (%)", 0.0, 5.0, 2.0, 0.1) / 100
-
-        optimization_strategy = st.selectbox(
-            "Select optimization strategy",
-            ["Sharpe Ratio", "Sortino Ratio", "Maximum Return", "Minimum Volatility"],
-            index=0
-        )
-
-        strategy_mapping = {
-            "Sharpe Ratio": "sharpe",
-            "Sortino Ratio": "sortino",
-            "Maximum Return": "max_return",
-            "Minimum Volatility": "min_volatility"
-        }
-
-        with st.spinner('Optimizing portfolio...'):
-            pie_fig, scatter_fig, weights, portfolio_return, portfolio_volatility, performance_metric, metric_name = optimize_and_plot_portfolio(
-                portfolio_tickers, opt_start_date, end_date, strategy_mapping[optimization_strategy],
-                min_weight, max_weight, min_assets, risk_free_rate
-            )
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.plotly_chart(pie_fig, use_container_width=True)
-        with col2:
-            st.plotly_chart(scatter_fig, use_container_width=True)
-        
-        st.subheader("Optimization Results")
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Expected Annual Return", f"{portfolio_return:.2%}")
-        col2.metric("Expected Annual Volatility", f"{portfolio_volatility:.2%}")
-        col3.metric(metric_name, f"{performance_metric:.2f}")
-        
-        st.subheader("Optimal Portfolio Weights")
-        weight_df = pd.DataFrame({'Stock': portfolio_tickers, 'Weight': weights})
-        weight_df = weight_df.sort_values('Weight', ascending=False).reset_index(drop=True)
-        st.dataframe(weight_df.style.format({'Weight': '{:.2%}'}), use_container_width=True)
-        
-        csv = weight_df.to_csv(index=False).encode('utf-8')
-        st.download_button("Download Optimal Weights (CSV)", csv, "optimal_portfolio_weights.csv", "text/csv")
-        
-        st.info(f"This optimization aims to {optimization_strategy.lower()}. The results show the optimal allocation of your investment across the selected stocks based on historical data.")
-        
-    else:
-        st.warning("Please select at least three stocks for portfolio optimization.")
+    portfolio_optimization_section(start_date, end_date)
     
     risk_management_section(data)
 
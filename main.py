@@ -1,5 +1,8 @@
+import logging
+
 import streamlit as st
 from gui.main_window import main 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     main()
@@ -1,9 +1,55 @@
 # strategies/__init__.py
 
-from .moving_average_crossover import moving_average_crossover,execute_moving_average_crossover_strategy
-from .rsi_strategy import rsi_strategy,execute_rsi_strategy
-from .bollinger_bands import bollinger_bands,execute_bollinger_bands_strategy
-from .ml_strategy import ml_strategy
-from .macd_strategy import macd_strategy,execute_macd_strategy
-from .ichimoku_cloud_strategy import ichimoku_cloud_strategy
-from .stochastic_oscillator_strategy import stochastic_oscillator_strategy
\ No newline at end of file
+"""
+Trading strategies, loaded on first use.
+
+Attributes are resolved lazily (PEP 562), so `from strategies import rsi_strategy`
+imports only strategies.rsi_strategy; scikit-learn is loaded only when the ML
+strategy is used.
+"""
+
+import importlib
+import sys
+import types
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    'moving_average_crossover': 'moving_average_crossover',
+    'execute_moving_average_crossover_strategy': 'moving_average_crossover',
+    'rsi_strategy': 'rsi_strategy',
+    'execute_rsi_strategy': 'rsi_strategy',
+    'bollinger_bands': 'bollinger_bands',
+    'execute_bollinger_bands_strategy': 'bollinger_bands',
+    'ml_strategy': 'ml_strategy',
+    'macd_strategy': 'macd_strategy',
+    'execute_macd_strategy': 'macd_strategy',
+    'ichimoku_cloud_strategy': 'ichimoku_cloud_strategy',
+    'stochastic_oscillator_strategy': 'stochastic_oscillator_strategy',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    # Cache it, so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing strategies.rsi_strategy binds the submodule to the package; like the
+        # eager imports this package used to do, keep the function of the same name instead
+        if isinstance(value, types.ModuleType) and _EXPORTS.get(name) == name and hasattr(value, name):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -1,12 +1,19 @@
+import logging
+
 import pandas as pd
 import numpy as np
 from config import BOLLINGER_WINDOW, BOLLINGER_NUM_STD, INITIAL_CAPITAL
+from backtesting.execution import execute
+from backtesting.out_of_core import run_compact
+from backtesting.signals import compact_frame
+from backtesting.stops import apply_stops, ohlc_arrays
+from utils.indicators import rolling_mean, rolling_std
 
 def calculate_bollinger_bands(data: pd.DataFrame, window: int = BOLLINGER_WINDOW,
-                              num_std: float = BOLLINGER_NUM_STD) -> tuple:
+                              num_std: float = BOLLINGER_NUM_STD, cache=None) -> tuple:
     """Calculate the Bollinger Bands."""
-    middle = data['Close'].rolling(window=window).mean()
-    std = data['Close'].rolling(window=window).std()
+    middle = rolling_mean(data['Close'], window, cache=cache)
+    std = rolling_std(data['Close'], window, cache=cache)
     upper = middle + (std * num_std)
     lower = middle - (std * num_std)
     
@@ -29,59 +36,79 @@ def bollinger_bands(data: pd.DataFrame, window: int = BOLLINGER_WINDOW,
 
     return signals
 
-import logging
-
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def execute_bollinger_bands_strategy(data: pd.DataFrame, initial_capital: float = INITIAL_CAPITAL) -> pd.DataFrame:
-    """Execute the Bollinger Bands trading strategy."""
+def _execute_compact(data, initial_capital, engine, stops, float_dtype):
+    """Memory-lean executor: only the columns calculate_metrics needs, built chunk by chunk as small arrays."""
+    if engine == 'vectorized' and not stops:
+        return compact_frame(data.index, run_compact(data, 'bollinger_bands', float_dtype=float_dtype,
+                                                     initial_capital=initial_capital))
+
+    # Stops and the other engines go over the whole positions
+    columns = run_compact(data, 'bollinger_bands', ('price', 'signal', 'positions'), initial_capital=initial_capital)
+    price, signal, positions = columns['price'], columns['signal'], columns['positions']
+    fill_price = price
+    if stops:
+        stopped = apply_stops(price, positions, **ohlc_arrays(data), **stops)
+        positions = stopped.orders.astype(np.int8)
+        fill_price = stopped.fill_price
+
+    result = execute(fill_price, positions, initial_capital, rule='positions', engine=engine)
+    signals = compact_frame(data.index, {
+        'price': price, 'signal': signal, 'positions': positions,
+        'cumulative_strategy_returns': np.concatenate(([initial_capital], result.equity[:-1]))}, float_dtype)
+    if result.trades is not None:
+        signals.attrs['trades'] = result.trades
+    return signals
+
+def execute_bollinger_bands_strategy(data: pd.DataFrame, initial_capital: float = INITIAL_CAPITAL,
+                                     engine: str = 'vectorized', stops: dict = None, compact: bool = False,
+                                     float_dtype=None) -> pd.DataFrame:
+    """
+    Execute the Bollinger Bands trading strategy.
+
+    :param data: DataFrame with 'Close' price column
+    :param initial_capital: Initial capital for the strategy
+    :param engine: Execution engine, 'vectorized', the row-by-row 'loop' or 'event',
+                   which also stores the trade ledger in signals.attrs['trades']
+    :param stops: Optional backtesting.stops.apply_stops arguments, e.g. {'trailing': 0.1}; stop exits
+                  are added to the positions and their fills stored in the 'stop_price' column
+    :param compact: Build only the columns of backtesting.signals.compact_signals, with int8 orders, chunk by
+                    chunk (see backtesting.out_of_core.run_compact), so peak memory is several times lower
+    :param float_dtype: With compact, optional dtype such as 'float32' for prices
+    :return: DataFrame with strategy performance
+    """
+    if compact:
+        if data.empty:
+            raise ValueError("The signals DataFrame is empty.")
+        return _execute_compact(data, initial_capital, engine, stops, float_dtype)
+
     signals = bollinger_bands(data)
 
     if signals.empty:
         raise ValueError("The signals DataFrame is empty.")
 
-    shares = 0
-    capital = initial_capital
-    cumulative_returns = [initial_capital]
+    fill_price = signals['price'].to_numpy()
+    if stops:
+        stopped = apply_stops(fill_price, signals['positions'].to_numpy(), **ohlc_arrays(data), **stops)
+        signals['positions'] = stopped.orders
+        signals['stop_price'] = stopped.stop_price
+        fill_price = stopped.fill_price
 
-    for index, row in signals.iterrows():
-        price = row['price']
+    result = execute(fill_price, signals['positions'].to_numpy(),
+                     initial_capital, rule='positions', engine=engine)
 
-        if pd.isna(price):  # Skip NaN prices
-            cumulative_returns.append(cumulative_returns[-1])
-            continue
-
-        total_value = capital + (shares * price)
-        cumulative_returns.append(total_value)
-
-        if row['positions'] == 1:  # Buy signal
-            shares_to_buy = capital // price
-            if shares_to_buy > 0:
-                shares += shares_to_buy
-                capital -= shares_to_buy * price
-
-        elif row['positions'] == -1:  # Sell signal
-            if shares > 0:
-                capital += shares * price
-                shares = 0
-
-    # Log lengths for debugging
-    logger.info(f"Length of signals: {len(signals)}")
-    logger.info(f"Length of cumulative_returns: {len(cumulative_returns)}")
-
-    if len(signals) != len(cumulative_returns):
-        logger.warning("Mismatch in lengths of signals and cumulative_returns")
-
-    # Ensure cumulative_returns matches signals index length
-    signals['cumulative_returns'] = cumulative_returns[:len(signals)]
+    # Portfolio value is reported one bar late, starting from the initial capital
+    signals['cumulative_returns'] = np.concatenate(([initial_capital], result.equity[:-1]))
 
     # Calculate strategy returns
     signals['strategy_returns'] = (signals['cumulative_returns'] - initial_capital) / initial_capital
     signals['cumulative_strategy_returns'] = signals['cumulative_returns']
+    if result.trades is not None:
+        signals.attrs['trades'] = result.trades
 
     # Final return percentage
     total_return = (signals['cumulative_returns'].iloc[-1] - initial_capital) / initial_capital * 100
     logger.info(f"Total Return: {total_return:.2f}%")
 
-    return signals
\ No newline at end of file
+    return signals
@@ -4,6 +4,25 @@ import pandas as pd
 import numpy as np
 from config import (CONVERSION_LINE_PERIOD, BASE_LINE_PERIOD,
                     LEADING_SPAN_B_PERIOD, LAGGING_SPAN_PERIOD)
+from utils.indicators import rolling_extrema, rolling_max_many, rolling_min_many
+
+def _ichimoku_components(highs, lows, close, conversion_line_period, base_line_period, leading_span_b_period,
+                         lagging_span_period):
+    """Ichimoku components from rolling highs and lows keyed by period; works on Series and DataFrames alike."""
+    conversion_line = (highs[conversion_line_period] + lows[conversion_line_period]) / 2
+    base_line = (highs[base_line_period] + lows[base_line_period]) / 2
+    return {
+        # Tenkan-sen (Conversion Line)
+        'conversion_line': conversion_line,
+        # Kijun-sen (Base Line)
+        'base_line': base_line,
+        # Senkou Span A
+        'leading_span_a': ((conversion_line + base_line) / 2).shift(base_line_period),
+        # Senkou Span B
+        'leading_span_b': ((highs[leading_span_b_period] + lows[leading_span_b_period]) / 2).shift(base_line_period),
+        # Lagging Span
+        'lagging_span': close.shift(-lagging_span_period),
+    }
 
 def calculate_ichimoku_cloud(data: pd.DataFrame, 
                               conversion_line_period: int = CONVERSION_LINE_PERIOD,
@@ -12,6 +31,8 @@ def calculate_ichimoku_cloud(data: pd.DataFrame,
                               lagging_span_period: int = LAGGING_SPAN_PERIOD) -> pd.DataFrame:
     """
     Calculate the Ichimoku Cloud components.
+
+    The rolling highs and lows of all three periods are computed in one pass.
     
     Args:
         data (pd.DataFrame): DataFrame with 'high' and 'low' price columns.
@@ -23,30 +44,36 @@ def calculate_ichimoku_cloud(data: pd.DataFrame,
     Returns:
         pd.DataFrame: DataFrame with Ichimoku Cloud components.
     """
-    ichimoku = pd.DataFrame(index=data.index)
-    
-    # Tenkan-sen (Conversion Line)
-    period_high = data['high'].rolling(window=conversion_line_period).max()
-    period_low = data['low'].rolling(window=conversion_line_period).min()
-    ichimoku['conversion_line'] = (period_high + period_low) / 2
-    
-    # Kijun-sen (Base Line)
-    period_high26 = data['high'].rolling(window=base_line_period).max()
-    period_low26 = data['low'].rolling(window=base_line_period).min()
-    ichimoku['base_line'] = (period_high26 + period_low26) / 2
-    
-    # Senkou Span A
-    ichimoku['leading_span_a'] = ((ichimoku['conversion_line'] + ichimoku['base_line']) / 2).shift(base_line_period)
-    
-    # Senkou Span B
-    period_high52 = data['high'].rolling(window=leading_span_b_period).max()
-    period_low52 = data['low'].rolling(window=leading_span_b_period).min()
-    ichimoku['leading_span_b'] = ((period_high52 + period_low52) / 2).shift(base_line_period)
-    
-    # Lagging Span
-    ichimoku['lagging_span'] = data['close'].shift(-lagging_span_period)
-    
-    return ichimoku
+    periods = [conversion_line_period, base_line_period, leading_span_b_period]
+    highs = rolling_max_many(data['high'], periods)
+    lows = rolling_min_many(data['low'], periods)
+    components = _ichimoku_components(highs, lows, data['close'], conversion_line_period, base_line_period,
+                                      leading_span_b_period, lagging_span_period)
+    return pd.DataFrame(components, index=data.index)
+
+def calculate_ichimoku_cloud_universe(high: pd.DataFrame, low: pd.DataFrame, close: pd.DataFrame,
+                                      conversion_line_period: int = CONVERSION_LINE_PERIOD,
+                                      base_line_period: int = BASE_LINE_PERIOD,
+                                      leading_span_b_period: int = LEADING_SPAN_B_PERIOD,
+                                      lagging_span_period: int = LAGGING_SPAN_PERIOD) -> dict:
+    """
+    Calculate the Ichimoku Cloud components of many symbols at once.
+
+    Args:
+        high, low, close (pd.DataFrame): Prices with one column per symbol and a shared index.
+        conversion_line_period, base_line_period, leading_span_b_period, lagging_span_period (int):
+            Periods as in calculate_ichimoku_cloud.
+
+    Returns:
+        dict: Component name -> DataFrame with one column per symbol.
+    """
+    periods = [conversion_line_period, base_line_period, leading_span_b_period]
+    highs = {period: pd.DataFrame(values, index=high.index, columns=high.columns)
+             for period, values in rolling_extrema(high.to_numpy(dtype=float), periods, 'max').items()}
+    lows = {period: pd.DataFrame(values, index=low.index, columns=low.columns)
+            for period, values in rolling_extrema(low.to_numpy(dtype=float), periods, 'min').items()}
+    return _ichimoku_components(highs, lows, close, conversion_line_period, base_line_period,
+                                leading_span_b_period, lagging_span_period)
 
 def ichimoku_cloud_strategy(data: pd.DataFrame) -> pd.DataFrame:
     """
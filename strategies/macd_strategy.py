@@ -1,15 +1,17 @@
 import pandas as pd
 import numpy as np
-from config import MACD_FAST, MACD_SLOW, MACD_SIGNAL, INITIAL_CAPITAL
+from config import MACD_FAST, MACD_SLOW, MACD_SIGNAL, INITIAL_CAPITAL, COMPACT_CHUNK_ROWS
+from backtesting.signals import compact_frame, compact_signals, diff_orders, order_equity, signal_orders
+from utils.indicators import ewm_mean
 
-def calculate_macd(data, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+def calculate_macd(data, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL, cache=None):
     """
     Calculate MACD and signal line.
     """
-    exp1 = data['Close'].ewm(span=fast, adjust=False).mean()
-    exp2 = data['Close'].ewm(span=slow, adjust=False).mean()
+    exp1 = ewm_mean(data['Close'], fast, cache=cache)
+    exp2 = ewm_mean(data['Close'], slow, cache=cache)
     macd = exp1 - exp2
-    signal_line = macd.ewm(span=signal, adjust=False).mean()
+    signal_line = ewm_mean(macd, signal, cache=cache)
     
     return macd, signal_line
 
@@ -41,7 +43,43 @@ def macd_strategy(data, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
 
     return signals
 
-def execute_macd_strategy(data, initial_capital=INITIAL_CAPITAL, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+class _ChunkedEWM:
+    """prices.ewm(span=span, adjust=False).mean() over consecutive chunks, the same as in one call."""
+
+    def __init__(self, span):
+        self.span = span
+        # The last mean, then the missing values after it, whose decay the next chunk continues
+        self.head = np.empty(0)
+
+    def mean(self, values):
+        values = np.concatenate((self.head, values))
+        mean = pd.Series(values).ewm(span=self.span, adjust=False).mean().to_numpy()
+        observed = np.flatnonzero(~np.isnan(values))
+        skip = len(self.head)
+        if len(observed):
+            self.head = np.concatenate((mean[observed[-1]:observed[-1] + 1], values[observed[-1] + 1:]))
+        return mean[skip:]
+
+def _execute_compact(data, initial_capital, fast, slow, signal, float_dtype):
+    """Memory-lean executor: only the columns calculate_metrics needs, built chunk by chunk as small arrays."""
+    if len(data) < max(fast, slow, signal):
+        return compact_signals(execute_macd_strategy(data, initial_capital, fast, slow, signal), float_dtype)
+
+    price = data['Close'].to_numpy(dtype=float)
+    orders = np.empty(len(price), dtype=np.int8)
+    fast_ewm, slow_ewm, signal_ewm = _ChunkedEWM(fast), _ChunkedEWM(slow), _ChunkedEWM(signal)
+    for start in range(0, len(price), COMPACT_CHUNK_ROWS):
+        chunk = price[start:start + COMPACT_CHUNK_ROWS]
+        macd = fast_ewm.mean(chunk) - slow_ewm.mean(chunk)
+        signal_line = signal_ewm.mean(macd)
+        orders[start:start + len(chunk)] = signal_orders(macd > signal_line, macd <= signal_line)
+
+    return compact_frame(data.index, {'price': price, 'signal': orders, 'positions': diff_orders(orders),
+                                      'cumulative_strategy_returns': order_equity(price, orders, initial_capital)},
+                         float_dtype)
+
+def execute_macd_strategy(data, initial_capital=INITIAL_CAPITAL, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL,
+                          compact=False, float_dtype=None):
     """
     Execute the MACD strategy and calculate returns.
     
@@ -50,8 +88,14 @@ def execute_macd_strategy(data, initial_capital=INITIAL_CAPITAL, fast=MACD_FAST,
     :param fast: Fast MACD window
     :param slow: Slow MACD window
     :param signal: Signal line window
+    :param compact: Build only the columns of backtesting.signals.compact_signals, with int8 orders, chunk by
+                    chunk, so peak memory is several times lower
+    :param float_dtype: With compact, optional dtype such as 'float32' for prices
     :return: DataFrame with strategy performance
     """
+    if compact:
+        return _execute_compact(data, initial_capital, fast, slow, signal, float_dtype)
+
     signals = macd_strategy(data, fast, slow, signal)
 
     # Ensure 'positions' is initialized correctly
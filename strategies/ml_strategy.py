@@ -1,11 +1,20 @@
 # strategies/ml_strategy.py
 
+import hashlib
+import os
+
+import joblib
 import numpy as np
 import pandas as pd
+import sklearn
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from utils.indicators import calculate_rsi
+from config import ML_N_JOBS, ML_TRAIN_SIZE, ML_RETRAIN_EVERY, ML_MODEL_CACHE_DIR
+from utils.indicators import calculate_rsi, fingerprint, rolling_mean
+
+FEATURES = ['Returns', 'MA5', 'MA20', 'RSI']
+WALK_FORWARD_MODES = ('sliding', 'expanding')
 
 def feature_engineering(data, lookback=30):
     """
@@ -15,23 +24,25 @@ def feature_engineering(data, lookback=30):
         raise ValueError(f"Not enough data. Required: >{lookback}, Provided: {len(data)}")
 
     data['Returns'] = data['Close'].pct_change()
-    data['MA5'] = data['Close'].rolling(window=5).mean()
-    data['MA20'] = data['Close'].rolling(window=20).mean()
+    data['MA5'] = rolling_mean(data['Close'], 5)
+    data['MA20'] = rolling_mean(data['Close'], 20)
     data['RSI'] = calculate_rsi(data['Close'], window=14)
     
     # Drop NaN values
     data.dropna(inplace=True)
     return data
 
-def train_model(X_train, y_train, n_estimators=100):
+def train_model(X_train, y_train, n_estimators=100, n_jobs=ML_N_JOBS):
     """
     Train a Random Forest model.
+
+    :param n_jobs: Cores used to grow the trees, None for one and -1 for all of them
     """
-    model = RandomForestClassifier(n_estimators=n_estimators, random_state=42)
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=42, n_jobs=n_jobs)
     model.fit(X_train, y_train)
     return model
 
-def ml_strategy(data, lookback=30, test_size=0.2, n_estimators=100):
+def ml_strategy(data, lookback=30, test_size=0.2, n_estimators=100, n_jobs=ML_N_JOBS):
     """
     Execute the machine learning strategy.
     """
@@ -39,7 +50,7 @@ def ml_strategy(data, lookback=30, test_size=0.2, n_estimators=100):
     data = feature_engineering(data, lookback)
 
     # Create features and target
-    X = data[['Returns', 'MA5', 'MA20', 'RSI']].values
+    X = data[FEATURES].values
     y = (data['Close'].shift(-1) > data['Close']).astype(int).values
     
     # Ensure X and y have the same length
@@ -58,7 +69,7 @@ def ml_strategy(data, lookback=30, test_size=0.2, n_estimators=100):
     X_test_scaled = scaler.transform(X_test)
     
     # Train the model
-    model = train_model(X_train_scaled, y_train, n_estimators)
+    model = train_model(X_train_scaled, y_train, n_estimators, n_jobs)
     
     # Make predictions
     predictions = model.predict(X_test_scaled)
@@ -70,4 +81,115 @@ def ml_strategy(data, lookback=30, test_size=0.2, n_estimators=100):
     results['Returns'] = np.log(results['Close'] / results['Close'].shift(1))
     results['Strategy_Returns'] = results['Position'] * results['Returns']
     
-    return results
\ No newline at end of file
+    return results
+
+def walk_forward_windows(n, train_size=ML_TRAIN_SIZE, retrain_every=ML_RETRAIN_EVERY, mode='expanding'):
+    """
+    Split n rows into walk-forward windows.
+
+    :param n: Number of rows
+    :param train_size: Rows in the first training window, and in every window for mode='sliding'
+    :param retrain_every: Rows predicted by each model before it is retrained
+    :param mode: 'sliding' keeps train_size rows, 'expanding' trains on all rows so far
+    :return: List of (train_start, train_end, test_end) row positions, ends exclusive
+    """
+    if mode not in WALK_FORWARD_MODES:
+        raise ValueError(f"Unknown mode '{mode}'. Expected one of {WALK_FORWARD_MODES}")
+    if train_size <= 0 or retrain_every <= 0:
+        raise ValueError("train_size and retrain_every must be positive")
+
+    windows = []
+    for test_start in range(train_size, n, retrain_every):
+        train_start = test_start - train_size if mode == 'sliding' else 0
+        windows.append((train_start, test_start, min(test_start + retrain_every, n)))
+    return windows
+
+def _model_key(index, X_train, y_train, n_estimators):
+    """Cache key from the training date range, the training data and the hyperparameters."""
+    parts = (str(index[0]), str(index[-1]), fingerprint(X_train.ravel()), fingerprint(y_train),
+             n_estimators, 42, tuple(FEATURES), sklearn.__version__)
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+def _fit_window(X_train, y_train, n_estimators, n_jobs, path):
+    """Fit the scaler and forest of one window and store them at path."""
+    scaler = StandardScaler()
+    model = train_model(scaler.fit_transform(X_train), y_train, n_estimators, n_jobs)
+    if path is not None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump((scaler, model), tmp_path)
+        os.replace(tmp_path, path)
+    return scaler, model
+
+def walk_forward_ml_strategy(data, lookback=30, train_size=ML_TRAIN_SIZE, retrain_every=ML_RETRAIN_EVERY,
+                             mode='expanding', n_estimators=100, workers=None, n_jobs=None,
+                             cache_dir=ML_MODEL_CACHE_DIR):
+    """
+    Execute the machine learning strategy with walk-forward retraining.
+
+    A new model is trained every retrain_every rows on the rows before it and
+    predicts the following rows. Windows are trained in parallel and fitted
+    models are cached on disk, so re-running only trains new or changed windows.
+
+    :param data: DataFrame with 'Close' price column
+    :param lookback: Minimum number of rows required
+    :param train_size: Rows in the first training window, and in every window for mode='sliding'
+    :param retrain_every: Rows predicted by each model before it is retrained
+    :param mode: 'sliding' or 'expanding' training windows
+    :param n_estimators: Trees per forest
+    :param workers: Processes training windows in parallel, defaults to one per core
+    :param n_jobs: Cores per forest, defaults to the cores divided among the workers
+    :param cache_dir: Directory of the model cache, None disables caching
+    :return: DataFrame of the out-of-sample rows with 'Signal', 'Position', 'Returns',
+             'Strategy_Returns' and the 'Window' that predicted each row
+    """
+    data = feature_engineering(data.copy(), lookback)
+
+    X = data[FEATURES].values[:-1]
+    y = (data['Close'].shift(-1) > data['Close']).astype(int).values[:-1]
+    windows = walk_forward_windows(len(X), train_size, retrain_every, mode)
+    if not windows:
+        raise ValueError(f"Not enough data. Required: >{train_size} rows after feature engineering, "
+                         f"Provided: {len(X)}")
+
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+    models = {}
+    to_train = []
+    for i, (train_start, train_end, _) in enumerate(windows):
+        X_train, y_train = X[train_start:train_end], y[train_start:train_end]
+        path = None
+        if cache_dir is not None:
+            key = _model_key(data.index[train_start:train_end], X_train, y_train, n_estimators)
+            path = os.path.join(cache_dir, f"{key}.joblib")
+            if os.path.exists(path):
+                models[i] = joblib.load(path)
+                continue
+        to_train.append((i, X_train, y_train, path))
+
+    if to_train:
+        cores = os.cpu_count() or 1
+        workers = min(workers or cores, len(to_train))
+        if n_jobs is None:
+            # workers x n_jobs must not exceed the cores, or the processes fight over them
+            n_jobs = max(1, cores // workers)
+        fitted = joblib.Parallel(n_jobs=workers)(
+            joblib.delayed(_fit_window)(X_train, y_train, n_estimators, n_jobs, path)
+            for _, X_train, y_train, path in to_train)
+        models.update((i, model) for (i, _, _, _), model in zip(to_train, fitted))
+
+    signal = np.empty(windows[-1][2] - windows[0][1], dtype=int)
+    window = np.empty(len(signal), dtype=int)
+    offset = windows[0][1]
+    for i, (_, test_start, test_end) in enumerate(windows):
+        scaler, model = models[i]
+        signal[test_start - offset:test_end - offset] = model.predict(scaler.transform(X[test_start:test_end]))
+        window[test_start - offset:test_end - offset] = i
+
+    results = data.iloc[offset:offset + len(signal)].copy()
+    results['Signal'] = signal
+    results['Window'] = window
+    results['Position'] = results['Signal'].shift(1)
+    results['Returns'] = np.log(results['Close'] / results['Close'].shift(1))
+    results['Strategy_Returns'] = results['Position'] * results['Returns']
+
+    return results
@@ -1,13 +1,17 @@
 import pandas as pd
 import numpy as np
 from config import MOVING_AVERAGE_SHORT_WINDOW, MOVING_AVERAGE_LONG_WINDOW, INITIAL_CAPITAL
+from backtesting.out_of_core import run_compact
+from backtesting.signals import compact_frame
+from utils.indicators import rolling_mean
 
-def calculate_moving_averages(data, short_window=MOVING_AVERAGE_SHORT_WINDOW, long_window=MOVING_AVERAGE_LONG_WINDOW):
+def calculate_moving_averages(data, short_window=MOVING_AVERAGE_SHORT_WINDOW, long_window=MOVING_AVERAGE_LONG_WINDOW,
+                              cache=None):
     """
     Calculate short and long moving averages.
     """
-    short_mavg = data['Close'].rolling(window=short_window, min_periods=1, center=False).mean()
-    long_mavg = data['Close'].rolling(window=long_window, min_periods=1, center=False).mean()
+    short_mavg = rolling_mean(data['Close'], short_window, min_periods=1, cache=cache)
+    long_mavg = rolling_mean(data['Close'], long_window, min_periods=1, cache=cache)
     return short_mavg, long_mavg
 
 def moving_average_crossover(data, short_window=MOVING_AVERAGE_SHORT_WINDOW, long_window=MOVING_AVERAGE_LONG_WINDOW):
@@ -30,7 +34,14 @@ def moving_average_crossover(data, short_window=MOVING_AVERAGE_SHORT_WINDOW, lon
 
     return signals
 
-def execute_moving_average_crossover_strategy(data, initial_capital=INITIAL_CAPITAL, short_window=MOVING_AVERAGE_SHORT_WINDOW, long_window=MOVING_AVERAGE_LONG_WINDOW):
+def _execute_compact(data, initial_capital, short_window, long_window, float_dtype):
+    """Memory-lean executor: only the columns calculate_metrics needs, built chunk by chunk as small arrays."""
+    columns = run_compact(data, 'moving_average_crossover', float_dtype=float_dtype, initial_capital=initial_capital,
+                          short_window=short_window, long_window=long_window)
+    return compact_frame(data.index, columns)
+
+def execute_moving_average_crossover_strategy(data, initial_capital=INITIAL_CAPITAL, short_window=MOVING_AVERAGE_SHORT_WINDOW, long_window=MOVING_AVERAGE_LONG_WINDOW,
+                                              compact=False, float_dtype=None):
     """
     Execute the Moving Average Crossover strategy and calculate returns.
     
@@ -38,8 +49,14 @@ def execute_moving_average_crossover_strategy(data, initial_capital=INITIAL_CAPI
     :param initial_capital: Initial capital for the strategy
     :param short_window: Short-term moving average window
     :param long_window: Long-term moving average window
+    :param compact: Build only the columns of backtesting.signals.compact_signals, with int8 orders, chunk by
+                    chunk (see backtesting.out_of_core.run_compact), so peak memory is several times lower
+    :param float_dtype: With compact, optional dtype such as 'float32' for prices
     :return: DataFrame with strategy performance
     """
+    if compact:
+        return _execute_compact(data, initial_capital, short_window, long_window, float_dtype)
+
     signals = moving_average_crossover(data, short_window, long_window)
 
     # Ensure 'positions' is initialized correctly
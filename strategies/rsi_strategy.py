@@ -1,24 +1,23 @@
 import pandas as pd
 import numpy as np
 from config import RSI_WINDOW, RSI_OVERBOUGHT, RSI_OVERSOLD, INITIAL_CAPITAL
+from backtesting.execution import execute
+from backtesting.out_of_core import run_compact
+from backtesting.signals import compact_frame, diff_orders
+from backtesting.stops import apply_stops, ohlc_arrays
+from utils import indicators
 
-def calculate_rsi(data: pd.DataFrame, period: int = RSI_WINDOW) -> pd.Series:
+def calculate_rsi(data: pd.DataFrame, period: int = RSI_WINDOW, cache=None) -> pd.Series:
     """
     Calculate the Relative Strength Index (RSI).
     
     :param data: DataFrame with 'Close' price column
     :param period: The period over which to calculate the RSI
+    :param cache: IndicatorCache to use, defaults to the shared cache
     :return: Series with RSI values
     """
-    delta = data['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    
-    # Avoid division by zero
-    rs = gain / loss.replace(0, np.nan)
-    rsi = 100 - (100 / (1 + rs))
-    
-    return rsi
+    # Avoid division by zero: no signal while the average loss is zero
+    return indicators.calculate_rsi(data['Close'], period, nan_on_zero_loss=True, cache=cache)
 
 def rsi_strategy(data: pd.DataFrame, period: int = RSI_WINDOW, 
                  overbought: float = RSI_OVERBOUGHT, oversold: float = RSI_OVERSOLD) -> pd.DataFrame:
@@ -47,35 +46,68 @@ def rsi_strategy(data: pd.DataFrame, period: int = RSI_WINDOW,
     
     return signals
 
+def _execute_compact(data, initial_capital, period, overbought, oversold, engine, stops, float_dtype):
+    """Memory-lean executor: only the columns calculate_metrics needs, built chunk by chunk as small arrays."""
+    params = dict(initial_capital=initial_capital, period=period, overbought=overbought, oversold=oversold)
+    if engine == 'vectorized' and not stops:
+        return compact_frame(data.index, run_compact(data, 'rsi', float_dtype=float_dtype, **params))
+
+    # Stops and the other engines go over the whole signal; missing prices are 0 like in rsi_strategy
+    columns = run_compact(data, 'rsi', ('price', 'signal', 'positions'), **params)
+    price, signal, positions = columns['price'], columns['signal'], columns['positions']
+    fill_price = price
+    if stops:
+        stopped = apply_stops(price, signal, **ohlc_arrays(data), **stops)
+        signal = stopped.orders.astype(np.int8)
+        positions = diff_orders(signal, first=0)
+        fill_price = stopped.fill_price
+
+    equity = execute(fill_price, signal, initial_capital, rule='signal', engine=engine).equity
+    equity[:1] = initial_capital
+    return compact_frame(data.index, {'price': price, 'signal': signal, 'positions': positions,
+                                      'cumulative_strategy_returns': equity}, float_dtype)
+
 def execute_rsi_strategy(data: pd.DataFrame, initial_capital: float = INITIAL_CAPITAL, 
                          period: int = RSI_WINDOW, overbought: float = RSI_OVERBOUGHT, 
-                         oversold: float = RSI_OVERSOLD) -> pd.DataFrame:
-    signals = rsi_strategy(data, period, overbought, oversold)
+                         oversold: float = RSI_OVERSOLD, engine: str = 'vectorized',
+                         stops: dict = None, compact: bool = False, float_dtype=None) -> pd.DataFrame:
+    """
+    Execute the RSI strategy and calculate returns.
 
-    signals['returns'] = data['Close'].pct_change().fillna(0) 
+    :param data: DataFrame with 'Close' price column
+    :param initial_capital: Initial capital for the strategy
+    :param period: The period over which to calculate the RSI
+    :param overbought: The overbought threshold
+    :param oversold: The oversold threshold
+    :param engine: Execution engine, 'vectorized' or the row-by-row 'loop'
+    :param stops: Optional backtesting.stops.apply_stops arguments, e.g. {'stop_loss': 0.05}; stop exits
+                  are added to the signal and their fills stored in the 'stop_price' column
+    :param compact: Build only the columns of backtesting.signals.compact_signals, with int8 orders, chunk by
+                    chunk (see backtesting.out_of_core.run_compact), so peak memory is several times lower
+    :param float_dtype: With compact, optional dtype such as 'float32' for prices
+    :return: DataFrame with strategy performance
+    """
+    if compact:
+        return _execute_compact(data, initial_capital, period, overbought, oversold, engine, stops, float_dtype)
 
-    shares = 0
-    capital = initial_capital
-    cumulative_returns = []
-    strategy_returns = []
+    signals = rsi_strategy(data, period, overbought, oversold)
 
-    for index, row in signals.iterrows():
-        total_value = capital + (shares * row['price']) if shares > 0 else capital
-        cumulative_returns.append(total_value)
+    signals['returns'] = data['Close'].pct_change().fillna(0) 
 
-        if row['signal'] == 1.0 and capital >= row['price']:  # Buy if sufficient capital
-            shares += capital // row['price']
-            capital -= shares * row['price']
-        
-        elif row['signal'] == -1.0:
-            capital += shares * row['price']
-            shares = 0
+    fill_price = signals['price'].to_numpy()
+    if stops:
+        stopped = apply_stops(fill_price, signals['signal'].to_numpy(), **ohlc_arrays(data), **stops)
+        signals['signal'] = stopped.orders
+        # Orders follow the stopped signal, so the stop exits count as trades
+        signals['positions'] = signals['signal'].diff().fillna(0)
+        signals['stop_price'] = stopped.stop_price
+        fill_price = stopped.fill_price
 
-        daily_return = (total_value - initial_capital) / initial_capital
-        strategy_returns.append(daily_return)
+    result = execute(fill_price, signals['signal'].to_numpy(),
+                     initial_capital, rule='signal', engine=engine)
 
-    signals['cumulative_returns'] = cumulative_returns
-    signals['strategy_returns'] = strategy_returns
-    signals['cumulative_strategy_returns'] = [initial_capital] + [total_value for total_value in cumulative_returns[1:]]
+    signals['cumulative_returns'] = result.equity
+    signals['strategy_returns'] = (result.equity - initial_capital) / initial_capital
+    signals['cumulative_strategy_returns'] = np.concatenate(([initial_capital], result.equity[1:]))
 
-    return signals
\ No newline at end of file
+    return signals
@@ -3,6 +3,11 @@
 import pandas as pd
 import numpy as np
 from config import STOCHASTIC_K_PERIOD, STOCHASTIC_D_PERIOD, STOCHASTIC_OVERBOUGHT, STOCHASTIC_OVERSOLD
+from utils.indicators import rolling_extrema, rolling_max_many, rolling_mean, rolling_min_many
+
+def _k_line(close, low_min, high_max):
+    k_line = 100 * (close - low_min) / (high_max - low_min)
+    return k_line.clip(0, 100)  # Ensure values are between 0 and 100
 
 def calculate_stochastic_oscillator(data, k_period=STOCHASTIC_K_PERIOD, d_period=STOCHASTIC_D_PERIOD):
     """
@@ -19,17 +24,62 @@ def calculate_stochastic_oscillator(data, k_period=STOCHASTIC_K_PERIOD, d_period
     if len(data) < max(k_period, d_period):
         raise ValueError("Not enough data to calculate")
 
-    low_min = data['low'].rolling(window=k_period, min_periods=1).min()
-    high_max = data['high'].rolling(window=k_period, min_periods=1).max()
+    return calculate_stochastic_oscillator_sweep(data, [k_period], d_period)[k_period]
+
+def calculate_stochastic_oscillator_sweep(data, k_periods, d_period=STOCHASTIC_D_PERIOD):
+    """
+    Calculate the Stochastic Oscillator for several %K periods at once.
 
-    # Calculate %K
-    k_line = 100 * (data['close'] - low_min) / (high_max - low_min)
-    k_line = k_line.clip(0, 100)  # Ensure values are between 0 and 100
+    The rolling lows and highs of all periods come from one pass over the data.
 
-    # Calculate %D
-    d_line = k_line.rolling(window=d_period, min_periods=1).mean()
+    :param data: DataFrame with 'high', 'low', and 'close' price columns
+    :param k_periods: The periods for %K line
+    :param d_period: The period for %D line (signal line)
+    :return: Dict of k_period -> DataFrame with %K and %D values
+    """
+    if data.empty:
+        raise ValueError("Input data is empty")
+
+    if len(data) < max(max(k_periods), d_period):
+        raise ValueError("Not enough data to calculate")
+
+    low_mins = rolling_min_many(data['low'], k_periods, min_periods=1)
+    high_maxes = rolling_max_many(data['high'], k_periods, min_periods=1)
+
+    result = {}
+    for k_period in low_mins:
+        # Calculate %K
+        k_line = _k_line(data['close'], low_mins[k_period], high_maxes[k_period])
 
-    return pd.DataFrame({'%K': k_line, '%D': d_line})
+        # Calculate %D
+        d_line = rolling_mean(k_line, d_period, min_periods=1)
+
+        result[k_period] = pd.DataFrame({'%K': k_line, '%D': d_line})
+    return result
+
+def calculate_stochastic_oscillator_universe(high, low, close, k_period=STOCHASTIC_K_PERIOD,
+                                             d_period=STOCHASTIC_D_PERIOD):
+    """
+    Calculate the Stochastic Oscillator of many symbols at once.
+
+    :param high: DataFrame of high prices, one column per symbol
+    :param low: DataFrame of low prices with the same index and columns
+    :param close: DataFrame of close prices with the same index and columns
+    :param k_period: The period for %K line
+    :param d_period: The period for %D line (signal line)
+    :return: Dict with '%K' and '%D' DataFrames, one column per symbol
+    """
+    if close.empty:
+        raise ValueError("Input data is empty")
+
+    if len(close) < max(k_period, d_period):
+        raise ValueError("Not enough data to calculate")
+
+    low_min = rolling_extrema(low.to_numpy(dtype=float), [k_period], 'min', min_periods=1)[k_period]
+    high_max = rolling_extrema(high.to_numpy(dtype=float), [k_period], 'max', min_periods=1)[k_period]
+    k_line = _k_line(close, low_min, high_max)
+    d_line = k_line.rolling(window=d_period, min_periods=1).mean()
+    return {'%K': k_line, '%D': d_line}
 
 def stochastic_oscillator_strategy(data, k_period=STOCHASTIC_K_PERIOD, d_period=STOCHASTIC_D_PERIOD, overbought=STOCHASTIC_OVERBOUGHT, oversold=STOCHASTIC_OVERSOLD):
     """
@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import pandas as pd
+import numpy as np
+from backtesting.backtest import Backtest
+from strategies.bollinger_bands import bollinger_bands, execute_bollinger_bands_strategy
+from strategies.moving_average_crossover import execute_moving_average_crossover_strategy
+
+def create_symbol_frames(num_symbols=4, periods=300):
+    """Generate sample price data for several symbols."""
+    frames = {}
+    for i in range(num_symbols):
+        rng = np.random.default_rng(i)
+        dates = pd.date_range(start='2020-01-01', periods=periods, freq='D')
+        prices = np.maximum(rng.normal(0, 2, periods).cumsum() + 100, 1)
+        frames[f'SYM{i}'] = pd.DataFrame({'Close': prices}, index=dates)
+    return frames
+
+def test_run_many_matches_single_runs():
+    frames = create_symbol_frames()
+
+    table = Backtest.run_many(frames, execute_bollinger_bands_strategy, workers=2)
+
+    assert list(table.index) == list(frames)
+    assert table['error'].isnull().all()
+    for symbol, data in frames.items():
+        backtest = Backtest(data, execute_bollinger_bands_strategy)
+        expected = backtest.calculate_metrics(backtest.run())
+        for key, value in expected.items():
+            assert table.loc[symbol, key] == pytest.approx(value, nan_ok=True)
+
+def test_iter_run_many_streams_every_symbol():
+    frames = create_symbol_frames()
+
+    results = list(Backtest.iter_run_many(frames.items(), execute_moving_average_crossover_strategy, workers=1))
+
+    assert sorted(symbol for symbol, _ in results) == sorted(frames)
+    assert all('sharpe_ratio' in metrics for _, metrics in results)
+
+def test_run_many_reports_failures():
+    frames = create_symbol_frames(num_symbols=2)
+
+    # bollinger_bands only generates signals, so metrics cannot be computed
+    table = Backtest.run_many(frames, bollinger_bands, workers=1)
+
+    assert table['error'].str.contains('cumulative_strategy_returns').all()
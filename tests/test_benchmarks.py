@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import pytest
+from benchmarks.run_benchmarks import CASES, compare, main, measure_imports, parse_size, run_suite
+
+def test_parse_size():
+    assert parse_size('1000') == 1000
+    assert parse_size('10k') == 10_000
+    assert parse_size('10M') == 10_000_000
+    assert parse_size('2.5k') == 2500
+
+def test_run_suite_records_every_case():
+    results = run_suite([500], cases=['rsi', 'execute_vectorized', 'calculate_metrics'], repeat=1, log=None)
+
+    assert [row['case'] for row in results['results']] == ['rsi', 'execute_vectorized', 'calculate_metrics']
+    for row in results['results']:
+        assert row['bars'] == 500
+        assert row['seconds'] > 0
+        assert row['bars_per_sec'] == pytest.approx(500 / row['seconds'])
+        assert row['peak_bytes'] > 0
+    assert 'pandas' in results['meta']
+
+def test_run_suite_skips_sizes_above_case_limit():
+    limited = [case for case in CASES if case.max_bars is not None]
+    assert limited
+
+    results = run_suite([limited[0].max_bars + 1], cases=[limited[0].name], repeat=1, log=None)
+    assert results['results'] == []
+
+def test_run_suite_rejects_unknown_case():
+    with pytest.raises(ValueError):
+        run_suite([100], cases=['nope'], log=None)
+
+def test_compare_flags_regressions():
+    baseline = {'results': [
+        {'case': 'rsi', 'bars': 1000, 'seconds': 1.0, 'peak_bytes': 100},
+        {'case': 'macd', 'bars': 1000, 'seconds': 1.0, 'peak_bytes': 100},
+    ]}
+    results = {'results': [
+        {'case': 'rsi', 'bars': 1000, 'seconds': 1.2, 'peak_bytes': 100},
+        {'case': 'macd', 'bars': 1000, 'seconds': 1.0, 'peak_bytes': 400},
+        {'case': 'bollinger_bands', 'bars': 1000, 'seconds': 1.0, 'peak_bytes': 100},
+    ]}
+
+    rows = compare(results, baseline, threshold=1.5)
+
+    assert [(row['case'], row['regression']) for row in rows] == [('rsi', False), ('macd', True)]
+    assert rows[0]['time_ratio'] == pytest.approx(1.2)
+
+def test_main_writes_json_and_fails_on_regression(tmp_path):
+    output = tmp_path / 'results.json'
+    assert main(['--sizes', '300', '--cases', 'rsi', '--repeat', '1', '--output', str(output)]) == 0
+    results = json.loads(output.read_text())
+    assert results['results'][0]['case'] == 'rsi'
+
+    # A baseline that was impossibly fast turns the run into a regression
+    results['results'][0]['seconds'] = 1e-12
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps(results))
+    assert main(['--sizes', '300', '--cases', 'rsi', '--repeat', '1', '--compare', str(baseline)]) == 1
+
+def test_measure_imports_reports_time_and_heavy_modules():
+    rows = measure_imports(['strategies.rsi_strategy', 'backtesting.sweep', 'utils.data_fetcher'], repeat=1, log=None)
+
+    assert [row['case'] for row in rows] == ['import strategies.rsi_strategy', 'import backtesting.sweep',
+                                             'import utils.data_fetcher']
+    for row in rows:
+        assert row['seconds'] > 0
+        # Strategies and sweeps must not pay for sklearn, scipy, yfinance or the GUI
+        assert row['heavy_modules'] == []
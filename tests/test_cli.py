@@ -0,0 +1,127 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import subprocess
+import pytest
+import pandas as pd
+import numpy as np
+import cli
+from cli import EXIT_FAILED, EXIT_INVALID, EXIT_OK, load_jobs, main
+from utils.synthetic_data import generate_ohlcv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def files(tmp_path):
+    """Two daily OHLCV CSV files, so no job needs the network."""
+    paths = {}
+    for seed, symbol in enumerate(['AAA', 'BBB']):
+        path = tmp_path / f"{symbol}.csv"
+        generate_ohlcv(400, start='2021-01-01', freq='D', seed=seed).rename_axis('Date').to_csv(path)
+        paths[symbol] = str(path)
+    return paths
+
+def write_spec(tmp_path, spec):
+    path = tmp_path / 'jobs.json'
+    path.write_text(json.dumps(spec))
+    return str(path)
+
+def test_load_jobs_expands_symbols_and_applies_defaults(files):
+    tasks = load_jobs({
+        'defaults': {'start': '2021-02-01', 'end': '2021-12-31'},
+        'jobs': [
+            {'name': 'ma', 'strategy': 'moving_average_crossover', 'files': files},
+            {'strategy': 'rsi', 'symbols': ['XYZ'], 'params': {'period': 10}, 'end': '2021-06-30'},
+        ],
+    })
+    assert [(task['job'], task['symbol']) for task in tasks] == [('ma', 'AAA'), ('ma', 'BBB'), ('rsi', 'XYZ')]
+    assert tasks[0]['file'] == files['AAA'] and tasks[2]['file'] is None
+    assert tasks[2]['params'] == {'period': 10}
+    assert tasks[2]['start'] == '2021-02-01' and tasks[2]['end'] == '2021-06-30'
+
+@pytest.mark.parametrize('spec', [
+    [],
+    {'jobs': [{'strategy': 'unknown', 'symbols': ['AAA']}]},
+    {'jobs': [{'strategy': 'rsi'}]},
+    {'jobs': [{'strategy': 'rsi', 'symbols': ['AAA'], 'windw': 5}]},
+    {'jobs': [{'strategy': 'rsi', 'symbols': ['AAA'], 'params': [5]}]},
+])
+def test_load_jobs_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        load_jobs(spec)
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_main_writes_metrics_and_signals(tmp_path, files, workers):
+    spec = write_spec(tmp_path, {'jobs': [
+        {'name': 'ma', 'strategy': 'moving_average_crossover', 'files': files,
+         'params': {'short_window': 10, 'long_window': 30}},
+        {'name': 'bb', 'strategy': 'bollinger_bands', 'files': {'AAA': files['AAA']}, 'engine': 'loop',
+         'start': '2021-03-01', 'end': '2021-12-31'},
+    ]})
+    output = tmp_path / 'out'
+
+    assert main([spec, '--output', str(output), '--workers', str(workers), '--quiet']) == EXIT_OK
+
+    metrics = pd.read_csv(output / 'metrics.csv')
+    assert list(metrics[['job', 'symbol']].itertuples(index=False, name=None)) == [('ma', 'AAA'), ('ma', 'BBB'),
+                                                                                  ('bb', 'AAA')]
+    assert metrics['error'].isna().all()
+    assert np.isfinite(metrics['total_return']).all()
+    signals = pd.read_csv(output / 'signals' / 'bb' / 'AAA.csv', index_col=0, parse_dates=True)
+    assert signals.index[0] >= pd.Timestamp('2021-03-01') and signals.index[-1] <= pd.Timestamp('2021-12-31')
+    assert (output / 'signals' / 'ma' / 'BBB.csv').exists()
+
+def test_main_matches_an_in_process_backtest(tmp_path, files):
+    from backtesting.backtest import Backtest
+    from strategies.rsi_strategy import execute_rsi_strategy
+    spec = write_spec(tmp_path, {'strategy': 'rsi', 'files': {'AAA': files['AAA']}, 'signals': False,
+                                 'start': '2021-01-01', 'end': '2022-12-31'})
+
+    assert main([spec, '-o', str(tmp_path / 'out'), '-w', '1', '-q']) == EXIT_OK
+
+    row = pd.read_csv(tmp_path / 'out' / 'metrics.csv').iloc[0]
+    data = pd.read_csv(files['AAA'], index_col=0, parse_dates=True)
+    backtest = Backtest(data, execute_rsi_strategy)
+    expected = backtest.calculate_metrics(backtest.run())
+    assert row['total_return'] == pytest.approx(expected['total_return'])
+    assert row['num_trades'] == expected['num_trades']
+    assert not (tmp_path / 'out' / 'signals').exists()
+
+def test_failed_runs_are_reported_with_exit_code_one(tmp_path, files):
+    spec = write_spec(tmp_path, {'strategy': 'macd', 'files': {'AAA': files['AAA'],
+                                                               'MISSING': str(tmp_path / 'missing.csv')}})
+
+    assert main([spec, '-o', str(tmp_path / 'out'), '-w', '1', '-q']) == EXIT_FAILED
+
+    metrics = pd.read_csv(tmp_path / 'out' / 'metrics.csv').set_index('symbol')
+    assert pd.isna(metrics.loc['AAA', 'error'])
+    assert 'FileNotFoundError' in metrics.loc['MISSING', 'error']
+
+def test_empty_date_range_is_a_failure_not_sample_data(tmp_path, files):
+    spec = write_spec(tmp_path, {'strategy': 'rsi', 'files': {'AAA': files['AAA']},
+                                 'start': '2030-01-01', 'end': '2030-12-31'})
+
+    assert main([spec, '-o', str(tmp_path / 'out'), '-w', '1', '-q']) == EXIT_FAILED
+    assert 'No data' in pd.read_csv(tmp_path / 'out' / 'metrics.csv')['error'][0]
+
+def test_invalid_spec_exits_with_two(tmp_path, capsys):
+    bad = tmp_path / 'bad.json'
+    bad.write_text('{"jobs": [')
+
+    assert main([str(bad), '-o', str(tmp_path / 'out')]) == EXIT_INVALID
+    assert main([str(tmp_path / 'absent.json'), '-o', str(tmp_path / 'out')]) == EXIT_INVALID
+    assert 'Invalid job spec' in capsys.readouterr().err
+    assert not (tmp_path / 'out').exists()
+
+def test_cli_runs_without_gui_packages(tmp_path, files):
+    spec = write_spec(tmp_path, {'strategy': 'bollinger_bands', 'files': {'AAA': files['AAA']}})
+    script = (
+        "import sys, cli\n"
+        f"code = cli.main([{spec!r}, '-o', {str(tmp_path / 'out')!r}, '-w', '1', '-q'])\n"
+        "loaded = [name for name in ('streamlit', 'plotly') if name in sys.modules]\n"
+        "sys.exit(3 if loaded else code)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == EXIT_OK, result.stderr
+    assert 'Ran 1 backtests' in result.stdout
@@ -0,0 +1,125 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import pandas as pd
+import numpy as np
+from utils.data_cache import DataCache
+
+class LocalSource:
+    """Stand-in for Yahoo Finance that serves a fixed daily history and records every request."""
+
+    def __init__(self):
+        dates = pd.bdate_range(start='2000-01-01', end='2024-12-31')
+        close = np.random.default_rng(0).normal(0, 1, len(dates)).cumsum() + 100
+        self.history = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1,
+                                     'Close': close, 'Volume': np.arange(len(dates), dtype=float)},
+                                    index=dates)
+        self.calls = []
+
+    def __call__(self, symbol, start, end):
+        self.calls.append((symbol, pd.Timestamp(start), pd.Timestamp(end)))
+        return self.history[(self.history.index >= start) & (self.history.index < end)]
+
+@pytest.fixture
+def source():
+    return LocalSource()
+
+def test_repeated_load_hits_disk_only(tmp_path, source):
+    cache = DataCache(source, cache_dir=str(tmp_path))
+
+    first = cache.get('AAPL', '2004-01-01', '2024-01-01')
+    second = cache.get('AAPL', '2004-01-01', '2024-01-01')
+
+    assert len(source.calls) == 1
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+    assert os.path.exists(cache.path('AAPL'))
+
+def test_wider_range_fetches_only_missing_head_and_tail(tmp_path, source):
+    cache = DataCache(source, cache_dir=str(tmp_path))
+    cache.get('AAPL', '2010-01-01', '2012-01-01')
+
+    data = cache.get('AAPL', '2009-01-01', '2013-01-01')
+
+    assert source.calls[1:] == [('AAPL', pd.Timestamp('2009-01-01'), pd.Timestamp('2010-01-01')),
+                                ('AAPL', pd.Timestamp('2012-01-01'), pd.Timestamp('2013-01-01'))]
+    expected = source.history.loc['2009-01-01':'2012-12-31']
+    pd.testing.assert_frame_equal(data, expected, check_freq=False)
+
+def test_narrower_range_is_served_from_cache(tmp_path, source):
+    cache = DataCache(source, cache_dir=str(tmp_path))
+    cache.get('MSFT', '2010-01-01', '2015-01-01')
+
+    data = cache.get('MSFT', '2011-03-01', '2011-04-01')
+
+    assert len(source.calls) == 1
+    assert data.index.min() >= pd.Timestamp('2011-03-01')
+    assert data.index.max() < pd.Timestamp('2011-04-01')
+
+def test_lru_eviction(tmp_path, source):
+    cache = DataCache(source, cache_dir=str(tmp_path))
+    cache.get('A', '2000-01-01', '2010-01-01')
+    file_size = cache.size()
+    cache.max_bytes = int(file_size * 2.5)
+
+    cache.get('B', '2000-01-01', '2010-01-01')
+    os.utime(cache.path('A'), (0, 0))  # A is now the least recently used
+    cache.get('C', '2000-01-01', '2010-01-01')
+
+    assert not os.path.exists(cache.path('A'))
+    assert os.path.exists(cache.path('B'))
+    assert os.path.exists(cache.path('C'))
+    assert cache.size() <= cache.max_bytes
+
+def test_different_symbols_download_concurrently(tmp_path, source):
+    # Every download waits until four are in flight at once; a cache-wide lock would deadlock here
+    barrier = threading.Barrier(4, timeout=5)
+
+    def concurrent_source(symbol, start, end):
+        barrier.wait()
+        return source(symbol, start, end)
+
+    cache = DataCache(concurrent_source, cache_dir=str(tmp_path))
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        frames = list(pool.map(lambda symbol: cache.get(symbol, '2010-01-01', '2011-01-01'), ['A', 'B', 'C', 'D']))
+
+    assert all(len(frame) == len(frames[0]) > 0 for frame in frames)
+
+def test_same_symbol_is_downloaded_once(tmp_path, source):
+    cache = DataCache(source, cache_dir=str(tmp_path))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: cache.get('AAPL', '2010-01-01', '2011-01-01'), range(8)))
+
+    assert len(source.calls) == 1
+
+def test_empty_fetch_is_not_cached(tmp_path, source):
+    responses = [source.history.iloc[:0]]
+
+    def flaky_source(symbol, start, end):
+        return responses.pop() if responses else source(symbol, start, end)
+
+    cache = DataCache(flaky_source, cache_dir=str(tmp_path))
+    assert cache.get('AAPL', '2010-01-01', '2011-01-01').empty
+    assert not os.path.exists(cache.path('AAPL'))
+
+    data = cache.get('AAPL', '2010-01-01', '2011-01-01')
+    pd.testing.assert_frame_equal(data, source.history.loc['2010-01-01':'2010-12-31'], check_freq=False)
+
+def test_range_reaching_today_refetches_its_last_bar(tmp_path, source):
+    today = pd.Timestamp.now().normalize()
+    dates = pd.date_range(end=today, periods=30, freq='D')
+    source.history = pd.DataFrame({'Close': np.arange(30, dtype=float)}, index=dates)
+    cache = DataCache(source, cache_dir=str(tmp_path))
+    end = today + pd.Timedelta(days=30)
+
+    cache.get('AAPL', dates[0], end)
+    # Today's bar was still live; it moves and tomorrow's bar arrives
+    source.history.loc[today, 'Close'] = 100.0
+    source.history.loc[today + pd.Timedelta(days=1), 'Close'] = 101.0
+    data = cache.get('AAPL', dates[0], end)
+
+    assert source.calls[1] == ('AAPL', today, end)
+    assert list(data['Close'].iloc[-2:]) == [100.0, 101.0]
+    assert len(data) == 31
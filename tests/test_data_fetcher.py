@@ -0,0 +1,227 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+import pytest
+import pandas as pd
+import numpy as np
+from utils import data_fetcher
+from utils.data_cache import DataCache
+from utils.data_fetcher import FetchError, download_yahoo, fetch_data, fetch_many
+from utils.yahoo_client import PRICE_COLUMNS, YahooClient, parse_chart
+
+NOT_FOUND = {'chart': {'result': None, 'error': {'code': 'Not Found',
+                                                 'description': 'No data found, symbol may be delisted'}}}
+
+def chart_payload(symbol, period1, period2):
+    """Yahoo chart JSON of a deterministic daily history, with bars at the New York open."""
+    days = pd.bdate_range(pd.Timestamp(period1, unit='s').normalize(), pd.Timestamp(period2, unit='s'))
+    opens = days.tz_localize('America/New_York') + pd.Timedelta(hours=9, minutes=30)
+    stamps = [int(stamp.timestamp()) for stamp in opens if period1 <= stamp.timestamp() < period2]
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    close = 100 + rng.normal(0, 1, len(stamps)).cumsum()
+    return {'chart': {'result': [{
+        'meta': {'symbol': symbol, 'exchangeTimezoneName': 'America/New_York'},
+        'timestamp': stamps,
+        'indicators': {
+            'quote': [{'open': (close - 0.5).tolist(), 'high': (close + 1).tolist(), 'low': (close - 1).tolist(),
+                       'close': close.tolist(), 'volume': [1000] * len(stamps)}],
+            'adjclose': [{'adjclose': (close * 0.98).tolist()}],
+        },
+    }], 'error': None}}
+
+class ChartHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the Yahoo Finance chart API.
+
+    MISSING answers 404, DOWN always 503, FLAKY 503 twice then succeeds, LIMITED
+    429 once, SLOW takes a second; every other symbol gets a generated history.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        symbol = unquote(url.path.rsplit('/', 1)[-1])
+        query = parse_qs(url.query)
+        server = self.server
+        with server.lock:
+            server.requests.append(symbol)
+            server.connections.add(self.client_address)
+            count = server.requests.count(symbol)
+        time.sleep(server.latency)
+
+        if symbol == 'MISSING':
+            self.reply(404, NOT_FOUND)
+        elif symbol == 'DOWN' or (symbol == 'FLAKY' and count <= 2):
+            self.reply(503, {'error': 'unavailable'})
+        elif symbol == 'LIMITED' and count == 1:
+            self.reply(429, {'error': 'too many requests'}, {'Retry-After': '0'})
+        else:
+            if symbol == 'SLOW':
+                time.sleep(1)
+            self.reply(200, chart_payload(symbol, int(query['period1'][0]), int(query['period2'][0])))
+
+    def reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ChartHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.connections = set()
+    server.latency = 0.0
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v8/finance/chart/"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def client(server):
+    client = YahooClient(server.base_url, timeout=0.3, retries=2, backoff=0.01, max_connections=4)
+    yield client
+    client.close()
+
+def test_download_parses_daily_bars(client):
+    data = client.download('AAPL', '2024-01-01', '2024-02-01')
+
+    assert list(data.columns) == PRICE_COLUMNS
+    # Bars carry their New York session date, and the end date is exclusive
+    assert data.index[0] == pd.Timestamp('2024-01-01') and data.index[-1] == pd.Timestamp('2024-01-31')
+    assert len(data) == len(pd.bdate_range('2024-01-01', '2024-01-31'))
+    assert (data['High'] > data['Low']).all()
+    np.testing.assert_allclose(data['Adj Close'], data['Close'] * 0.98)
+
+def test_parse_chart_drops_empty_bars():
+    payload = chart_payload('AAPL', int(pd.Timestamp('2024-01-02').timestamp()),
+                            int(pd.Timestamp('2024-01-06').timestamp()))
+    quote = payload['chart']['result'][0]['indicators']['quote'][0]
+    for column in ('open', 'high', 'low', 'close'):
+        quote[column][1] = None
+
+    data = parse_chart(payload)
+
+    assert list(data.index) == [pd.Timestamp('2024-01-02'), pd.Timestamp('2024-01-04'), pd.Timestamp('2024-01-05')]
+    with pytest.raises(ValueError, match='delisted'):
+        parse_chart(NOT_FOUND)
+
+def test_retryable_errors_are_retried_with_backoff(server, client):
+    assert not client.download('FLAKY', '2024-01-01', '2024-01-10').empty
+    assert not client.download('LIMITED', '2024-01-01', '2024-01-10').empty
+    assert server.requests.count('FLAKY') == 3
+    assert server.requests.count('LIMITED') == 2
+
+    with pytest.raises(FetchError, match='HTTP 503.*gave up after 3 attempts'):
+        client.download('DOWN', '2024-01-01', '2024-01-10')
+    with pytest.raises(FetchError, match='ReadTimeout'):
+        client.download('SLOW', '2024-01-01', '2024-01-10')
+
+def test_client_errors_fail_without_retry(server, client):
+    with pytest.raises(FetchError) as error:
+        client.download('MISSING', '2024-01-01', '2024-01-10')
+
+    assert error.value.symbol == 'MISSING'
+    assert 'HTTP 404: No data found' in str(error.value)
+    assert server.requests.count('MISSING') == 1
+
+def test_fetch_many_reports_each_failure(server, client):
+    report = fetch_many(['AAPL', 'MISSING', 'MSFT', 'DOWN', 'AAPL'], '2024-01-01', '2024-03-01',
+                        max_workers=4, source=client.download)
+
+    assert list(report.data) == ['AAPL', 'MSFT']
+    assert set(report.errors) == {'MISSING', 'DOWN'}
+    assert 'delisted' in report.errors['MISSING']
+    assert server.requests.count('AAPL') == 1
+    assert not report.data['AAPL'].equals(report.data['MSFT'])
+
+def test_fetch_many_overlaps_round_trips_on_pooled_connections(server, client):
+    server.latency = 0.1
+    symbols = [f'SYM{i}' for i in range(48)]
+
+    start = time.perf_counter()
+    report = fetch_many(symbols, '2024-01-01', '2024-02-01', max_workers=4, source=client.download)
+    elapsed = time.perf_counter() - start
+
+    assert list(report.data) == symbols and not report.errors
+    # One at a time this takes 48 x 100 ms; four workers need about a quarter of that
+    assert elapsed < 48 * server.latency / 2
+    # Keep-alive connections are reused instead of opening one per request
+    assert len(server.connections) <= 4
+
+def test_fetch_data_raises_or_falls_back_visibly(server, client, tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(data_fetcher, '_default_cache', DataCache(client.download, cache_dir=str(tmp_path)))
+
+    assert len(fetch_data('AAPL', '2024-01-01', '2024-02-01')) == 23
+    with pytest.raises(FetchError, match='MISSING'):
+        fetch_data('MISSING', '2024-01-01', '2024-02-01')
+
+    with caplog.at_level('WARNING', logger='utils.data_fetcher'):
+        data = fetch_data('MISSING', '2024-01-01', '2024-02-01', sample_fallback=True)
+    assert not data.empty
+    assert 'delisted' in data.attrs['sample_data']
+    assert 'using sample data' in caplog.text
+
+def test_fetch_data_takes_an_optional_source(server, client):
+    data = fetch_data('AAPL', '2024-01-01', '2024-02-01', source=client.download)
+
+    assert len(data) == 23
+    assert server.requests.count('AAPL') == 1
+
+class FakeTicker:
+    """Stands in for yfinance.Ticker; failures holds the exceptions the next calls raise."""
+    failures = []
+    calls = 0
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def history(self, start, end, **kwargs):
+        FakeTicker.calls += 1
+        if FakeTicker.failures:
+            raise FakeTicker.failures.pop(0)
+        index = pd.date_range(start, end, freq='B', inclusive='left', tz='America/New_York', name='Date')
+        return pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1}, index=index)
+
+@pytest.fixture
+def fake_yfinance(monkeypatch):
+    yf = pytest.importorskip('yfinance')
+    monkeypatch.setattr(yf, 'Ticker', FakeTicker)
+    monkeypatch.setattr(FakeTicker, 'calls', 0)
+    monkeypatch.setattr(FakeTicker, 'failures', [])
+    return FakeTicker
+
+def test_download_yahoo_retries_yfinance_errors(fake_yfinance):
+    from yfinance.exceptions import YFRateLimitError, YFTickerMissingError
+    fake_yfinance.failures = [YFRateLimitError(), ConnectionError('reset')]
+
+    data = download_yahoo('AAPL', '2024-01-01', '2024-02-01', backoff=0)
+    assert fake_yfinance.calls == 3
+    assert len(data) == 23 and data.index.tz is None
+
+    fake_yfinance.failures = [YFRateLimitError()] * 3
+    with pytest.raises(FetchError, match='gave up after 3 attempts'):
+        download_yahoo('AAPL', '2024-01-01', '2024-02-01', retries=2, backoff=0)
+
+    fake_yfinance.calls = 0
+    fake_yfinance.failures = [YFTickerMissingError('MISSING', 'no timezone found')]
+    with pytest.raises(FetchError, match='MISSING'):
+        download_yahoo('MISSING', '2024-01-01', '2024-02-01', backoff=0)
+    assert fake_yfinance.calls == 1
@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import pandas as pd
+import numpy as np
+from utils.downsampling import aggregate_ohlc, lttb, signal_markers, visible_slice
+from utils.synthetic_data import generate_ohlcv
+
+def reference_lttb(x, y, threshold):
+    """Textbook bucket-by-bucket LTTB."""
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    kept = [0]
+    previous = 0
+    for i in range(threshold - 2):
+        start = int(np.floor(i * every)) + 1
+        end = int(np.floor((i + 1) * every)) + 1
+        next_end = min(int(np.floor((i + 2) * every)) + 1, n)
+        mean_x, mean_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[previous] - mean_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (mean_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        kept.append(previous)
+    kept.append(n - 1)
+    return np.array(kept)
+
+@pytest.fixture
+def data():
+    return generate_ohlcv(10_000, freq='min', seed=3)
+
+def test_lttb_matches_reference():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=10_007).cumsum()
+    x = np.arange(len(y), dtype=float)
+    np.testing.assert_array_equal(lttb(x, y, 500), reference_lttb(x, y, 500))
+
+def test_lttb_keeps_ends_and_extremes(data):
+    close = data['Close']
+    kept = lttb(close.index, close.to_numpy(), 200)
+    assert len(kept) == 200
+    assert kept[0] == 0 and kept[-1] == len(close) - 1
+    assert np.all(np.diff(kept) > 0)
+    # Peaks and troughs survive: the kept points span nearly the full price range
+    values = close.to_numpy()
+    assert np.ptp(values[kept]) >= 0.95 * np.ptp(values)
+
+def test_lttb_short_and_nan_input():
+    y = np.array([1.0, np.nan, 3.0, 2.0])
+    np.testing.assert_array_equal(lttb(np.arange(4), y, 10), [0, 2, 3])
+
+def test_aggregate_ohlc(data):
+    candles = aggregate_ohlc(data, 300)
+    assert len(candles) == 300
+    starts = data.index.get_indexer(candles.index)
+    ends = np.append(starts[1:], len(data))
+    for start, end, (_, candle) in list(zip(starts, ends, candles.iterrows()))[::37]:
+        bars = data.iloc[start:end]
+        assert candle['Open'] == bars['Open'].iloc[0]
+        assert candle['Close'] == bars['Close'].iloc[-1]
+        assert candle['High'] == bars['High'].max()
+        assert candle['Low'] == bars['Low'].min()
+        assert candle['Volume'] == pytest.approx(bars['Volume'].sum())
+    assert aggregate_ohlc(data, len(data)) is data
+
+def test_signal_markers_and_thinning():
+    index = pd.date_range('2021-01-01', periods=1000, freq='min')
+    positions = np.zeros(1000)
+    positions[::4] = 1
+    positions[2::4] = -1
+    signals = pd.DataFrame({'price': np.arange(1000.0), 'positions': positions}, index=index)
+
+    markers = signal_markers(signals)
+    assert len(markers['buy']) == 250 and len(markers['sell']) == 250
+    assert (markers['buy'].to_numpy() == np.arange(0, 1000, 4)).all()
+
+    thinned = signal_markers(signals, max_markers=50)
+    assert len(thinned['buy']) == 50 and len(thinned['sell']) == 50
+    assert thinned['buy'].index.isin(markers['buy'].index).all()
+
+def test_visible_slice(data):
+    window = visible_slice(data.index, data.index[100], data.index[250])
+    assert data.iloc[window].index[0] == data.index[100]
+    assert data.iloc[window].index[-1] == data.index[250]
+    assert visible_slice(data.index) == slice(0, len(data))
@@ -0,0 +1,172 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import pandas as pd
+import numpy as np
+from numpy.testing import assert_array_equal
+from backtesting.events import (EventEngine, orders_from_positions, trade_stats, ORDER_DTYPE, BUY, SELL,
+                                MARKET, LIMIT, STOP, FILLED, CANCELLED, REJECTED, PENDING)
+from backtesting.execution import execute
+from backtesting.backtest import Backtest
+from strategies.bollinger_bands import bollinger_bands, execute_bollinger_bands_strategy
+from strategies.rsi_strategy import execute_rsi_strategy
+
+def create_sample_data(n=500, seed=42):
+    """Generate sample price data for testing."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start='2020-01-01', periods=n, freq='D')
+    prices = np.maximum(rng.normal(0, 3, n).cumsum() + 100, 1)
+    return pd.DataFrame({'Close': prices}, index=dates)
+
+@pytest.mark.parametrize('seed', [0, 1, 2, 3])
+def test_event_engine_matches_vectorized_positions(seed):
+    data = create_sample_data(seed=seed)
+    data.iloc[10:13, 0] = np.nan
+    signals = bollinger_bands(data)
+    price = signals['price'].to_numpy()
+    positions = signals['positions'].to_numpy()
+
+    vectorized = execute(price, positions, rule='positions', engine='vectorized')
+    event = execute(price, positions, rule='positions', engine='event')
+
+    for field in ('cash', 'shares', 'equity'):
+        assert_array_equal(getattr(vectorized, field), getattr(event, field))
+    assert vectorized.trades is None
+    assert len(event.trades) > 0
+
+def test_market_order_fills_at_next_open():
+    close = np.array([10.0, 11.0, 12.0, 13.0])
+    open_ = np.array([9.5, 10.5, 11.5, 12.5])
+    orders = np.zeros(2, dtype=ORDER_DTYPE)
+    orders['bar'] = [0, 2]
+    orders['side'] = [BUY, SELL]
+    orders['type'] = MARKET
+    orders['quantity'] = [10.0, np.nan]
+    orders['price'] = np.nan
+
+    result = EventEngine(initial_capital=1000.0).run(close, open_, orders=orders)
+
+    assert_array_equal(result.fills['bar'], [1, 3])
+    assert_array_equal(result.fills['price'], [10.5, 12.5])
+    assert_array_equal(result.position, [0.0, 10.0, 10.0, 0.0])
+    assert_array_equal(result.equity, [1000.0, 1005.0, 1015.0, 1020.0])
+    assert_array_equal(result.orders['status'], [FILLED, FILLED])
+
+def test_limit_and_stop_orders():
+    close = np.array([100.0, 96.0, 94.0, 92.0, 88.0])
+    open_ = np.array([100.0, 97.0, 96.0, 93.0, 91.0])
+    high = open_ + 1
+    low = np.array([99.0, 95.5, 94.5, 91.0, 87.0])
+
+    def on_bar(engine, bar):
+        if bar == 0:
+            engine.submit(BUY, 10, LIMIT, 95.0)
+        if bar == 2:
+            engine.submit(SELL, 10, STOP, 90.0)
+
+    result = EventEngine(initial_capital=10000.0).run(close, open_, high, low, on_bar=on_bar)
+
+    # The limit fills once the low reaches it, the stop once the low trades through it
+    assert_array_equal(result.fills['bar'], [2, 4])
+    assert_array_equal(result.fills['price'], [95.0, 90.0])
+    assert len(result.trades) == 1
+    trade = result.trades[0]
+    assert (trade['entry_bar'], trade['exit_bar'], trade['side']) == (2, 4, BUY)
+    assert trade['pnl'] == pytest.approx(-50.0)
+    assert trade['return_pct'] == pytest.approx(-50.0 / 950.0 * 100)
+
+def test_gap_through_limit_fills_at_open():
+    close = np.array([100.0, 90.0])
+    low = np.array([100.0, 89.0])
+
+    def on_bar(engine, bar):
+        if bar == 0:
+            engine.submit(BUY, 1, LIMIT, 95.0)
+
+    result = EventEngine().run(close, open_=np.array([100.0, 91.0]), low=low, on_bar=on_bar)
+
+    assert_array_equal(result.fills['price'], [91.0])
+
+def test_cancel_and_rejected_orders():
+    close = np.array([10.0, 11.0, 12.0])
+
+    def on_bar(engine, bar):
+        if bar == 0:
+            order_id = engine.submit(BUY, 1, LIMIT, 5.0)
+            assert engine.cancel(order_id)
+            assert not engine.cancel(order_id)
+            engine.submit(SELL)  # Nothing to sell
+
+    result = EventEngine().run(close, on_bar=on_bar)
+
+    assert_array_equal(result.orders['status'], [CANCELLED, REJECTED])
+    assert len(result.fills) == 0
+    assert_array_equal(result.equity, result.cash)
+
+def test_short_trade_and_flip():
+    close = np.array([100.0, 90.0, 95.0, 100.0])
+    orders = np.zeros(3, dtype=ORDER_DTYPE)
+    orders['bar'] = [0, 1, 2]
+    orders['side'] = [SELL, BUY, SELL]
+    orders['type'] = MARKET
+    orders['quantity'] = [10.0, 20.0, 10.0]
+    orders['price'] = np.nan
+
+    result = EventEngine(initial_capital=1000.0, fill_on='close', allow_short=True).run(close, orders=orders)
+
+    assert_array_equal(result.position, [-10.0, 10.0, 0.0, 0.0])
+    assert_array_equal(result.trades['side'], [SELL, BUY])
+    assert_array_equal(result.trades['pnl'], [100.0, 50.0])
+    assert result.equity[-1] == 1150.0
+
+def test_commission_is_charged_per_fill():
+    close = np.array([100.0, 110.0])
+    orders = orders_from_positions(np.array([1.0, -1.0]))
+
+    result = EventEngine(initial_capital=1010.0, commission=0.01, fill_on='close').run(close, orders=orders)
+
+    assert_array_equal(result.fills['quantity'], [10.0, 10.0])
+    assert result.fills['commission'].sum() == pytest.approx(10.0 + 11.0)
+    assert result.trades['pnl'][0] == pytest.approx(100.0 - 21.0)
+
+def test_records_are_compact_structured_arrays():
+    close = np.linspace(10, 20, 200_001)
+    positions = np.zeros(len(close))
+    positions[::2] = 1
+    positions[1::2] = -1
+
+    result = EventEngine(fill_on='close').run(close, orders=orders_from_positions(positions))
+
+    assert result.orders.dtype == ORDER_DTYPE
+    assert len(result.fills) == len(close)
+    assert len(result.trades) == len(close) // 2
+    assert not (result.orders['status'] == PENDING).any()
+
+def test_trade_stats():
+    close = np.array([10.0, 12.0, 11.0, 10.0, 9.0, 10.0])
+    positions = np.array([1.0, -1.0, 1.0, -1.0, 1.0, -1.0])
+
+    result = EventEngine(initial_capital=100.0, fill_on='close').run(close, orders=orders_from_positions(positions))
+    stats = trade_stats(result.trades)
+
+    assert stats['num_trades'] == 3
+    assert stats['win_rate'] == pytest.approx(200 / 3)
+    assert stats['total_pnl'] == pytest.approx(result.equity[-1] - 100.0)
+    assert stats['average_holding_bars'] == 1.0
+
+def test_backtest_counts_round_trips_from_ledger():
+    data = create_sample_data()
+    backtest = Backtest(data, execute_bollinger_bands_strategy, engine='event')
+    signals = backtest.run()
+    metrics = backtest.calculate_metrics(signals)
+
+    vectorized = Backtest(data, execute_bollinger_bands_strategy)
+    expected = vectorized.calculate_metrics(vectorized.run())
+    assert metrics['num_trades'] == len(signals.attrs['trades'])
+    assert metrics['num_trades'] < expected['num_trades']
+    assert metrics['final_value'] == expected['final_value']
+
+def test_event_engine_rejects_signal_rule():
+    with pytest.raises(ValueError):
+        Backtest(create_sample_data(), execute_rsi_strategy, engine='event').run()
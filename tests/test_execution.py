@@ -0,0 +1,122 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import pandas as pd
+import numpy as np
+from numpy.testing import assert_array_equal
+from backtesting.execution import execute
+from backtesting.backtest import Backtest
+from strategies.bollinger_bands import bollinger_bands, execute_bollinger_bands_strategy
+from strategies.rsi_strategy import rsi_strategy, execute_rsi_strategy
+from config import INITIAL_CAPITAL
+
+def create_sample_data(n=500, seed=42):
+    """Generate sample price data for testing."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start='2020-01-01', periods=n, freq='D')
+    prices = np.maximum(rng.normal(0, 3, n).cumsum() + 100, 1)
+    return pd.DataFrame({'Close': prices}, index=dates)
+
+@pytest.mark.parametrize('seed', [0, 1, 2, 3])
+def test_vectorized_matches_loop_for_positions(seed):
+    signals = bollinger_bands(create_sample_data(seed=seed))
+    price = signals['price'].to_numpy()
+    positions = signals['positions'].to_numpy()
+
+    vectorized = execute(price, positions, rule='positions', engine='vectorized')
+    loop = execute(price, positions, rule='positions', engine='loop')
+
+    for field in ('cash', 'shares', 'equity'):
+        assert_array_equal(getattr(vectorized, field), getattr(loop, field))
+
+@pytest.mark.parametrize('seed', [0, 1, 2, 3])
+def test_vectorized_matches_loop_for_signal_levels(seed):
+    signals = rsi_strategy(create_sample_data(seed=seed))
+    price = signals['price'].to_numpy()
+    signal = signals['signal'].to_numpy()
+
+    vectorized = execute(price, signal, rule='signal', engine='vectorized')
+    loop = execute(price, signal, rule='signal', engine='loop')
+
+    for field in ('cash', 'shares', 'equity'):
+        assert_array_equal(getattr(vectorized, field), getattr(loop, field))
+
+def test_leading_nan_prices_carry_value():
+    price = np.array([np.nan, np.nan, 10.0, 12.0, 11.0])
+    positions = np.array([1.0, 0.0, 1.0, 0.0, -1.0])
+
+    result = execute(price, positions, initial_capital=100.0)
+
+    assert_array_equal(result.equity, [100.0, 100.0, 100.0, 120.0, 110.0])
+    assert_array_equal(result.shares, [0.0, 0.0, 0.0, 10.0, 10.0])
+
+def test_rsi_skips_missing_close_on_oversold_bar():
+    data = create_sample_data()
+    rsi = rsi_strategy(data)['rsi']
+    # A missing close on the most oversold bar; rsi_strategy turns its price into 0
+    bar = int(np.argmin(rsi.where(rsi > 0, 100)))
+    data.iloc[bar, 0] = np.nan
+    signals = rsi_strategy(data)
+    assert signals['signal'].iloc[bar] == 1 and signals['price'].iloc[bar] == 0
+
+    for engine in ('vectorized', 'loop'):
+        result = execute(signals['price'].to_numpy(), signals['signal'].to_numpy(), rule='signal', engine=engine)
+        assert result.cash[bar + 1] == result.cash[bar] and result.shares[bar + 1] == result.shares[bar]
+    vectorized = execute_rsi_strategy(data)
+    assert np.isfinite(vectorized['cumulative_strategy_returns']).all()
+    pd.testing.assert_frame_equal(execute_rsi_strategy(data, engine='loop'), vectorized, check_exact=True)
+    assert_array_equal(execute_rsi_strategy(data, compact=True)['cumulative_strategy_returns'],
+                       vectorized['cumulative_strategy_returns'])
+
+def test_no_events():
+    price = np.array([10.0, 11.0, 12.0])
+    result = execute(price, np.zeros(3), initial_capital=100.0)
+
+    assert_array_equal(result.equity, [100.0, 100.0, 100.0])
+    assert_array_equal(result.cash, [100.0, 100.0, 100.0])
+
+def test_unknown_engine():
+    with pytest.raises(ValueError, match="Unknown engine"):
+        execute(np.ones(3), np.zeros(3), engine='gpu')
+
+def test_executors_identical_across_engines():
+    data = create_sample_data()
+
+    pd.testing.assert_frame_equal(execute_bollinger_bands_strategy(data, engine='vectorized'),
+                                  execute_bollinger_bands_strategy(data, engine='loop'),
+                                  check_exact=True)
+    pd.testing.assert_frame_equal(execute_rsi_strategy(data, engine='vectorized'),
+                                  execute_rsi_strategy(data, engine='loop'),
+                                  check_exact=True)
+
+def test_backtest_engine_selection():
+    data = create_sample_data()
+
+    vectorized = Backtest(data, execute_rsi_strategy, engine='vectorized').run()
+    loop = Backtest(data, execute_rsi_strategy, engine='loop').run()
+
+    assert vectorized['cumulative_strategy_returns'].iloc[0] == INITIAL_CAPITAL
+    assert_array_equal(vectorized['cumulative_strategy_returns'], loop['cumulative_strategy_returns'])
+
+    with pytest.raises(ValueError, match="Unknown engine"):
+        Backtest(data, execute_rsi_strategy, engine='gpu')
+
+@pytest.mark.parametrize('rule, build, column', [('positions', bollinger_bands, 'positions'),
+                                                  ('signal', rsi_strategy, 'signal')])
+def test_state_carries_execution_across_chunks(rule, build, column):
+    signals = build(create_sample_data(seed=5))
+    price = signals['price'].to_numpy()
+    orders = signals[column].to_numpy()
+    whole = execute(price, orders, rule=rule)
+
+    state, equity = None, []
+    for start in range(0, len(price), 37):
+        part = execute(price[start:start + 37], orders[start:start + 37], rule=rule, state=state)
+        state = part.state
+        equity.append(part.equity)
+
+    assert_array_equal(np.concatenate(equity), whole.equity)
+    assert state == whole.state
+    with pytest.raises(ValueError):
+        execute(price, orders, rule=rule, engine='loop', state=state)
@@ -3,7 +3,8 @@
 import pandas as pd
 import numpy as np
 import pytest
-from strategies.ichimoku_cloud_strategy import calculate_ichimoku_cloud, ichimoku_cloud_strategy
+from strategies.ichimoku_cloud_strategy import (calculate_ichimoku_cloud, calculate_ichimoku_cloud_universe,
+                                               ichimoku_cloud_strategy)
 
 @pytest.fixture
 def sample_data():
@@ -43,4 +44,28 @@ def test_ichimoku_cloud_strategy(sample_data):
     assert set(signals['signal'].unique()).issubset({-1, 0, 1})
     
     # Check if positions are -2, -1, 0, 1, or 2
-    assert set(signals['positions'].unique()).issubset({-2, -1, 0, 1, 2})
\ No newline at end of file
+    assert set(signals['positions'].unique()).issubset({-2, -1, 0, 1, 2})
+
+def test_calculate_ichimoku_cloud_matches_pandas(sample_data):
+    ichimoku = calculate_ichimoku_cloud(sample_data)
+    high, low = sample_data['high'], sample_data['low']
+    conversion_line = (high.rolling(9).max() + low.rolling(9).min()) / 2
+    base_line = (high.rolling(26).max() + low.rolling(26).min()) / 2
+    leading_span_b = ((high.rolling(52).max() + low.rolling(52).min()) / 2).shift(26)
+
+    pd.testing.assert_series_equal(ichimoku['conversion_line'], conversion_line, check_names=False)
+    pd.testing.assert_series_equal(ichimoku['base_line'], base_line, check_names=False)
+    pd.testing.assert_series_equal(ichimoku['leading_span_b'], leading_span_b, check_names=False)
+
+def test_calculate_ichimoku_cloud_universe(sample_data):
+    shifted = sample_data * 1.5 + 3
+    high = pd.DataFrame({'A': sample_data['high'], 'B': shifted['high']})
+    low = pd.DataFrame({'A': sample_data['low'], 'B': shifted['low']})
+    close = pd.DataFrame({'A': sample_data['close'], 'B': shifted['close']})
+    universe = calculate_ichimoku_cloud_universe(high, low, close)
+
+    for symbol, data in (('A', sample_data), ('B', shifted)):
+        single = calculate_ichimoku_cloud(data)
+        for component in single.columns:
+            pd.testing.assert_series_equal(universe[component][symbol], single[component], check_names=False)
+
@@ -0,0 +1,124 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import pandas as pd
+import numpy as np
+from utils.indicators import (IndicatorCache, fingerprint, calculate_rsi, rolling_mean, rolling_max, rolling_min,
+                              get_indicator_cache, rolling_extrema, rolling_max_many)
+from utils.synthetic_data import generate_ohlcv
+from strategies.moving_average_crossover import moving_average_crossover
+from strategies.rsi_strategy import rsi_strategy
+from strategies.ml_strategy import feature_engineering
+
+@pytest.fixture
+def prices():
+    close = generate_ohlcv(1000, seed=7)['Close']
+    close.iloc[100:105] = np.nan
+    return close
+
+def assert_same(a, b):
+    assert np.array_equal(a.to_numpy(), b.to_numpy(), equal_nan=True)
+
+def test_second_call_is_a_hit(prices):
+    cache = IndicatorCache()
+    first = rolling_mean(prices, 20, cache=cache)
+    second = rolling_mean(prices.copy(), 20, cache=cache)
+
+    assert cache.hits >= 1
+    assert_same(first, second)
+    assert second.index.equals(prices.index)
+
+def test_fingerprint_ignores_index(prices):
+    shifted = pd.Series(prices.to_numpy(), index=prices.index + pd.Timedelta('1D'))
+
+    assert fingerprint(prices) == fingerprint(shifted)
+    assert fingerprint(prices) != fingerprint(prices * 2)
+
+@pytest.mark.parametrize('min_periods', [None, 1, 5])
+def test_rolling_matches_pandas(prices, min_periods):
+    cache = IndicatorCache()
+    rolling = prices.rolling(window=20, min_periods=min_periods)
+
+    assert_same(rolling_mean(prices, 20, min_periods, cache=cache), rolling.mean())
+    assert_same(rolling_max(prices, 20, min_periods, cache=cache), rolling.max())
+    assert_same(rolling_min(prices, 20, min_periods, cache=cache), rolling.min())
+
+def test_lru_eviction_by_size(prices):
+    entry_bytes = len(prices) * 8
+    cache = IndicatorCache(max_bytes=2 * entry_bytes)
+    for window in (5, 10, 15):
+        rolling_mean(prices, window, min_periods=1, cache=cache)
+
+    assert len(cache) == 2
+    assert cache.nbytes <= cache.max_bytes
+    rolling_mean(prices, 5, min_periods=1, cache=cache)  # Evicted, so recomputed
+    assert cache.hits == 0
+
+def test_callers_cannot_modify_cached_values(prices):
+    cache = IndicatorCache()
+    values = rolling_mean(prices, 20, min_periods=1, cache=cache)
+    values.iloc[-1] = -1.0
+    values.fillna(0, inplace=True)
+
+    again = rolling_mean(prices, 20, min_periods=1, cache=cache)
+    assert cache.hits == 1
+    assert again.iloc[-1] != -1.0
+
+def test_rsi_zero_loss_handling():
+    prices = pd.Series(np.arange(1.0, 31.0))
+    cache = IndicatorCache()
+
+    assert (calculate_rsi(prices, 14, cache=cache).iloc[14:] == 100).all()
+    assert calculate_rsi(prices, 14, nan_on_zero_loss=True, cache=cache).iloc[14:].isna().all()
+
+def test_strategies_share_indicators():
+    data = generate_ohlcv(600, seed=11)
+    cache = get_indicator_cache()
+    moving_average_crossover(data, short_window=5, long_window=20)
+    rsi_strategy(data, period=14)
+
+    hits = cache.hits
+    feature_engineering(data.copy())
+    # MA5 and MA20 reuse the crossover's windows; only the RSI variant differs
+    assert cache.hits >= hits + 2
+
+@pytest.mark.parametrize('min_periods', [None, 1, 3])
+def test_rolling_extrema_matches_pandas_on_2d_arrays(min_periods):
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(600, 5))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    values[100:180, 2] = np.nan
+    frame = pd.DataFrame(values)
+    windows = [3, 4, 9, 26, 52, 64, 100]
+
+    for kind in ('max', 'min'):
+        extremes = rolling_extrema(values, windows, kind, min_periods)
+        for window in windows:
+            expected = getattr(frame.rolling(window, min_periods=min_periods), kind)()
+            assert np.array_equal(extremes[window], expected.to_numpy(), equal_nan=True)
+
+def test_rolling_extrema_keeps_only_the_current_level():
+    import tracemalloc
+    values = np.random.default_rng(0).normal(size=200_000)
+
+    tracemalloc.start()
+    try:
+        extremes = rolling_extrema(values, [2, 1000])
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # Two results, the current and next level, and the boolean mask; all ten levels would be 12x
+    assert peak < 5 * values.nbytes
+    assert np.array_equal(extremes[1000], pd.Series(values).rolling(1000).max().to_numpy(), equal_nan=True)
+
+def test_rolling_max_many_computes_missing_windows_together(prices):
+    cache = IndicatorCache()
+    rolling_max(prices, 26, cache=cache)
+    misses = cache.misses
+    highs = rolling_max_many(prices, [9, 26, 52], cache=cache)
+
+    assert cache.misses == misses + 2
+    assert cache.hits == 1
+    for window, values in highs.items():
+        assert_same(values, prices.rolling(window).max())
@@ -0,0 +1,103 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import pandas as pd
+import numpy as np
+from utils.ingestion import canonicalize, iter_bars, iter_resampled, load_bars
+from utils.synthetic_data import generate_ohlcv
+
+@pytest.fixture
+def ticks():
+    """Irregular ticks over three sessions, with gaps between them."""
+    rng = np.random.default_rng(3)
+    sessions = [pd.Timestamp('2024-03-04 09:30') + pd.Timedelta(days=day) for day in range(3)]
+    times = np.sort(np.concatenate([
+        (session + pd.to_timedelta(rng.uniform(0, 6.5 * 3600, 4000), unit='s')).to_numpy() for session in sessions
+    ]))
+    return pd.DataFrame({
+        'Timestamp': times,
+        'Price': 100 + rng.normal(0, 0.05, len(times)).cumsum(),
+        'Size': rng.integers(1, 500, len(times)),
+    })
+
+@pytest.fixture
+def minute_bars():
+    """Synthetic minute bars with lowercase columns and epoch-millisecond timestamps."""
+    bars = generate_ohlcv(5000, start='2024-01-02 09:30', freq='min', seed=1)
+    return pd.DataFrame({
+        'time': bars.index.asi8 // 10**6,
+        'open': bars['Open'], 'high': bars['High'], 'low': bars['Low'],
+        'close': bars['Close'], 'volume': bars['Volume'],
+    }).reset_index(drop=True), bars
+
+def expected_bars(ticks, rule):
+    frame = ticks.set_index('Timestamp')
+    bars = frame['Price'].resample(rule).ohlc()
+    bars.columns = ['Open', 'High', 'Low', 'Close']
+    bars['Volume'] = frame['Size'].resample(rule).sum().astype(float)
+    return bars.dropna(subset=['Close'])
+
+@pytest.mark.parametrize('rule', ['1min', '5min', '1h', 'D'])
+@pytest.mark.parametrize('chunk_rows', [997, 5000, 100000])
+def test_streamed_ticks_match_whole_resample(tmp_path, ticks, rule, chunk_rows):
+    path = tmp_path / 'ticks.csv.gz'
+    ticks.to_csv(path, index=False)
+
+    bars = load_bars(path, rule=rule, chunk_rows=chunk_rows)
+
+    pd.testing.assert_frame_equal(bars, expected_bars(ticks, rule), check_freq=False, check_names=False)
+
+def test_minute_bars_pass_through_and_resample(tmp_path, minute_bars):
+    raw, bars = minute_bars
+    path = tmp_path / 'bars.csv'
+    raw.to_csv(path, index=False)
+
+    loaded = load_bars(path, chunk_rows=700)
+    hourly = load_bars(path, rule='1h', chunk_rows=700)
+
+    np.testing.assert_allclose(loaded[['Open', 'High', 'Low', 'Close']].to_numpy(),
+                               bars[['Open', 'High', 'Low', 'Close']].to_numpy())
+    assert (loaded.index == bars.index).all()
+    expected = bars.resample('1h').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'})
+    np.testing.assert_allclose(hourly.to_numpy(), expected.to_numpy(dtype=float))
+
+def test_iter_bars_yields_bounded_chunks(tmp_path, ticks):
+    path = tmp_path / 'ticks.csv'
+    ticks.to_csv(path, index=False)
+
+    chunks = list(iter_bars(path, rule='1min', chunk_rows=1000, lowercase=True))
+
+    assert len(chunks) > 10
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert list(chunks[0].columns) == ['open', 'high', 'low', 'close', 'volume']
+
+def test_canonicalize_options():
+    raw = pd.DataFrame({'DATE': ['2024-01-02 10:00', '2024-01-02 09:00'], 'LAST': [2.0, 1.0]})
+
+    frame = canonicalize(raw, tz='America/New_York')
+
+    assert list(frame.columns) == ['price', 'size']
+    assert list(frame['price']) == [1.0, 2.0]
+    assert str(frame.index.tz) == 'America/New_York'
+    with pytest.raises(ValueError):
+        canonicalize(pd.DataFrame({'timestamp': [1], 'bid': [1.0]}))
+
+def test_invalid_streams(tmp_path, ticks):
+    path = tmp_path / 'ticks.csv'
+    ticks.to_csv(path, index=False)
+
+    with pytest.raises(ValueError):
+        load_bars(path)
+    chunks = [canonicalize(ticks.iloc[4000:]), canonicalize(ticks.iloc[:4000])]
+    with pytest.raises(ValueError):
+        list(iter_resampled(chunks, '5min'))
+
+def test_parquet_input(tmp_path, ticks):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'ticks.parquet'
+    ticks.to_parquet(path, index=False)
+
+    bars = load_bars(path, rule='5min', chunk_rows=1000)
+
+    pd.testing.assert_frame_equal(bars, expected_bars(ticks, '5min'), check_freq=False, check_names=False)
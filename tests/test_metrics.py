@@ -0,0 +1,89 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import pandas as pd
+import numpy as np
+from backtesting.backtest import Backtest
+from backtesting.metrics import batch_metrics
+from strategies.moving_average_crossover import execute_moving_average_crossover_strategy
+
+@pytest.fixture
+def equity_curves():
+    """Random equity curves with a flat stretch and a NaN bar."""
+    rng = np.random.default_rng(11)
+    returns = rng.normal(0.0005, 0.01, (6, 400))
+    returns[:, 100:120] = 0.0
+    equity = 1000.0 * np.cumprod(1 + returns, axis=1)
+    equity[2, 50] = np.nan
+    return equity
+
+def reference_metrics(curve, initial_capital=1000.0):
+    """Per-run pandas reference of the extended metrics."""
+    series = pd.Series(curve)
+    returns = series.pct_change().dropna()
+    downside = np.sqrt((np.minimum(returns, 0) ** 2).mean())
+    drawdown = series / np.maximum.accumulate(series) - 1
+    years = (len(series) - 1) / 252
+    duration, longest, peak = 0, 0, -np.inf
+    for value in curve:
+        if value >= peak:
+            peak, duration = value, 0
+        else:
+            duration += 1
+        longest = max(longest, duration)
+    moved = returns[returns != 0]
+    return {
+        'sortino_ratio': np.sqrt(252) * returns.mean() / downside,
+        'calmar_ratio': ((series.iloc[-1] / initial_capital) ** (1 / years) - 1) / abs(drawdown.min()),
+        'max_drawdown_duration': longest,
+        'hit_rate': (moved > 0).mean(),
+    }
+
+def test_batch_metrics_match_reference(equity_curves):
+    table = batch_metrics(equity_curves, initial_capital=1000.0)
+
+    for run, curve in enumerate(equity_curves):
+        expected = reference_metrics(curve)
+        for key, value in expected.items():
+            assert table.loc[run, key] == pytest.approx(value), key
+    assert table[['num_trades', 'turnover', 'exposure']].isnull().all().all()
+
+def test_position_metrics():
+    equity = np.full((2, 10), 100.0)
+    positions = np.array([
+        [np.nan, 0, 1, 0, 0, -1, 0, 1, 0, 0],  # in the market for bars 2-4 and 7-9
+        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+    ])
+
+    table = batch_metrics(equity, positions, initial_capital=100.0)
+
+    assert list(table['num_trades']) == [4, 0]
+    assert list(table['exposure']) == pytest.approx([0.6, 0.0])
+    assert list(table['turnover']) == pytest.approx([3 * 252 / 10, 0.0])
+    assert table['hit_rate'].isnull().all()
+
+def test_drawdown_duration():
+    equity = np.array([[100, 110, 105, 100, 108, 111, 90, 95]], dtype=float)
+
+    table = batch_metrics(equity, initial_capital=100.0)
+
+    assert table.loc[0, 'max_drawdown_duration'] == 3
+    assert table.loc[0, 'max_drawdown'] == pytest.approx((90 / 111 - 1) * 100)
+
+def test_calculate_metrics_reports_extended_metrics():
+    rng = np.random.default_rng(5)
+    dates = pd.date_range(start='2020-01-01', periods=500, freq='D')
+    data = pd.DataFrame({'Close': np.maximum(rng.normal(0, 2, 500).cumsum() + 100, 1)}, index=dates)
+    backtest = Backtest(data, execute_moving_average_crossover_strategy)
+    signals = backtest.run()
+
+    metrics = backtest.calculate_metrics(signals)
+    row = batch_metrics(signals['cumulative_strategy_returns'].to_numpy()[None],
+                        signals['positions'].to_numpy()[None]).iloc[0]
+
+    assert set(metrics) == set(row.index)
+    for key, value in metrics.items():
+        assert value == pytest.approx(row[key], nan_ok=True)
+    assert metrics['num_trades'] == len(signals[signals['positions'] != 0])
+    assert 0 <= metrics['exposure'] <= 1
@@ -3,7 +3,10 @@
 import pytest
 import pandas as pd
 import numpy as np
-from strategies.ml_strategy import ml_strategy
+import importlib
+import joblib
+from strategies.ml_strategy import ml_strategy, walk_forward_windows, walk_forward_ml_strategy
+from utils.synthetic_data import generate_ohlcv
 
 @pytest.fixture
 def sample_data():
@@ -37,4 +40,52 @@ def test_insufficient_data():
     })
     
     with pytest.raises(ValueError):
-        ml_strategy(insufficient_data)  # Try with only 10 data points
\ No newline at end of file
+        ml_strategy(insufficient_data)  # Try with only 10 data points
+
+@pytest.fixture
+def long_data():
+    return generate_ohlcv(800, seed=3)
+
+def test_walk_forward_windows():
+    assert walk_forward_windows(10, train_size=4, retrain_every=3, mode='sliding') == [(0, 4, 7), (3, 7, 10)]
+    assert walk_forward_windows(10, train_size=4, retrain_every=3, mode='expanding') == [(0, 4, 7), (0, 7, 10)]
+    with pytest.raises(ValueError):
+        walk_forward_windows(10, mode='rolling')
+
+def test_walk_forward_ml_strategy(long_data, tmp_path):
+    results = walk_forward_ml_strategy(long_data, train_size=300, retrain_every=100, n_estimators=10,
+                                       workers=1, cache_dir=str(tmp_path))
+
+    assert {'Signal', 'Position', 'Strategy_Returns', 'Window'} <= set(results.columns)
+    assert results['Window'].is_monotonic_increasing
+    assert results['Window'].nunique() == len(list(tmp_path.iterdir()))
+    assert results.index[0] > long_data.index[300]
+
+def test_walk_forward_reuses_cached_models(long_data, tmp_path, monkeypatch):
+    ml_module = importlib.import_module('strategies.ml_strategy')
+    trained = []
+    fit_window = ml_module._fit_window
+
+    def counting_fit_window(*args):
+        trained.append(args)
+        return fit_window(*args)
+
+    monkeypatch.setattr(ml_module, '_fit_window', counting_fit_window)
+    kwargs = dict(train_size=300, retrain_every=100, n_estimators=10, workers=1, cache_dir=str(tmp_path))
+
+    first = ml_module.walk_forward_ml_strategy(long_data.iloc[:600], **kwargs)
+    first_count = len(trained)
+    second = ml_module.walk_forward_ml_strategy(long_data, **kwargs)
+
+    # Only the windows that did not exist in the shorter history are trained again
+    assert len(trained) - first_count == second['Window'].nunique() - first['Window'].nunique()
+    overlap = first.index[:-1]
+    assert (second.loc[overlap, 'Signal'] == first.loc[overlap, 'Signal']).all()
+
+def test_walk_forward_divides_cores_among_workers(long_data, tmp_path, monkeypatch):
+    monkeypatch.setattr(importlib.import_module('strategies.ml_strategy').os, 'cpu_count', lambda: 4)
+    walk_forward_ml_strategy(long_data, train_size=300, retrain_every=100, n_estimators=10,
+                             workers=2, cache_dir=str(tmp_path))
+
+    forests = [joblib.load(path)[1] for path in tmp_path.iterdir()]
+    assert forests and all(forest.n_jobs == 2 for forest in forests)
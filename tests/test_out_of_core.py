@@ -0,0 +1,126 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tracemalloc
+import pytest
+import pandas as pd
+import numpy as np
+from numpy.testing import assert_array_equal
+from backtesting.out_of_core import (OUT_OF_CORE_STRATEGIES, open_price_arrays, run_out_of_core, window_mean,
+                                     window_std, window_sums, write_price_arrays)
+from strategies.moving_average_crossover import execute_moving_average_crossover_strategy
+from strategies.rsi_strategy import execute_rsi_strategy
+from strategies.bollinger_bands import execute_bollinger_bands_strategy
+from strategies.ichimoku_cloud_strategy import ichimoku_cloud_strategy
+from utils.synthetic_data import generate_ohlcv, iter_ohlcv_chunks
+
+IN_MEMORY = {
+    'moving_average_crossover': execute_moving_average_crossover_strategy,
+    'rsi': execute_rsi_strategy,
+    'bollinger_bands': execute_bollinger_bands_strategy,
+    'ichimoku_cloud': lambda data: ichimoku_cloud_strategy(data.rename(columns=str.lower)),
+}
+
+@pytest.fixture
+def sample_data():
+    """Synthetic OHLCV bars with a few missing bars."""
+    data = generate_ohlcv(3000, seed=3)
+    data.iloc[[10, 500, 501, 2500]] = np.nan
+    return data
+
+def assert_frames_identical(actual, expected):
+    assert list(actual.columns) == list(expected.columns)
+    for column in expected.columns:
+        assert_array_equal(actual[column].to_numpy(), expected[column].to_numpy(dtype=float), err_msg=column)
+
+@pytest.mark.parametrize('strategy', OUT_OF_CORE_STRATEGIES)
+@pytest.mark.parametrize('chunk_size', [1, 53, 1000, 2999])
+def test_chunked_runs_are_bit_identical(sample_data, strategy, chunk_size):
+    whole = run_out_of_core(sample_data, strategy, chunk_size=len(sample_data)).to_frame()
+
+    chunked = run_out_of_core(sample_data, strategy, chunk_size=chunk_size).to_frame()
+
+    assert_frames_identical(chunked, whole)
+
+@pytest.mark.parametrize('strategy', OUT_OF_CORE_STRATEGIES)
+def test_matches_in_memory_strategy(sample_data, strategy):
+    expected = IN_MEMORY[strategy](sample_data)
+
+    actual = run_out_of_core(sample_data, strategy, chunk_size=400).to_frame()
+
+    assert list(actual.columns) == list(expected.columns)
+    assert (actual.index == expected.index).all()
+    for column in expected.columns:
+        np.testing.assert_allclose(actual[column].to_numpy(), expected[column].to_numpy(dtype=float),
+                                   rtol=1e-10, err_msg=column)
+    for column in ('signal', 'positions', 'cumulative_strategy_returns'):
+        if column in expected.columns:
+            assert_array_equal(actual[column].to_numpy(), expected[column].to_numpy(dtype=float), err_msg=column)
+
+def test_ichimoku_is_exactly_the_in_memory_strategy(sample_data):
+    expected = IN_MEMORY['ichimoku_cloud'](sample_data)
+
+    actual = run_out_of_core(sample_data, 'ichimoku_cloud', chunk_size=100).to_frame()
+
+    assert_frames_identical(actual, expected)
+
+def test_window_kernels_do_not_depend_on_offset():
+    rng = np.random.default_rng(0)
+    values = rng.normal(100, 5, 1000)
+    whole = window_sums(values, 30)
+
+    for offset in (1, 29, 30, 517):
+        part = window_sums(values[offset:], 30, offset)
+        valid = ~np.isnan(part)
+        assert valid[60:].all()
+        assert_array_equal(part[valid], whole[offset:][valid])
+    expected = pd.Series(values).rolling(30, min_periods=1).mean()
+    np.testing.assert_allclose(window_mean(values, 30, 1), expected, rtol=1e-13)
+
+def test_window_std_does_not_depend_on_offset():
+    rng = np.random.default_rng(1)
+    values = rng.normal(100, 5, 1000)
+    values[200:240] = values[200]
+    values[[10, 500]] = np.nan
+    whole = window_std(values, 20)
+
+    for offset in (1, 19, 20, 517):
+        part = window_std(values[offset:], 20, offset)
+        valid = ~np.isnan(part)
+        assert_array_equal(part[valid], whole[offset:][valid])
+        assert_array_equal(valid[40:], ~np.isnan(whole[offset:][40:]))
+    np.testing.assert_allclose(whole, pd.Series(values).rolling(20).std(), rtol=1e-10, atol=1e-12)
+    assert (whole[239:240] == 0).all()
+
+def test_memory_mapped_run(tmp_path):
+    data = generate_ohlcv(5000, start='2024-01-02 09:30', freq='min', seed=2).tz_localize('America/New_York')
+    arrays = write_price_arrays([data.iloc[:2000], data.iloc[2000:]], tmp_path / 'prices')
+
+    reopened = open_price_arrays(tmp_path / 'prices')
+    result = run_out_of_core(tmp_path / 'prices', 'bollinger_bands', chunk_size=600, output_dir=tmp_path / 'signals')
+
+    assert isinstance(reopened.columns['Close'], np.memmap)
+    assert_array_equal(reopened.columns['Close'], data['Close'].to_numpy())
+    assert os.path.exists(tmp_path / 'signals' / 'positions.npy')
+    frame = result.to_frame(['price', 'positions'], start=100, stop=200)
+    assert frame.index.equals(data.index[100:200])
+    assert_frames_identical(result.to_frame(), run_out_of_core(arrays, 'bollinger_bands').to_frame())
+
+def test_peak_memory_does_not_grow_with_history(tmp_path):
+    peaks = []
+    for n in (40_000, 160_000):
+        arrays = write_price_arrays(iter_ohlcv_chunks(n, freq='min', seed=1, chunk_size=10_000), tmp_path / f'p{n}')
+        tracemalloc.start()
+        run_out_of_core(arrays, 'moving_average_crossover', chunk_size=5_000, output_dir=tmp_path / f's{n}')
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    assert peaks[1] < 1.5 * peaks[0]
+
+def test_invalid_arguments(sample_data):
+    with pytest.raises(ValueError):
+        run_out_of_core(sample_data, 'macd')
+    with pytest.raises(ValueError):
+        run_out_of_core(sample_data[['Close']], 'ichimoku_cloud')
+    with pytest.raises(ValueError):
+        run_out_of_core(sample_data, 'rsi', chunk_size=0)
@@ -0,0 +1,154 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
+import pytest
+import pandas as pd
+import numpy as np
+from scipy.optimize import minimize
+from utils.portfolio_optimization import (STRATEGIES, _targeted_weights, efficient_frontier, fast_optimize_weights,
+                                          feasible_bounds, optimize_portfolio, portfolio_moments,
+                                          project_capped_simplex, safe_optimize_portfolio)
+
+def make_returns(num_assets, periods=750, seed=0):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0004, 0.01, (periods, 1))
+    returns = (market * rng.uniform(0.5, 1.5, num_assets) + rng.normal(0.0002, 0.015, (periods, num_assets))
+               + rng.uniform(-0.0005, 0.001, num_assets))
+    return pd.DataFrame(returns, columns=[f'ASSET{i}' for i in range(num_assets)])
+
+@pytest.fixture
+def returns():
+    return make_returns(12)
+
+def reference_value(moments, strategy, min_weight, max_weight, risk_free_rate=0.02):
+    """Optimum found by SLSQP on the same smooth objective, used as ground truth."""
+    mean, cov, downside_cov = moments
+    def objective(w):
+        if strategy == 'sharpe':
+            return -(mean @ w - risk_free_rate) / np.sqrt(w @ cov @ w)
+        if strategy == 'sortino':
+            return -(mean @ w - risk_free_rate) / np.sqrt(w @ downside_cov @ w)
+        if strategy == 'max_return':
+            return -(mean @ w)
+        return w @ cov @ w
+    n = len(mean)
+    result = minimize(objective, np.full(n, 1 / n), method='SLSQP', bounds=[(min_weight, max_weight)] * n,
+                      constraints=[{'type': 'eq', 'fun': lambda x: x.sum() - 1}],
+                      options={'ftol': 1e-14, 'maxiter': 1000})
+    return objective, result.fun
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+def test_fast_backend_reaches_reference_optimum(returns, strategy):
+    moments = portfolio_moments(returns)
+    weights = fast_optimize_weights(moments, strategy, min_weight=0.02, max_weight=0.3)
+    objective, expected = reference_value(moments, strategy, 0.02, 0.3)
+
+    assert weights.sum() == pytest.approx(1.0, abs=1e-12)
+    assert weights.min() >= 0.02 - 1e-12
+    assert weights.max() <= 0.3 + 1e-12
+    assert objective(weights) <= expected + 1e-9 * max(1.0, abs(expected))
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+def test_fast_backend_not_worse_than_slsqp_backend(returns, strategy):
+    fast = optimize_portfolio(returns, strategy, backend='fast')
+    slsqp = optimize_portfolio(returns, strategy, backend='slsqp')
+    objective, _ = reference_value(portfolio_moments(returns), strategy, 0.05, 0.4)
+    assert objective(fast) <= objective(slsqp) + 1e-9
+
+def test_project_capped_simplex():
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        v = rng.normal(0, 1, 30)
+        w = project_capped_simplex(v, 0.01, 0.1)
+        assert w.sum() == pytest.approx(1.0, abs=1e-12)
+        assert w.min() >= 0.01 and w.max() <= 0.1
+        # Optimality: free coordinates share the same shift from v
+        free = (w > 0.01 + 1e-12) & (w < 0.1 - 1e-12)
+        if free.sum() > 1:
+            assert np.ptp((v - w)[free]) < 1e-12
+
+    inside = np.full(10, 0.1)
+    np.testing.assert_allclose(project_capped_simplex(inside, 0.0, 1.0), inside)
+
+def test_infeasible_bounds_are_widened(returns):
+    with pytest.raises(ValueError):
+        fast_optimize_weights(portfolio_moments(returns), min_weight=0.1, max_weight=0.4)  # 12 assets * 0.1 > 1
+    np.testing.assert_allclose(optimize_portfolio(returns, min_weight=0.1, max_weight=0.4), np.full(12, 1 / 12))
+    assert feasible_bounds(12, 0.1, 0.4) == (1 / 12, 0.4)
+    assert feasible_bounds(2, 0.05, 0.4) == (0.05, 0.5)
+
+    # The default min_weight=0.05 over more than 20 assets no longer raises
+    np.testing.assert_allclose(optimize_portfolio(make_returns(25)), np.full(25, 1 / 25))
+
+def test_unknown_backend_raises(returns):
+    with pytest.raises(ValueError):
+        optimize_portfolio(returns, backend='cvx')
+
+def test_many_assets_under_one_second():
+    returns = make_returns(500, periods=1000)
+    moments = portfolio_moments(returns)
+    for strategy in STRATEGIES:
+        start = time.perf_counter()
+        weights = fast_optimize_weights(moments, strategy, min_weight=0.0, max_weight=0.02)
+        assert time.perf_counter() - start < 1.0
+        assert weights.sum() == pytest.approx(1.0, abs=1e-12)
+
+def min_variance_at_return(moments, target_return, min_weight, max_weight):
+    mean, cov, _ = moments
+    n = len(mean)
+    result = minimize(lambda w: w @ cov @ w, np.full(n, 1 / n), jac=lambda w: 2 * cov @ w, method='SLSQP',
+                      bounds=[(min_weight, max_weight)] * n,
+                      constraints=[{'type': 'eq', 'fun': lambda x: x.sum() - 1},
+                                   {'type': 'eq', 'fun': lambda x: mean @ x - target_return}],
+                      options={'ftol': 1e-15, 'maxiter': 1000})
+    return result.fun
+
+def test_efficient_frontier_matches_reference():
+    returns = make_returns(30)
+    moments = portfolio_moments(returns)
+    frontier = efficient_frontier(returns, num_points=15, min_weight=0.0, max_weight=0.2)
+
+    assert frontier.weights.shape == (15, 30)
+    assert list(frontier.weights.columns) == list(returns.columns)
+    np.testing.assert_allclose(frontier.weights.sum(axis=1), 1.0, atol=1e-12)
+    assert frontier.weights.to_numpy().min() >= 0 and frontier.weights.to_numpy().max() <= 0.2 + 1e-12
+    assert np.all(np.diff(frontier.returns) > 0)
+    assert np.all(np.diff(frontier.volatilities) >= -1e-12)
+    for i in (1, 7, 13):
+        expected = min_variance_at_return(moments, frontier.returns[i], 0.0, 0.2)
+        assert frontier.volatilities[i] ** 2 == pytest.approx(expected, rel=1e-9)
+
+def test_volatility_targets_trace_the_same_frontier():
+    returns = make_returns(30)
+    by_return = efficient_frontier(returns, num_points=25, min_weight=0.0, max_weight=0.2)
+    targets = by_return.volatilities[1:-1]
+    by_volatility = efficient_frontier(returns, min_weight=0.0, max_weight=0.2, target='volatility', targets=targets)
+
+    np.testing.assert_allclose(by_volatility.volatilities, targets, rtol=1e-9)
+    np.testing.assert_allclose(by_volatility.returns, by_return.returns[1:-1], rtol=1e-8)
+
+def test_augmented_lagrangian_fallback_agrees():
+    returns = make_returns(20)
+    moments = portfolio_moments(returns)
+    frontier = efficient_frontier(returns, num_points=5, min_weight=0.0, max_weight=0.3)
+    weights, _ = _targeted_weights(moments, 'return', frontier.returns[2], 0.0, 0.3, np.full(20, 0.05))
+    assert weights @ moments[0] == pytest.approx(frontier.returns[2], abs=1e-8)
+    assert weights @ moments[1] @ weights == pytest.approx(frontier.volatilities[2] ** 2, rel=1e-6)
+
+def test_frontier_segments_across_workers():
+    returns = make_returns(15)
+    targets = np.linspace(0.15, 0.3, 9)[::-1]
+    serial = efficient_frontier(returns, min_weight=0.0, max_weight=0.3, targets=targets)
+    parallel = efficient_frontier(returns, min_weight=0.0, max_weight=0.3, targets=targets, workers=2)
+
+    np.testing.assert_allclose(parallel.weights, serial.weights, atol=1e-10)
+    # Points come back in the order of the targets
+    np.testing.assert_allclose(serial.returns, np.clip(targets, serial.returns.min(), serial.returns.max()))
+
+def test_frontier_200_points_100_assets_is_interactive():
+    returns = make_returns(100, periods=1000)
+    start = time.perf_counter()
+    frontier = efficient_frontier(returns, num_points=200, min_weight=0.0, max_weight=0.1)
+    assert time.perf_counter() - start < 1.0
+    assert len(frontier.returns) == 200
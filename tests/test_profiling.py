@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import json
+import tracemalloc
+import pytest
+import numpy as np
+from backtesting.backtest import Backtest
+from backtesting.profiling import Profiler, add_rows, profile, stage
+from strategies.bollinger_bands import execute_bollinger_bands_strategy
+from utils.indicators import get_indicator_cache
+from utils.synthetic_data import generate_ohlcv
+
+@pytest.fixture
+def sample_data():
+    get_indicator_cache().clear()
+    return generate_ohlcv(2000, seed=5)
+
+def test_stage_is_a_no_op_without_profiler():
+    assert stage('signals') is stage('metrics')
+    with stage('signals'):
+        add_rows(10)
+
+def test_backtest_profile_report(sample_data):
+    backtest = Backtest(sample_data, execute_bollinger_bands_strategy, profile=True)
+    backtest.calculate_metrics(backtest.run())
+
+    report = backtest.profile_report()
+    stages = {record['stage']: record for record in report['stages']}
+
+    assert list(stages) == ['signals', 'signals/indicators', 'signals/execution', 'metrics']
+    assert stages['signals']['rows'] == len(sample_data)
+    assert stages['signals/execution']['calls'] == 1
+    assert stages['signals']['self_seconds'] <= stages['signals']['seconds']
+    children = stages['signals/indicators']['seconds'] + stages['signals/execution']['seconds']
+    assert stages['signals']['self_seconds'] == pytest.approx(stages['signals']['seconds'] - children)
+    assert stages['signals']['peak_bytes'] >= stages['signals/execution']['peak_bytes'] > 0
+    assert report['peak_bytes'] >= stages['signals']['peak_bytes']
+    assert report['total_seconds'] >= stages['signals']['seconds'] + stages['metrics']['seconds']
+    assert not tracemalloc.is_tracing()
+    json.loads(backtest.profiler.to_json())
+
+def test_backtest_without_profiling(sample_data):
+    backtest = Backtest(sample_data, execute_bollinger_bands_strategy)
+    backtest.run()
+
+    assert backtest.profile_report() is None
+
+def test_profile_block_collects_all_stages(sample_data):
+    with profile(trace_memory=False) as profiler:
+        with stage('data'):
+            data = sample_data.copy()
+            add_rows(len(data))
+        backtest = Backtest(data, execute_bollinger_bands_strategy, profile=True)
+        backtest.run()
+
+    report = profiler.report()
+    stages = {record['stage']: record for record in report['stages']}
+    assert stages['data']['rows'] == len(sample_data)
+    assert 'signals/execution' in stages
+    assert stages['data']['peak_bytes'] is None
+    # The enclosing profiler took precedence over the backtest's own
+    assert backtest.profile_report()['stages'] == []
+
+def test_shared_profiler_aggregates_calls(sample_data):
+    profiler = Profiler(trace_memory=False)
+    for _ in range(3):
+        Backtest(sample_data, execute_bollinger_bands_strategy, profile=profiler).run()
+
+    stages = {record['stage']: record for record in profiler.report()['stages']}
+    assert stages['signals']['calls'] == 3
+    assert stages['signals']['rows'] == 3 * len(sample_data)
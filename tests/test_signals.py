@@ -0,0 +1,110 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import importlib
+import tracemalloc
+import pytest
+import pandas as pd
+import numpy as np
+from backtesting import out_of_core
+from backtesting.backtest import Backtest
+from backtesting.signals import CORE_COLUMNS, compact_signals
+from utils.indicators import get_indicator_cache
+from strategies.bollinger_bands import execute_bollinger_bands_strategy
+from strategies.moving_average_crossover import execute_moving_average_crossover_strategy
+from strategies.rsi_strategy import execute_rsi_strategy
+from strategies.macd_strategy import execute_macd_strategy
+
+# The strategies package exports a function of the same name
+macd_strategy = importlib.import_module('strategies.macd_strategy')
+
+EXECUTORS = [execute_moving_average_crossover_strategy, execute_rsi_strategy, execute_bollinger_bands_strategy,
+             execute_macd_strategy]
+
+@pytest.fixture
+def sample_data():
+    """Generate sample price data for testing."""
+    rng = np.random.default_rng(7)
+    dates = pd.date_range(start='2020-01-01', periods=2000, freq='D')
+    prices = np.maximum(rng.normal(0, 2, len(dates)).cumsum() + 100, 1)
+    return pd.DataFrame({'Close': prices}, index=dates)
+
+@pytest.mark.parametrize('strategy', EXECUTORS)
+@pytest.mark.parametrize('float_dtype', [None, 'float32'])
+def test_compact_backtest_metrics_match(sample_data, strategy, float_dtype):
+    full = Backtest(sample_data, strategy)
+    compact = Backtest(sample_data, strategy, compact=True, float_dtype=float_dtype)
+
+    expected = full.calculate_metrics(full.run())
+    actual = compact.calculate_metrics(compact.run())
+
+    assert actual == pytest.approx(expected, nan_ok=True)
+    assert actual['num_trades'] == expected['num_trades']
+
+def test_compact_signals_dtypes_and_columns(sample_data):
+    signals = execute_moving_average_crossover_strategy(sample_data)
+
+    compact = compact_signals(signals, float_dtype='float32')
+
+    assert list(compact.columns) == [c for c in signals.columns if c in CORE_COLUMNS]
+    assert compact['signal'].dtype == np.int8
+    # The first order is NaN, kept as <NA> rather than silently becoming 0
+    assert compact['positions'].dtype == 'Int8'
+    assert compact['positions'].isna().sum() == signals['positions'].isna().sum()
+    assert compact['price'].dtype == np.float32
+    assert compact['cumulative_strategy_returns'].dtype == np.float64
+    np.testing.assert_array_equal(compact['signal'].to_numpy(dtype=float), signals['signal'].to_numpy())
+
+def test_compact_signals_uses_several_times_less_memory(sample_data):
+    signals = execute_bollinger_bands_strategy(sample_data)
+
+    compact = compact_signals(signals, float_dtype='float32')
+
+    assert compact['positions'].dtype == np.int8
+    assert signals.memory_usage(index=False).sum() > 4 * compact.memory_usage(index=False).sum()
+
+def test_compact_signals_keeps_requested_columns_and_attrs(sample_data):
+    signals = execute_bollinger_bands_strategy(sample_data, engine='event')
+
+    compact = compact_signals(signals, keep=['upper', 'lower'])
+    everything = compact_signals(signals, keep='all')
+
+    assert {'upper', 'lower'} <= set(compact.columns)
+    assert 'middle' not in compact.columns
+    assert list(everything.columns) == list(signals.columns)
+    assert compact.attrs['trades'] is signals.attrs['trades']
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+@pytest.mark.parametrize('chunk_rows', [10_000, 300, 37])
+def test_executors_build_the_same_compact_signals(sample_data, executor, chunk_rows, monkeypatch):
+    sample_data.iloc[[5, 299, 300, 700, 701, 1200], 0] = np.nan
+    monkeypatch.setattr(out_of_core, 'COMPACT_CHUNK_ROWS', chunk_rows)
+    monkeypatch.setattr(macd_strategy, 'COMPACT_CHUNK_ROWS', chunk_rows)
+
+    expected = compact_signals(executor(sample_data), float_dtype='float32')
+    actual = executor(sample_data, compact=True, float_dtype='float32')
+
+    assert list(actual.columns) == list(expected.columns)
+    assert (actual.dtypes == expected.dtypes).all()
+    for column in actual.columns:
+        np.testing.assert_array_equal(actual[column].to_numpy(dtype=float, na_value=np.nan),
+                                      expected[column].to_numpy(dtype=float, na_value=np.nan))
+
+def _peak_bytes(data, executor, **kwargs):
+    get_indicator_cache().clear()
+    tracemalloc.start()
+    Backtest(data, executor, **kwargs).run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+@pytest.mark.parametrize('executor', EXECUTORS)
+def test_compact_run_peak_memory_is_several_times_lower(executor):
+    rng = np.random.default_rng(1)
+    data = pd.DataFrame({'Close': 100 + rng.normal(0, 1, 200_000).cumsum()},
+                        index=pd.date_range('2020-01-01', periods=200_000, freq='min'))
+
+    full = _peak_bytes(data, executor)
+    compact = _peak_bytes(data, executor, compact=True, float_dtype='float32')
+
+    assert compact * 3 < full
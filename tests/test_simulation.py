@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import pandas as pd
+import numpy as np
+from backtesting.metrics import POSITION_METRICS, batch_metrics
+from backtesting.simulation import (block_bootstrap_indices, simulate_metrics, simulate_returns,
+                                    stationary_bootstrap_indices, summarize_simulation)
+from config import INITIAL_CAPITAL
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(11)
+    dates = pd.date_range(start='2015-01-01', periods=500, freq='B')
+    return pd.Series(rng.normal(0.0005, 0.01, 500), index=dates)
+
+def test_stationary_bootstrap_continues_blocks():
+    rng = np.random.default_rng(0)
+    indices = stationary_bootstrap_indices(1000, 200, 25, rng)
+    assert indices.shape == (200, 1000)
+    assert indices.min() >= 0 and indices.max() < 1000
+    continues = np.diff(indices, axis=1) % 1000 == 1
+    # Blocks break with probability 1 / block_size (plus rare jumps to the next bar)
+    assert 1 - continues.mean() == pytest.approx(1 / 25, rel=0.1)
+
+def test_block_bootstrap_uses_fixed_blocks():
+    rng = np.random.default_rng(0)
+    indices = block_bootstrap_indices(103, 50, 10, rng)
+    assert indices.shape == (50, 103)
+    steps = np.diff(indices, axis=1) % 103
+    within_block = np.ones(102, dtype=bool)
+    within_block[9::10] = False
+    assert (steps[:, within_block] == 1).all()
+
+def test_paths_do_not_depend_on_memory_budget(returns):
+    for method in ('stationary', 'block', 'gbm'):
+        small = simulate_metrics(returns, num_paths=120, method=method, seed=5, max_bytes=100_000)
+        large = simulate_metrics(returns, num_paths=120, method=method, seed=5)
+        pd.testing.assert_frame_equal(small, large)
+
+def test_metrics_match_batch_metrics(returns):
+    paths = simulate_returns(returns, num_paths=30, seed=2)
+    equity = INITIAL_CAPITAL * np.cumprod(np.hstack((np.ones((30, 1)), 1 + paths)), axis=1)
+    expected = batch_metrics(equity).drop(columns=list(POSITION_METRICS))
+    pd.testing.assert_frame_equal(simulate_metrics(returns, num_paths=30, seed=2), expected)
+
+def test_single_block_keeps_final_value(returns):
+    # Blocks as long as the series only rotate it, which keeps the compounded return
+    metrics = simulate_metrics(returns, num_paths=50, method='stationary', block_size=1e12, seed=1)
+    expected = INITIAL_CAPITAL * np.prod(1 + returns.to_numpy())
+    np.testing.assert_allclose(metrics['final_value'], expected, rtol=1e-10)
+
+def test_gbm_matches_drift_and_volatility(returns):
+    paths = simulate_returns(returns, num_paths=400, method='gbm', seed=3)
+    log_returns = np.log1p(paths)
+    assert log_returns.std() == pytest.approx(np.log1p(returns).std(), rel=0.01)
+    assert log_returns.mean() == pytest.approx(np.log1p(returns).mean(), abs=2e-5)
+
+def test_summarize_simulation(returns):
+    metrics = simulate_metrics(returns, num_paths=200, seed=4)
+    summary = summarize_simulation(metrics, percentiles=(5, 50, 95))
+    assert list(summary.columns) == ['mean', 'std', 'p5', 'p50', 'p95']
+    assert list(summary.index) == ['final_value', 'total_return', 'sharpe_ratio', 'max_drawdown', 'sortino_ratio',
+                                   'calmar_ratio', 'max_drawdown_duration', 'hit_rate']
+    assert summary.loc['sharpe_ratio', 'p50'] == pytest.approx(metrics['sharpe_ratio'].median())
+
+def test_invalid_inputs(returns):
+    with pytest.raises(ValueError):
+        simulate_metrics(returns, method='jackknife')
+    with pytest.raises(ValueError):
+        simulate_metrics([np.nan, 0.01])
@@ -5,6 +5,8 @@ import pandas as pd
 import numpy as np
 from strategies.stochastic_oscillator_strategy import (
     calculate_stochastic_oscillator,
+    calculate_stochastic_oscillator_sweep,
+    calculate_stochastic_oscillator_universe,
     stochastic_oscillator_strategy
 )
 from config import (
@@ -86,4 +88,32 @@ def test_stochastic_oscillator_strategy_with_insufficient_data():
     }, index=pd.date_range(start='2020-01-01', periods=2))
     
     with pytest.raises(ValueError, match="Not enough data to calculate"):
-        stochastic_oscillator_strategy(small_df)
\ No newline at end of file
+        stochastic_oscillator_strategy(small_df)
+
+def test_stochastic_oscillator_matches_pandas(sample_data):
+    stoch = calculate_stochastic_oscillator(sample_data)
+    low_min = sample_data['low'].rolling(window=STOCHASTIC_K_PERIOD, min_periods=1).min()
+    high_max = sample_data['high'].rolling(window=STOCHASTIC_K_PERIOD, min_periods=1).max()
+    k_line = (100 * (sample_data['close'] - low_min) / (high_max - low_min)).clip(0, 100)
+
+    pd.testing.assert_series_equal(stoch['%K'], k_line, check_names=False)
+    pd.testing.assert_series_equal(stoch['%D'], k_line.rolling(STOCHASTIC_D_PERIOD, min_periods=1).mean(),
+                                   check_names=False)
+
+def test_k_period_sweep_matches_single_runs(sample_data):
+    sweep = calculate_stochastic_oscillator_sweep(sample_data, [5, 14, 30])
+    assert list(sweep) == [5, 14, 30]
+    for k_period, stoch in sweep.items():
+        pd.testing.assert_frame_equal(stoch, calculate_stochastic_oscillator(sample_data, k_period))
+
+def test_stochastic_oscillator_universe(sample_data):
+    shifted = sample_data * 0.5 + 10
+    frames = {column: pd.DataFrame({'A': sample_data[column], 'B': shifted[column]})
+              for column in ('high', 'low', 'close')}
+    universe = calculate_stochastic_oscillator_universe(frames['high'], frames['low'], frames['close'])
+
+    for symbol, data in (('A', sample_data), ('B', shifted)):
+        single = calculate_stochastic_oscillator(data)
+        pd.testing.assert_series_equal(universe['%K'][symbol], single['%K'], check_names=False)
+        pd.testing.assert_series_equal(universe['%D'][symbol], single['%D'], check_names=False)
+
@@ -0,0 +1,168 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import numpy as np
+from numpy.testing import assert_array_equal, assert_allclose
+from backtesting import stops
+from backtesting.backtest import Backtest
+from backtesting.stops import average_true_range, simulate_stops, apply_stops
+from strategies.bollinger_bands import bollinger_bands, execute_bollinger_bands_strategy
+from strategies.rsi_strategy import execute_rsi_strategy
+from utils.synthetic_data import generate_ohlcv
+
+STOP_CASES = [
+    {'stop_loss': 0.05},
+    {'trailing': 0.08},
+    {'atr_multiplier': 2.5},
+    {'stop_loss': 0.1, 'trailing': 0.05, 'atr_multiplier': 3.0},
+]
+
+def ohlc(bars, symbols, seed=0):
+    """Random OHLC paths, bars x symbols."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(rng.normal(0, 0.02, (bars, symbols)).cumsum(axis=0))
+    open_price = close * np.exp(rng.normal(0, 0.01, (bars, symbols)))
+    high = np.maximum(open_price, close) * (1 + rng.uniform(0, 0.01, (bars, symbols)))
+    low = np.minimum(open_price, close) * (1 - rng.uniform(0, 0.01, (bars, symbols)))
+    return close, high, low, open_price
+
+def test_fixed_and_trailing_stops_by_hand():
+    close = np.array([100, 104, 110, 106, 103, 90, 95], dtype=float)
+    high = close + 1
+    low = close - 1
+    open_price = np.array([100, 102, 108, 109, 104, 92, 91], dtype=float)
+
+    # 5% trailing from the highest high before each bar: 111 after bar 2, stop 105.45 on bar 3
+    result = simulate_stops(close, [0], high=high, low=low, open_price=open_price, trailing=0.05)
+    assert_array_equal(result.exit_bars, [3])
+    assert_allclose(result.exit_prices, [111 * 0.95])
+
+    # Entered at 104, the 10% stop sits at 93.6; bar 5 opens at 92, below it, and fills there
+    result = simulate_stops(close, [1], high=high, low=low, open_price=open_price, stop_loss=0.1)
+    assert_array_equal(result.exit_bars, [5])
+    assert_allclose(result.exit_prices, [92])
+
+    # Not stopped before its end
+    result = simulate_stops(close, [1], ends=[4], high=high, low=low, open_price=open_price, stop_loss=0.1)
+    assert_array_equal(result.exit_bars, [-1])
+    assert np.isnan(result.exit_prices[0])
+
+@pytest.mark.parametrize('kwargs', STOP_CASES)
+def test_vectorized_matches_loop_on_shared_path(kwargs):
+    close, high, low, open_price = (values[:, 0] for values in ohlc(400, 1, seed=1))
+    rng = np.random.default_rng(2)
+    entries = rng.integers(0, 400, 300)
+    ends = entries + rng.integers(0, 120, 300)
+
+    results = [simulate_stops(close, entries, ends, high=high, low=low, open_price=open_price,
+                              engine=engine, **kwargs) for engine in ('vectorized', 'loop')]
+
+    assert_array_equal(results[0].exit_bars, results[1].exit_bars)
+    assert_array_equal(results[0].exit_prices, results[1].exit_prices)
+    assert (results[0].exit_bars >= 0).any() and (results[0].exit_bars < 0).any()
+
+@pytest.mark.parametrize('kwargs', STOP_CASES)
+def test_vectorized_matches_loop_across_symbols(kwargs, monkeypatch):
+    close, high, low, open_price = ohlc(300, 20, seed=3)
+    close[:5, 4] = np.nan
+    rng = np.random.default_rng(4)
+    columns = rng.integers(0, 20, 500)
+    entries = rng.integers(5, 300, 500)
+
+    loop = simulate_stops(close, entries, columns=columns, high=high, low=low, open_price=open_price,
+                          engine='loop', **kwargs)
+    vectorized = simulate_stops(close, entries, columns=columns, high=high, low=low, open_price=open_price,
+                                **kwargs)
+    # A budget of a few hundred cells checks the positions in many small blocks
+    monkeypatch.setattr(stops, 'STOP_MAX_BYTES', 8 * stops._ARRAYS_PER_BLOCK * 300)
+    blocked = simulate_stops(close, entries, columns=columns, high=high, low=low, open_price=open_price,
+                             **kwargs)
+
+    for result in (vectorized, blocked):
+        assert_array_equal(result.exit_bars, loop.exit_bars)
+        assert_array_equal(result.exit_prices, loop.exit_prices)
+
+def test_average_true_range_matches_wilder_recursion():
+    close, high, low, _ = (values[:, 0] for values in ohlc(60, 1, seed=5))
+    atr = average_true_range(high, low, close, window=5)
+
+    ranges = np.maximum(high - low, np.maximum(np.abs(high - np.roll(close, 1)), np.abs(low - np.roll(close, 1))))
+    ranges[0] = high[0] - low[0]
+    expected = np.full(60, np.nan)
+    value = ranges[0]
+    for bar in range(1, 60):
+        value += (ranges[bar] - value) / 5
+        if bar >= 4:
+            expected[bar] = value
+    assert np.isnan(atr[:4]).all()
+    assert_allclose(atr[4:], expected[4:])
+    assert average_true_range(*(np.column_stack([values] * 3) for values in (high, low, close))).shape == (60, 3)
+
+def test_apply_stops_reenters_after_a_stop():
+    close = np.array([100, 101, 95, 96, 97, 98, 90, 91], dtype=float)
+    orders = np.array([1, 0, 0, 1, 0, 0, 0, -1], dtype=float)
+
+    stopped = apply_stops(close, orders, stop_loss=0.03)
+
+    # Stopped on bar 2, bought again on bar 3 and stopped again on bar 6, before the sell order
+    assert_array_equal(stopped.orders, [1, 0, -1, 1, 0, 0, -1, -1])
+    assert_array_equal(np.flatnonzero(~np.isnan(stopped.stop_price)), [2, 6])
+    # Without opens a close below the stop (97, then 93.12) is the fill
+    assert_allclose(stopped.fill_price[[2, 6]], [95, 90])
+    assert_array_equal(np.delete(stopped.fill_price, [2, 6]), np.delete(close, [2, 6]))
+
+def test_apply_stops_checks_every_symbol_like_one_at_a_time():
+    close, high, low, open_price = ohlc(250, 6, seed=6)
+    rng = np.random.default_rng(7)
+    orders = rng.choice([-1.0, 0.0, 1.0], size=close.shape, p=[0.05, 0.9, 0.05])
+
+    together = apply_stops(close, orders, high=high, low=low, open_price=open_price, trailing=0.04)
+    for symbol in range(6):
+        alone = apply_stops(close[:, symbol], orders[:, symbol], high=high[:, symbol], low=low[:, symbol],
+                            open_price=open_price[:, symbol], trailing=0.04, engine='loop')
+        assert_array_equal(together.orders[:, symbol], alone.orders)
+        assert_array_equal(together.fill_price[:, symbol], alone.fill_price)
+
+def test_invalid_arguments():
+    close = np.linspace(100, 110, 10)
+    with pytest.raises(ValueError, match='at least one'):
+        simulate_stops(close, [0])
+    with pytest.raises(ValueError, match='non-negative'):
+        simulate_stops(close, [0], trailing=-0.1)
+    with pytest.raises(ValueError, match='engine'):
+        apply_stops(close, np.zeros(10), stop_loss=0.1, engine='numba')
+    with pytest.raises(ValueError, match='Entry bars'):
+        simulate_stops(close, [10], stop_loss=0.1)
+
+@pytest.mark.parametrize('executor', [execute_bollinger_bands_strategy, execute_rsi_strategy])
+def test_executors_apply_stops(executor):
+    data = generate_ohlcv(500, seed=8)
+
+    plain = executor(data)
+    stopped = executor(data, stops={'trailing': 0.02, 'atr_multiplier': 2.0})
+    loop = executor(data, stops={'trailing': 0.02, 'atr_multiplier': 2.0}, engine='loop')
+
+    assert 'stop_price' not in plain and stopped['stop_price'].notna().any()
+    assert not stopped['cumulative_returns'].equals(plain['cumulative_returns'])
+    assert_allclose(stopped['cumulative_returns'], loop['cumulative_returns'])
+
+def test_bollinger_positions_show_stop_exits():
+    data = generate_ohlcv(500, seed=9)
+    signals = execute_bollinger_bands_strategy(data, stops={'stop_loss': 0.01})
+
+    stop_bars = signals['stop_price'].notna()
+    assert (signals.loc[stop_bars, 'positions'] == -1).all()
+    unchanged = bollinger_bands(data)['positions']
+    assert_array_equal(signals.loc[~stop_bars, 'positions'], unchanged[~stop_bars])
+
+def test_rsi_trades_include_stop_exits():
+    data = generate_ohlcv(500, seed=10)
+    plain = execute_rsi_strategy(data)
+    stopped = execute_rsi_strategy(data, stops={'stop_loss': 0.01})
+
+    assert_array_equal(stopped['positions'], stopped['signal'].diff().fillna(0))
+    full, without = (Backtest(data, None).calculate_metrics(signals) for signals in (stopped, plain))
+    assert full['num_trades'] != without['num_trades']
+    compact = execute_rsi_strategy(data, stops={'stop_loss': 0.01}, compact=True)
+    assert_array_equal(compact['positions'], stopped['positions'])
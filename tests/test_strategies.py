@@ -0,0 +1,33 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import subprocess
+import pytest
+import strategies
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def imported_after(statement):
+    """Heavy modules loaded by running statement in a fresh interpreter."""
+    script = f"import sys\n{statement}\nprint(','.join(m for m in ('sklearn', 'scipy') if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+def test_strategies_load_on_first_use():
+    assert imported_after("from strategies import execute_moving_average_crossover_strategy, execute_rsi_strategy") == ''
+    assert 'sklearn' in imported_after("from strategies import ml_strategy")
+
+def test_lazy_attributes_are_the_strategy_functions():
+    from strategies.rsi_strategy import execute_rsi_strategy
+    from strategies import macd_strategy, rsi_strategy
+
+    assert strategies.execute_rsi_strategy is execute_rsi_strategy
+    # Names shared by a submodule and its function resolve to the function
+    assert callable(rsi_strategy) and callable(macd_strategy)
+    assert set(strategies.__all__) <= set(dir(strategies))
+
+def test_unknown_attribute_raises():
+    with pytest.raises(AttributeError):
+        strategies.unknown_strategy
+    with pytest.raises(ImportError):
+        from strategies import unknown_strategy  # noqa: F401
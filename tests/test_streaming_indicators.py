@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import pandas as pd
+import numpy as np
+from numpy.testing import assert_allclose
+from utils.streaming_indicators import (StreamingBollingerBands, StreamingIchimokuCloud, StreamingMACD,
+                                        StreamingRSI, StreamingStochasticOscillator, RollingExtreme)
+from utils.synthetic_data import generate_ohlcv
+from strategies.rsi_strategy import calculate_rsi
+from strategies.macd_strategy import calculate_macd
+from strategies.bollinger_bands import calculate_bollinger_bands
+from strategies.stochastic_oscillator_strategy import calculate_stochastic_oscillator
+from strategies.ichimoku_cloud_strategy import calculate_ichimoku_cloud
+
+@pytest.fixture
+def sample_data():
+    data = generate_ohlcv(3000, seed=42, lowercase=True)
+    # A flat stretch and a few missing closes exercise the edge cases
+    data.iloc[1000:1040, data.columns.get_loc('close')] = data['close'].iloc[1000]
+    data.iloc[2000:2003, data.columns.get_loc('close')] = np.nan
+    return data
+
+def assert_same(streamed, batch):
+    assert_allclose(np.asarray(streamed, dtype=float), np.asarray(batch, dtype=float), rtol=1e-12, atol=1e-12)
+
+def test_streaming_rsi(sample_data):
+    indicator = StreamingRSI()
+    streamed = [indicator.update(bar) for bar in sample_data['close']]
+
+    assert_same(streamed, calculate_rsi(sample_data.rename(columns={'close': 'Close'})))
+
+def test_streaming_macd(sample_data):
+    indicator = StreamingMACD()
+    streamed = [indicator.update(bar) for bar in sample_data['close']]
+    macd, signal_line = calculate_macd(sample_data.rename(columns={'close': 'Close'}))
+
+    assert_same([value[0] for value in streamed], macd)
+    assert_same([value[1] for value in streamed], signal_line)
+
+def test_streaming_bollinger_bands(sample_data):
+    indicator = StreamingBollingerBands()
+    streamed = [indicator.update({'close': bar}) for bar in sample_data['close']]
+    middle, upper, lower = calculate_bollinger_bands(sample_data.rename(columns={'close': 'Close'}))
+
+    assert_same([value[0] for value in streamed], middle)
+    assert_same([value[1] for value in streamed], upper)
+    assert_same([value[2] for value in streamed], lower)
+
+def test_streaming_stochastic_oscillator(sample_data):
+    indicator = StreamingStochasticOscillator()
+    streamed = [indicator.update(bar) for bar in sample_data.to_dict('records')]
+    stoch = calculate_stochastic_oscillator(sample_data)
+
+    assert_same([value[0] for value in streamed], stoch['%K'])
+    assert_same([value[1] for value in streamed], stoch['%D'])
+
+def test_streaming_ichimoku_cloud(sample_data):
+    indicator = StreamingIchimokuCloud()
+    streamed = pd.DataFrame([indicator.update(bar) for bar in sample_data.to_dict('records')])
+    ichimoku = calculate_ichimoku_cloud(sample_data)
+
+    for column in streamed.columns:
+        assert_same(streamed[column], ichimoku[column])
+
+def test_rolling_extreme_keeps_bounded_state():
+    rolling_max = RollingExtreme(5)
+    for value in range(10000):
+        rolling_max.update(float(value))
+
+    assert rolling_max.value == 9999.0
+    assert len(rolling_max.candidates) <= 5
+    assert len(rolling_max.valid) == 5
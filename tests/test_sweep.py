@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import pandas as pd
+import numpy as np
+from backtesting.backtest import Backtest
+from backtesting.sweep import (run_sweep, sweep_bollinger_bands, sweep_macd,
+                               sweep_moving_average_crossover, sweep_rsi)
+from strategies.moving_average_crossover import execute_moving_average_crossover_strategy
+from strategies.bollinger_bands import bollinger_bands, execute_bollinger_bands_strategy
+from strategies.rsi_strategy import execute_rsi_strategy
+from strategies.macd_strategy import execute_macd_strategy
+from backtesting.execution import execute
+from config import BOLLINGER_WINDOW, BOLLINGER_NUM_STD, INITIAL_CAPITAL
+
+METRICS = ['final_value', 'total_return', 'num_trades', 'sharpe_ratio', 'max_drawdown']
+
+@pytest.fixture
+def sample_data():
+    """Generate sample price data for testing."""
+    rng = np.random.default_rng(7)
+    dates = pd.date_range(start='2020-01-01', periods=600, freq='D')
+    prices = np.maximum(rng.normal(0, 2, 600).cumsum() + 100, 1)
+    return pd.DataFrame({'Close': prices}, index=dates)
+
+def assert_matches_executor(row, data, executor, **params):
+    backtest = Backtest(data, executor)
+    expected = backtest.calculate_metrics(executor(data, **params))
+    for key in METRICS:
+        assert row[key] == pytest.approx(expected[key], rel=1e-9, nan_ok=True), key
+
+def test_sweep_moving_average_crossover(sample_data):
+    table = sweep_moving_average_crossover(sample_data, [5, 20], [50, 100])
+
+    assert len(table) == 4
+    for _, row in table.iterrows():
+        assert_matches_executor(row, sample_data, execute_moving_average_crossover_strategy,
+                                short_window=int(row['short_window']), long_window=int(row['long_window']))
+
+def execute_bollinger_bands(data, window, num_std):
+    """execute_bollinger_bands_strategy with a window and band width, which it does not take."""
+    signals = bollinger_bands(data, window, num_std)
+    result = execute(signals['price'].to_numpy(), signals['positions'].to_numpy(), INITIAL_CAPITAL,
+                     rule='positions')
+    signals['cumulative_strategy_returns'] = np.concatenate(([INITIAL_CAPITAL], result.equity[:-1]))
+    return signals
+
+def test_sweep_bollinger_bands(sample_data):
+    table = sweep_bollinger_bands(sample_data, [10, BOLLINGER_WINDOW, 45], [1.5, BOLLINGER_NUM_STD])
+
+    assert len(table) == 6
+    for _, row in table.iterrows():
+        assert_matches_executor(row, sample_data, execute_bollinger_bands, window=int(row['window']),
+                                num_std=row['num_std'])
+    default = table[(table['window'] == BOLLINGER_WINDOW) & (table['num_std'] == BOLLINGER_NUM_STD)].iloc[0]
+    assert_matches_executor(default, sample_data, execute_bollinger_bands_strategy)
+
+def test_sweep_rsi(sample_data):
+    table = sweep_rsi(sample_data, [7, 14], [70, 80], [20, 30])
+
+    assert len(table) == 8
+    for _, row in table.iterrows():
+        assert_matches_executor(row, sample_data, execute_rsi_strategy, period=int(row['period']),
+                                overbought=row['overbought'], oversold=row['oversold'])
+
+def test_sweep_macd(sample_data):
+    table = sweep_macd(sample_data, [5, 12], [26], [9, 700])
+
+    assert len(table) == 4
+    for _, row in table.iterrows():
+        assert_matches_executor(row, sample_data, execute_macd_strategy, fast=int(row['fast']),
+                                slow=int(row['slow']), signal=int(row['signal']))
+
+def test_run_sweep_chunking(sample_data):
+    grid = {'short_windows': range(2, 12), 'long_windows': range(20, 40)}
+
+    whole = run_sweep('moving_average_crossover', sample_data, grid)
+    chunked = run_sweep('moving_average_crossover', sample_data, grid, chunk_size=7)
+
+    pd.testing.assert_frame_equal(whole, chunked)
+
+def test_run_sweep_unknown_strategy(sample_data):
+    with pytest.raises(ValueError, match="Unknown strategy"):
+        run_sweep('ichimoku', sample_data, {})
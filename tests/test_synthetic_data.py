@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+import pandas as pd
+import numpy as np
+from utils.synthetic_data import generate_ohlcv, generate_universe, iter_ohlcv_chunks
+from utils.data_fetcher import generate_sample_data
+from strategies.stochastic_oscillator_strategy import stochastic_oscillator_strategy
+
+@pytest.mark.parametrize('model', ['gbm', 'regime'])
+def test_ohlcv_is_consistent(model):
+    data = generate_ohlcv(5000, seed=1, model=model)
+
+    assert list(data.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+    assert len(data) == 5000
+    assert (data['High'] >= data[['Open', 'Close']].max(axis=1)).all()
+    assert (data['Low'] <= data[['Open', 'Close']].min(axis=1)).all()
+    assert (data['Low'] > 0).all()
+    assert (data['Volume'] > 0).all()
+    assert data.index.is_monotonic_increasing
+
+def test_seeded_output_is_deterministic():
+    pd.testing.assert_frame_equal(generate_ohlcv(1000, seed=3), generate_ohlcv(1000, seed=3))
+    assert not generate_ohlcv(1000, seed=3)['Close'].equals(generate_ohlcv(1000, seed=4)['Close'])
+
+def test_chunked_output_matches_single_pass():
+    whole = generate_ohlcv(70000, freq='min', seed=5, model='regime')
+    chunks = list(iter_ohlcv_chunks(70000, freq='min', seed=5, model='regime', chunk_size=9999))
+
+    assert max(len(chunk) for chunk in chunks) == 9999
+    pd.testing.assert_frame_equal(pd.concat(chunks), whole, check_freq=False)
+
+def test_universe_symbols_are_independent():
+    universe = generate_universe(['AAA', 'BBB'], 500, seed=11)
+    extended = generate_universe(['AAA', 'BBB', 'CCC'], 500, seed=11)
+
+    assert set(universe) == {'AAA', 'BBB'}
+    assert not universe['AAA']['Close'].equals(universe['BBB']['Close'])
+    pd.testing.assert_frame_equal(universe['BBB'], extended['BBB'])
+
+def test_lowercase_columns_feed_strategies():
+    data = generate_ohlcv(300, seed=2, lowercase=True)
+
+    signals = stochastic_oscillator_strategy(data)
+
+    assert len(signals) == len(data)
+
+def test_generate_sample_data():
+    data = generate_sample_data('2020-01-01', '2020-03-31', seed=0)
+
+    assert data.index[0] == pd.Timestamp('2020-01-01')
+    assert data.index[-1] == pd.Timestamp('2020-03-31')
+    assert {'Open', 'High', 'Low', 'Close', 'Volume'} <= set(data.columns)
@@ -0,0 +1,190 @@
+# utils/data_cache.py
+
+import contextlib
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+from config import DATA_CACHE_DIR, DATA_CACHE_MAX_BYTES
+
+
+class DataCache:
+    """
+    Persistent on-disk cache of OHLCV history, one columnar .npz file per symbol.
+
+    Each file stores the index, one array per column and the date range that
+    has already been fetched. Requests outside that range only fetch the
+    missing head or tail from the source and merge it in. Empty fetches are not
+    recorded, and ranges reaching today stay open from their last bar on. Files are evicted
+    least-recently-used first once the cache grows beyond max_bytes.
+
+    Each symbol has its own lock, so threads loading different symbols fetch
+    concurrently while requests for the same symbol wait for one download.
+    """
+
+    def __init__(self, source, cache_dir=DATA_CACHE_DIR, max_bytes=DATA_CACHE_MAX_BYTES):
+        """
+        :param source: Callable (symbol, start, end) -> DataFrame indexed by date, end exclusive
+        :param cache_dir: Directory holding the cache files
+        :param max_bytes: Total size above which least recently used files are evicted
+        """
+        self.source = source
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._file_locks = {}
+
+    def _file_lock(self, symbol):
+        # Keyed by path: symbols that map to the same file share a lock
+        with self._lock:
+            return self._file_locks.setdefault(self.path(symbol), threading.Lock())
+
+    def path(self, symbol):
+        safe = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+        return os.path.join(self.cache_dir, f"{safe}.npz")
+
+    def _read(self, symbol):
+        path = self.path(symbol)
+        try:
+            stored = np.load(path, allow_pickle=False)
+        except FileNotFoundError:
+            return None
+
+        with stored:
+            columns = [str(column) for column in stored['columns']]
+            index = pd.DatetimeIndex(stored['index'].view('datetime64[ns]')).as_unit(str(stored['unit']))
+            tz = str(stored['tz'])
+            if tz:
+                index = index.tz_localize('UTC').tz_convert(tz)
+            frame = pd.DataFrame({column: stored[f'column_{i}'] for i, column in enumerate(columns)},
+                                 index=index)
+            covered_start, covered_end = (pd.Timestamp(value) for value in stored['coverage'].view('datetime64[ns]'))
+
+        # Bump the access time used for LRU eviction; another thread may have just evicted it
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+        return frame, covered_start, covered_end
+
+    def _write(self, symbol, frame, covered_start, covered_end):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(symbol)
+
+        index = frame.index
+        unit = index.unit if isinstance(index, pd.DatetimeIndex) else 'ns'
+        tz = str(index.tz) if index.tz is not None else ''
+        if tz:
+            index = index.tz_convert('UTC').tz_localize(None)
+
+        arrays = {f'column_{i}': frame[column].to_numpy() for i, column in enumerate(frame.columns)}
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        np.savez(tmp_path,
+                 index=index.as_unit('ns').asi8,
+                 columns=np.array([str(column) for column in frame.columns]),
+                 coverage=np.array([covered_start.value, covered_end.value], dtype=np.int64),
+                 tz=np.array(tz),
+                 unit=np.array(unit),
+                 **arrays)
+        os.replace(tmp_path, path)
+
+    def _fetch(self, symbol, start, end):
+        frame = self.source(symbol, start, end)
+        if frame is None or frame.empty:
+            return pd.DataFrame(index=pd.DatetimeIndex([]))
+        return frame
+
+    @staticmethod
+    def _covered_end(frame, start, end):
+        """
+        Exclusive end of the part of [start, end) that a fetch returning frame has settled.
+
+        An empty fetch settles nothing, so it is requested again next time. Days before
+        today are final, so a past range is covered up to end. A range reaching today or
+        later is only covered up to the date of its last bar, which is fetched again with
+        any newer bars, since today's bar is still live.
+        """
+        if frame.empty:
+            return start
+        today = pd.Timestamp.now().normalize()
+        if end <= today:
+            return end
+        last = frame.index[-1]
+        if last.tz is not None:
+            last = last.tz_localize(None)
+        return max(start, min(last.normalize(), today))
+
+    def get(self, symbol, start_date, end_date):
+        """
+        Return the cached history of symbol over [start_date, end_date).
+
+        Only the part of the range that is not cached yet is requested from the source.
+        """
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+
+        with self._file_lock(symbol):
+            cached = self._read(symbol)
+            if cached is None:
+                frame = self._fetch(symbol, start, end)
+                covered_start, covered_end = start, self._covered_end(frame, start, end)
+                updated = not frame.empty
+            else:
+                frame, covered_start, covered_end = cached
+                parts = [frame]
+                if start < covered_start:
+                    parts.insert(0, self._fetch(symbol, start, covered_start))
+                    covered_start = start
+                if end > covered_end:
+                    tail = self._fetch(symbol, covered_end, end)
+                    parts.append(tail)
+                    covered_end = self._covered_end(tail, covered_end, end)
+                updated = len(parts) > 1
+                if updated:
+                    parts = [part for part in parts if not part.empty]
+                    frame = pd.concat(parts) if parts else frame
+                    frame = frame[~frame.index.duplicated(keep='last')].sort_index()
+
+            if updated:
+                self._write(symbol, frame, covered_start, covered_end)
+        if updated:
+            with self._lock:
+                self.evict(keep=symbol)
+
+        if frame.empty:
+            return frame
+        return frame[(frame.index >= self._localize(start, frame.index)) &
+                     (frame.index < self._localize(end, frame.index))]
+
+    @staticmethod
+    def _localize(timestamp, index):
+        if index.tz is not None and timestamp.tz is None:
+            return timestamp.tz_localize(index.tz)
+        return timestamp
+
+    def size(self):
+        """Total size of the cache files in bytes."""
+        return sum(os.path.getsize(path) for path in self._files())
+
+    def _files(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                if name.endswith('.npz') and not name.endswith('.tmp.npz')]
+
+    def evict(self, keep=None):
+        """Remove least recently used files until the cache fits in max_bytes."""
+        keep_path = self.path(keep) if keep is not None else None
+        files = sorted(self._files(), key=os.path.getmtime)
+        total = sum(os.path.getsize(path) for path in files)
+        for path in files:
+            if total <= self.max_bytes:
+                break
+            if path == keep_path:
+                continue
+            total -= os.path.getsize(path)
+            os.remove(path)
+
+    def clear(self):
+        for path in self._files():
+            os.remove(path)
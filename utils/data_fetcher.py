@@ -1,20 +1,150 @@
-import yfinance as yf
+import logging
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
-import numpy as np
+from config import FETCH_MAX_WORKERS, FETCH_TIMEOUT, FETCH_RETRIES, FETCH_BACKOFF
+from utils.data_cache import DataCache
+from utils.synthetic_data import generate_ohlcv
+from backtesting.profiling import stage, add_rows
+
+logger = logging.getLogger(__name__)
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+FetchReport = namedtuple('FetchReport', ['data', 'errors'])
+FetchReport.__doc__ = """
+Outcome of fetch_many.
+
+:param data: Dict of symbol -> DataFrame for every symbol that loaded, in request order
+:param errors: Dict of symbol -> error message for every symbol that failed
+"""
+
+class FetchError(Exception):
+    """A symbol could not be downloaded."""
+
+    def __init__(self, symbol, message):
+        super().__init__(f"{symbol}: {message}")
+        self.symbol = symbol
+
+def download_yahoo(symbol, start_date, end_date, retries=FETCH_RETRIES, backoff=FETCH_BACKOFF):
+    """
+    Download daily OHLCV history for one symbol from Yahoo Finance through yfinance.
+
+    Errors yfinance raises, such as rate limiting, are retried with exponential backoff
+    and jitter; an unknown symbol or an empty range returns an empty frame.
+
+    :param retries: Retries after a failed request
+    :param backoff: Seconds before the first retry, doubled for each later one
+    :raises FetchError: After the last retry
+    """
+    # yfinance is only needed on a cache miss, and takes half a second to import
+    import yfinance as yf
+    from yfinance.exceptions import YFInvalidPeriodError, YFTickerMissingError, YFTzMissingError
+
+    for attempt in range(retries + 1):
+        try:
+            # Unlike yf.download, Ticker.history keeps no module-level state, so threads can share it
+            data = yf.Ticker(symbol).history(start=start_date, end=end_date, actions=False, timeout=FETCH_TIMEOUT)
+            break
+        except (YFInvalidPeriodError, YFTickerMissingError, YFTzMissingError, ValueError) as e:
+            raise FetchError(symbol, f"{type(e).__name__}: {e}") from e
+        except Exception as e:
+            if attempt == retries:
+                raise FetchError(symbol, f"{type(e).__name__}: {e} (gave up after {attempt + 1} attempts)") from e
+            time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.0))
+    if isinstance(data.index, pd.DatetimeIndex) and data.index.tz is not None:
+        data.index = data.index.tz_localize(None).rename('Date')
+    return data
 
-def fetch_data(symbol, start_date, end_date):
+def get_default_cache():
+    """Return the shared on-disk cache backed by Yahoo Finance."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = DataCache(download_yahoo)
+        return _default_cache
+
+def _load(source, symbol, start_date, end_date):
     try:
-        data = yf.download(symbol, start=start_date, end=end_date)
-        if data.empty:
-            raise ValueError(f"No data available for {symbol}")
-        return data
+        data = source(symbol, start_date, end_date)
+    except FetchError:
+        raise
     except Exception as e:
-        print(f"Error fetching data for {symbol}: {str(e)}")
-        print(f"Attempted to fetch data from {start_date} to {end_date}")
-        print("Using sample data for testing purposes.")
-        return generate_sample_data(start_date, end_date)
+        raise FetchError(symbol, f"{type(e).__name__}: {e}") from e
+    if data is None or data.empty:
+        raise FetchError(symbol, f"no data between {start_date} and {end_date}")
+    return data
+
+def fetch_data(symbol, start_date, end_date, use_cache=True, sample_fallback=False, source=None):
+    """
+    Daily OHLCV history of one symbol.
+
+    :param source: Optional callable (symbol, start, end) -> DataFrame replacing the cache and
+                   yfinance, e.g. utils.yahoo_client.YahooClient().download
+    :param sample_fallback: On failure, log a warning and return synthetic sample data
+                            instead of raising; the frame's attrs['sample_data'] holds the reason
+    :raises FetchError: If the download fails or has no data, unless sample_fallback is set
+    """
+    with stage('data'):
+        try:
+            if source is None:
+                source = get_default_cache().get if use_cache else download_yahoo
+            data = _load(source, symbol, start_date, end_date)
+        except FetchError as e:
+            if not sample_fallback:
+                raise
+            data = fallback_sample_data(e, start_date, end_date)
+        add_rows(len(data))
+        return data
+
+def fallback_sample_data(error, start_date, end_date):
+    """Log a failed download and return sample data in its place; attrs['sample_data'] holds the reason."""
+    logger.warning("%s; using sample data from %s to %s instead", error, start_date, end_date)
+    data = generate_sample_data(start_date, end_date)
+    data.attrs['sample_data'] = str(error)
+    return data
+
+def fetch_many(symbols, start_date, end_date, use_cache=True, max_workers=FETCH_MAX_WORKERS, source=None):
+    """
+    Daily OHLCV history of many symbols, downloaded concurrently.
+
+    At most max_workers downloads run at once, so round trips overlap and many
+    symbols load at the speed of the network rather than one latency after another.
+    A failed symbol does not stop the others; it is reported in the errors of the result.
+
+    :param symbols: Iterable of symbols; duplicates are fetched once
+    :param source: Optional callable (symbol, start, end) -> DataFrame replacing the cache and
+                   yfinance, e.g. utils.yahoo_client.YahooClient().download
+    :return: FetchReport
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if source is None:
+        source = get_default_cache().get if use_cache else download_yahoo
+
+    with stage('data'):
+        outcomes = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as pool:
+            futures = {symbol: pool.submit(_load, source, symbol, start_date, end_date) for symbol in symbols}
+            for symbol, future in futures.items():
+                try:
+                    outcomes[symbol] = future.result()
+                except FetchError as e:
+                    outcomes[symbol] = e
+
+        data = {symbol: outcome for symbol, outcome in outcomes.items() if isinstance(outcome, pd.DataFrame)}
+        errors = {symbol: str(outcome) for symbol, outcome in outcomes.items() if isinstance(outcome, FetchError)}
+        for error in errors.values():
+            logger.warning("Failed to fetch %s", error)
+        add_rows(sum(len(frame) for frame in data.values()))
+    return FetchReport(data, errors)
 
-def generate_sample_data(start_date, end_date):
+def generate_sample_data(start_date, end_date, seed=None):
+    """Generate daily synthetic OHLCV data between two dates, e.g. when a download fails."""
     date_range = pd.date_range(start=start_date, end=end_date, freq='D')
-    close_prices = np.random.randn(len(date_range)).cumsum() + 100
-    return pd.DataFrame({'Close': close_prices}, index=date_range)
\ No newline at end of file
+    return generate_ohlcv(len(date_range), start=date_range[0] if len(date_range) else start_date,
+                          freq='D', seed=seed)
@@ -0,0 +1,121 @@
+# utils/downsampling.py
+
+import numpy as np
+import pandas as pd
+
+
+def _numeric_axis(x):
+    """Positions along x as floats; datetimes become nanoseconds since the epoch."""
+    if isinstance(x, (pd.DatetimeIndex, pd.Series)) and pd.api.types.is_datetime64_any_dtype(x):
+        return pd.DatetimeIndex(x).asi8.astype(float)
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling of a line.
+
+    Keeps the first and last points and, from each of threshold - 2 equal buckets
+    in between, the point forming the largest triangle with the point kept from the
+    previous bucket and the mean of the next bucket. Peaks and troughs survive,
+    unlike with plain decimation.
+
+    :param x: Index or array of x positions, increasing
+    :param y: Array of y values; NaN points are dropped
+    :param threshold: Number of points to keep
+    :return: Integer array of the kept positions, increasing
+    """
+    x = _numeric_axis(x)
+    y = np.asarray(y, dtype=float)
+    positions = np.flatnonzero(~np.isnan(y))
+    if threshold >= len(positions) or threshold < 3:
+        return positions
+    x = x[positions]
+    y = y[positions]
+
+    edges = np.linspace(1, len(positions) - 1, threshold - 1).astype(np.int64)
+    # Running sums give the mean of every bucket without slicing them twice
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.concatenate(([0.0], np.cumsum(y)))
+    # Bucket b spans edges[b]:edges[b + 1]; the bucket after the last one is the last point
+    next_starts = edges[1:]
+    next_ends = np.append(edges[2:], len(positions))
+    counts = next_ends - next_starts
+    mean_x = (x_sums[next_ends] - x_sums[next_starts]) / counts
+    mean_y = (y_sums[next_ends] - y_sums[next_starts]) / counts
+
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = len(positions) - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        # Twice the triangle area; the constant factor does not change the argmax
+        area = np.abs((x[previous] - mean_x[bucket]) * (bucket_y - y[previous])
+                      - (x[previous] - bucket_x) * (mean_y[bucket] - y[previous]))
+        previous = start + int(np.argmax(area))
+        kept[bucket + 1] = previous
+    return positions[kept]
+
+
+def aggregate_ohlc(data, max_bars):
+    """
+    Merge consecutive bars into at most max_bars candles.
+
+    Each candle opens at its first bar's open, closes at its last bar's close and
+    spans the highest high and lowest low in between; volumes are summed. The
+    candle is stamped with the time of its first bar.
+
+    :param data: DataFrame with 'Open', 'High', 'Low', 'Close' and optionally 'Volume'
+    :param max_bars: Maximum number of candles
+    :return: DataFrame with the same columns, or data itself if it is short enough
+    """
+    if len(data) <= max_bars:
+        return data
+    starts = np.unique(np.linspace(0, len(data), max_bars, endpoint=False).astype(np.int64))
+    ends = np.append(starts[1:], len(data)) - 1
+
+    candles = {
+        'Open': data['Open'].to_numpy(dtype=float)[starts],
+        'High': np.fmax.reduceat(data['High'].to_numpy(dtype=float), starts),
+        'Low': np.fmin.reduceat(data['Low'].to_numpy(dtype=float), starts),
+        'Close': data['Close'].to_numpy(dtype=float)[ends],
+    }
+    if 'Volume' in data.columns:
+        candles['Volume'] = np.add.reduceat(np.nan_to_num(data['Volume'].to_numpy(dtype=float)), starts)
+    return pd.DataFrame(candles, index=data.index[starts])
+
+
+def signal_markers(signals, column='positions', max_markers=None):
+    """
+    Buy and sell markers of a signals DataFrame, extracted once for all traces.
+
+    :param signals: DataFrame with a 'price' column and a positions column
+    :param column: Column whose +1 / -1 values mark buys and sells
+    :param max_markers: Optional limit per side; beyond it the time axis is split into
+                        max_markers equal buckets and the first marker of each is kept
+    :return: Dict with 'buy' and 'sell' Series of marker prices indexed by time
+    """
+    positions = signals[column].to_numpy()
+    price = signals['price'].to_numpy()
+    index = signals.index
+    markers = {}
+    for side, value in (('buy', 1), ('sell', -1)):
+        rows = np.flatnonzero(positions == value)
+        if max_markers is not None and len(rows) > max_markers:
+            buckets = rows * max_markers // len(signals)
+            rows = rows[np.flatnonzero(np.diff(buckets, prepend=-1))]
+        markers[side] = pd.Series(price[rows], index=index[rows])
+    return markers
+
+
+def visible_slice(index, start=None, end=None):
+    """Positional slice of a sorted index between start and end, both inclusive; None leaves a side open."""
+    first = 0 if start is None else index.searchsorted(start, 'left')
+    last = len(index) if end is None else index.searchsorted(end, 'right')
+    return slice(first, last)
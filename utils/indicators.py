@@ -1,10 +1,289 @@
 # utils/indicators.py
 
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
+from config import INDICATOR_CACHE_MAX_BYTES
+from backtesting.profiling import stage
+
+
+def fingerprint(values) -> str:
+    """
+    Content hash of a price series.
+
+    Only the values and their dtype are hashed: indicators depend on the values
+    alone, so series with different indexes but equal values share entries.
+    """
+    array = np.ascontiguousarray(values.to_numpy() if isinstance(values, pd.Series) else values)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(array.dtype).encode())
+    digest.update(array.view(np.uint8))
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    In-memory LRU cache of indicator values keyed by (series fingerprint, indicator, params).
+
+    Values are handed out as copy-on-write views, so callers cannot alter the
+    cached entries. Least recently used entries are evicted once the stored
+    values exceed max_bytes.
+    """
+
+    def __init__(self, max_bytes=INDICATOR_CACHE_MAX_BYTES):
+        """
+        :param max_bytes: Total size of the stored arrays above which entries are evicted
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, prices, name, params, compute):
+        """
+        Return the indicator of prices, computing it only if it is not cached.
+
+        :param prices: Series the indicator is computed from
+        :param name: Indicator name
+        :param params: Tuple of the indicator parameters
+        :param compute: Callable returning the indicator values as an array or Series
+        :return: Series aligned with prices
+        """
+        return self.get_many(prices, name, [params], lambda missing: [compute()])[0]
+
+    def get_many(self, prices, name, params_list, compute):
+        """
+        Return the indicator of prices for several parameter tuples, computing the missing ones in one call.
+
+        :param prices: Series the indicator is computed from
+        :param name: Indicator name
+        :param params_list: List of parameter tuples
+        :param compute: Callable receiving the list of uncached parameter tuples and
+                        returning their values in the same order
+        :return: List of Series aligned with prices, one per parameter tuple
+        """
+        digest = fingerprint(prices)
+        keys = [(digest, name, params) for params in params_list]
+        found = {}
+        with self._lock:
+            for key in keys:
+                values = self._entries.get(key)
+                if values is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    found[key] = values
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            with stage('indicators', rows=len(prices)):
+                computed = [pd.Series(np.asarray(values, dtype=float), copy=False)
+                            for values in compute([key[2] for key in missing])]
+            with self._lock:
+                for key, values in zip(missing, computed):
+                    self.misses += 1
+                    self._store(key, values)
+                    found[key] = values
+        return [found[key].set_axis(prices.index).rename(prices.name) for key in keys]
+
+    def _store(self, key, values):
+        if values.nbytes > self.max_bytes:
+            return
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key).nbytes
+        self._entries[key] = values
+        self.nbytes += values.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+_default_cache = IndicatorCache()
+
+
+def get_indicator_cache():
+    """The process-wide cache shared by all strategies."""
+    return _default_cache
+
+
+def _rolling_count(prices, window):
+    """Number of non-NaN values in each window."""
+    valid = np.concatenate(([0], np.cumsum(prices.notna().to_numpy())))
+    start = np.maximum(np.arange(1, len(valid)) - window, 0)
+    return valid[1:] - valid[start]
+
+
+def rolling_extrema(values, windows, kind='max', min_periods=None):
+    """
+    Rolling max or min of an array for several windows in one pass.
+
+    Builds a sparse table of the extremes of 1, 2, 4, ... consecutive bars once;
+    the extreme of any window is then the extreme of two overlapping table entries.
+    Levels are built in order and each is dropped once the next exists, so at most
+    two arrays of the input's size are alive at a time.
+    NaNs are skipped like Series.rolling().max(), so the results equal pandas exactly.
+
+    :param values: Array of shape (time,) or (time, symbols)
+    :param windows: Window lengths in bars
+    :param kind: 'max' or 'min'
+    :param min_periods: Observations required for a value, defaults to each window length
+    :return: Dict of window -> array shaped like values
+    """
+    if kind not in ('max', 'min'):
+        raise ValueError(f"Unknown kind '{kind}'. Expected 'max' or 'min'")
+    combine = np.fmax if kind == 'max' else np.fmin
+    values = np.asarray(values, dtype=float)
+    windows = sorted({int(window) for window in windows})
+    if not windows or windows[0] < 1:
+        raise ValueError("Windows must be positive")
+    if min_periods is not None and min_periods > windows[0]:
+        raise ValueError(f"min_periods {min_periods} must be <= window {windows[0]}")
+
+    num_bars = values.shape[0]
+    pad = windows[-1] - 1
+    # Leading NaNs make every window full length; they are skipped like missing values
+    # level[i] is the extreme of padded[i:i + 2**k], starting with the padded values at k=0
+    level = np.concatenate((np.full((pad,) + values.shape[1:], np.nan), values))
+    missing = np.isnan(values)
+    # Observations up to each bar, only needed when values are missing
+    valid = np.cumsum(~missing, axis=0) if missing.any() else None
+
+    by_level = {}
+    for window in windows:
+        by_level.setdefault(window.bit_length() - 1, []).append(window)
 
-def calculate_rsi(prices, window=14):
+    result = {}
+    for k in range(max(by_level) + 1):
+        if k:
+            # Only the current level is kept; the one it was built from is dropped
+            span = 2 ** (k - 1)
+            level = combine(level[:-span], level[span:])
+        for window in by_level.get(k, ()):
+            first = pad - window + 1
+            second = pad - 2 ** k + 1
+            extreme = combine(level[first:first + num_bars], level[second:second + num_bars])
+            required = max(window if min_periods is None else min_periods, 1)
+            if valid is None:
+                extreme[:required - 1] = np.nan
+            else:
+                count = valid.copy()
+                count[window:] -= valid[:-window]
+                extreme[count < required] = np.nan
+            result[window] = extreme
+    return result
+
+
+def _rolling_extrema(prices, kind, windows, min_periods, cache):
+    """Cached rolling_extrema of a Series; uncached windows are computed together."""
+    cache = cache if cache is not None else _default_cache
+    windows = list(dict.fromkeys(int(window) for window in windows))
+
+    def params(window):
+        required = window if min_periods is None else min_periods
+        return (window,) if required <= 1 else (window, required)
+
+    def compute(missing):
+        by_required = {}
+        for key in missing:
+            by_required.setdefault(key[1] if len(key) > 1 else 1, []).append(key[0])
+        computed = {}
+        for required, group in by_required.items():
+            extremes = rolling_extrema(prices.to_numpy(dtype=float), group, kind, required)
+            computed.update({params(window): extremes[window] for window in group})
+        return [computed[key] for key in missing]
+
+    series = cache.get_many(prices, f'rolling_{kind}', [params(window) for window in windows], compute)
+    return dict(zip(windows, series))
+
+
+def rolling_max_many(prices, windows, min_periods=None, cache=None):
+    """Cached prices.rolling(window, min_periods).max() for several windows, as a dict of window -> Series."""
+    return _rolling_extrema(prices, 'max', windows, min_periods, cache)
+
+
+def rolling_min_many(prices, windows, min_periods=None, cache=None):
+    """Cached prices.rolling(window, min_periods).min() for several windows, as a dict of window -> Series."""
+    return _rolling_extrema(prices, 'min', windows, min_periods, cache)
+
+
+def _rolling(prices, method, window, min_periods, cache):
+    """
+    Rolling mean through the cache.
+
+    The window is computed once with min_periods=1 and masked for larger
+    min_periods, which gives the same values pandas returns for them.
+    """
+    cache = cache if cache is not None else _default_cache
+    full = cache.get(prices, f'rolling_{method}', (window,),
+                     lambda: getattr(prices.rolling(window=window, min_periods=1), method)())
+    min_periods = window if min_periods is None else min_periods
+    if min_periods <= 1:
+        return full
+    return cache.get(prices, f'rolling_{method}', (window, min_periods),
+                     lambda: full.where(_rolling_count(prices, window) >= min_periods))
+
+
+def rolling_mean(prices, window, min_periods=None, cache=None):
+    """Cached prices.rolling(window, min_periods).mean()."""
+    return _rolling(prices, 'mean', window, min_periods, cache)
+
+
+def rolling_max(prices, window, min_periods=None, cache=None):
+    """Cached prices.rolling(window, min_periods).max()."""
+    return rolling_max_many(prices, [window], min_periods, cache)[window]
+
+
+def rolling_min(prices, window, min_periods=None, cache=None):
+    """Cached prices.rolling(window, min_periods).min()."""
+    return rolling_min_many(prices, [window], min_periods, cache)[window]
+
+
+def rolling_std(prices, window, cache=None):
+    """Cached prices.rolling(window).std()."""
+    cache = cache if cache is not None else _default_cache
+    return cache.get(prices, 'rolling_std', (window,), lambda: prices.rolling(window=window).std())
+
+
+def ewm_mean(prices, span, cache=None):
+    """Cached prices.ewm(span=span, adjust=False).mean()."""
+    cache = cache if cache is not None else _default_cache
+    return cache.get(prices, 'ewm_mean', (span,), lambda: prices.ewm(span=span, adjust=False).mean())
+
+
+def _rsi(prices, window, nan_on_zero_loss):
     delta = prices.diff()
     gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
     loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    if nan_on_zero_loss:
+        loss = loss.replace(0, np.nan)
     rs = gain / loss
-    return 100 - (100 / (1 + rs))
\ No newline at end of file
+    return 100 - (100 / (1 + rs))
+
+
+def calculate_rsi(prices, window=14, nan_on_zero_loss=False, cache=None):
+    """
+    Calculate the Relative Strength Index (RSI) of a price series.
+
+    :param prices: Series of prices
+    :param window: The period over which to average gains and losses
+    :param nan_on_zero_loss: Leave the RSI undefined (NaN) when the average loss is zero
+                             instead of 100 (rising windows) or NaN (flat windows)
+    :param cache: IndicatorCache to use, defaults to the shared cache
+    :return: Series with RSI values
+    """
+    cache = cache if cache is not None else _default_cache
+    return cache.get(prices, 'rsi', (window, nan_on_zero_loss),
+                     lambda: _rsi(prices, window, nan_on_zero_loss))
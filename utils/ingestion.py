@@ -0,0 +1,204 @@
+# utils/ingestion.py
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+from config import INGESTION_CHUNK_ROWS
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Recognized source column names, compared case-insensitively
+_TIMESTAMP_COLUMNS = ('timestamp', 'datetime', 'date', 'time')
+_BAR_COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+_TICK_PRICE_COLUMNS = ('price', 'last')
+_TICK_SIZE_COLUMNS = ('size', 'quantity', 'qty', 'volume')
+
+
+def _epoch_unit(values):
+    """Unit of numeric epoch timestamps, guessed from their magnitude."""
+    magnitude = np.nanmax(np.abs(values)) if len(values) else 0
+    for unit, threshold in (('ns', 1e17), ('us', 1e14), ('ms', 1e11)):
+        if magnitude >= threshold:
+            return unit
+    return 's'
+
+
+def _to_index(values, unit=None, fmt=None, tz=None):
+    if pd.api.types.is_numeric_dtype(values):
+        index = pd.DatetimeIndex(pd.to_datetime(values, unit=unit or _epoch_unit(values.to_numpy())))
+    else:
+        index = pd.DatetimeIndex(pd.to_datetime(values, format=fmt))
+    if tz is not None:
+        index = index.tz_localize(tz) if index.tz is None else index.tz_convert(tz)
+    return index
+
+
+def canonicalize(chunk, timestamp_column=None, timestamp_unit=None, timestamp_format=None, tz=None):
+    """
+    Bring a raw chunk of bars or ticks to the ingestion layout.
+
+    Bars (open/high/low/close[/volume] columns) become Open, High, Low, Close and
+    Volume; ticks (a price or last column, optionally size/quantity/volume)
+    become price and size. Column names are matched case-insensitively and the
+    rows are indexed by their timestamp, sorted.
+
+    :param chunk: DataFrame with a timestamp column (or a DatetimeIndex)
+    :param timestamp_column: Name of the timestamp column, guessed from common names by default
+    :param timestamp_unit: Unit of numeric epoch timestamps, guessed from their magnitude by default
+    :param timestamp_format: strftime format of text timestamps, inferred by default
+    :param tz: Optional time zone; naive timestamps are localized to it, aware ones converted
+    :return: DataFrame indexed by time with OHLCV_COLUMNS or ['price', 'size']
+    """
+    lower = {str(column).lower(): column for column in chunk.columns}
+
+    if timestamp_column is None and not isinstance(chunk.index, pd.DatetimeIndex):
+        timestamp_column = next((lower[name] for name in _TIMESTAMP_COLUMNS if name in lower), None)
+        if timestamp_column is None:
+            raise ValueError(f"No timestamp column found among {list(chunk.columns)}")
+    if timestamp_column is not None:
+        index = _to_index(chunk[timestamp_column], timestamp_unit, timestamp_format, tz)
+    else:
+        index = _to_index(chunk.index.to_series(), tz=tz)
+
+    if all(name in lower for name in ('open', 'high', 'low', 'close')):
+        columns = {canonical: chunk[lower[name]].to_numpy(dtype=float)
+                   for name, canonical in _BAR_COLUMNS.items() if name in lower}
+        columns.setdefault('Volume', np.zeros(len(chunk)))
+    else:
+        price = next((lower[name] for name in _TICK_PRICE_COLUMNS if name in lower), None)
+        if price is None:
+            raise ValueError(f"Expected open/high/low/close bar columns or a price column, got {list(chunk.columns)}")
+        size = next((lower[name] for name in _TICK_SIZE_COLUMNS if name in lower), None)
+        columns = {'price': chunk[price].to_numpy(dtype=float),
+                   'size': chunk[size].to_numpy(dtype=float) if size is not None else np.ones(len(chunk))}
+
+    frame = pd.DataFrame(columns, index=index)
+    frame.index.name = None
+    if not frame.index.is_monotonic_increasing:
+        frame = frame.sort_index(kind='stable')
+    return frame
+
+
+def _read_parquet_chunks(path, chunk_rows):
+    # Optional dependency, only needed for Parquet input
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+
+def iter_file_chunks(path, chunk_rows=INGESTION_CHUNK_ROWS, **kwargs):
+    """
+    Read a CSV (optionally compressed) or Parquet file of bars or ticks chunk by chunk.
+
+    At most chunk_rows rows are held at a time. Parquet files need pyarrow.
+
+    :param path: File path; '.parquet' / '.pq' files are read as Parquet, anything else as CSV
+    :param chunk_rows: Rows per chunk
+    :param kwargs: Timestamp options of canonicalize
+    :return: Iterator of canonicalize()d DataFrames
+    """
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows must be positive")
+    if str(path).lower().endswith(('.parquet', '.pq')):
+        raw = _read_parquet_chunks(path, chunk_rows)
+    else:
+        raw = pd.read_csv(path, chunksize=chunk_rows)
+    for chunk in raw:
+        yield canonicalize(chunk, **kwargs)
+
+
+def _resample_chunk(chunk, rule, origin):
+    # Calendar frequencies (days, weeks, months) are anchored already and take no origin
+    options = {'origin': origin} if isinstance(to_offset(rule), Tick) else {}
+    if 'price' in chunk.columns:
+        resampler = chunk.resample(rule, **options)
+        bars = resampler['price'].ohlc()
+        bars.columns = ['Open', 'High', 'Low', 'Close']
+        bars['Volume'] = resampler['size'].sum()
+    else:
+        bars = chunk.resample(rule, **options).agg(
+            {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'})
+    # Periods without a trade (nights, weekends) produce no bar
+    return bars[bars['Close'].notna()]
+
+
+def iter_resampled(chunks, rule, origin='epoch'):
+    """
+    Resample a time-ordered stream of bar or tick chunks to OHLCV bars of another size.
+
+    A bar can span two chunks, so the last bar of every chunk is held back and
+    merged with the first bar of the next one: the output is the same as
+    resampling the whole series at once, with only one chunk in memory.
+
+    :param chunks: Iterable of canonicalize()d DataFrames in time order
+    :param rule: pandas frequency of the output bars, e.g. '1min', '5min', '1h' or 'D'
+    :param origin: Bin origin for fixed frequencies; 'epoch' keeps bins aligned across chunks
+    :return: Iterator of OHLCV DataFrames of completed bars
+    """
+    pending = None
+    last_time = None
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        if last_time is not None and chunk.index[0] < last_time:
+            raise ValueError(f"Input is not in time order: {chunk.index[0]} follows {last_time}")
+        last_time = chunk.index[-1]
+
+        bars = _resample_chunk(chunk, rule, origin)
+        if pending is not None:
+            if len(bars) and bars.index[0] == pending.index[0]:
+                first = bars.iloc[0]
+                bars.iloc[0] = [pending['Open'].iloc[0],
+                                max(pending['High'].iloc[0], first['High']),
+                                min(pending['Low'].iloc[0], first['Low']),
+                                first['Close'],
+                                pending['Volume'].iloc[0] + first['Volume']]
+            else:
+                bars = pd.concat([pending, bars])
+        pending = bars.iloc[-1:]
+        if len(bars) > 1:
+            yield bars.iloc[:-1]
+    if pending is not None:
+        yield pending
+
+
+def iter_bars(path, rule=None, chunk_rows=INGESTION_CHUNK_ROWS, lowercase=False, origin='epoch', **kwargs):
+    """
+    Stream the canonical OHLCV bars of a local CSV/Parquet file of bars or ticks.
+
+    :param path: File of minute (or other) bars or of ticks, in time order
+    :param rule: Output bar size such as '1min', '5min', '1h' or 'D'; None keeps the
+                 file's bars and is not allowed for ticks
+    :param chunk_rows: Rows read at a time, which bounds memory use
+    :param lowercase: Use 'open/high/low/close/volume' column names instead of 'Open/High/...'
+    :param origin: Bin origin for fixed frequencies, see iter_resampled
+    :param kwargs: Timestamp options of canonicalize
+    :return: Iterator of OHLCV DataFrames
+    """
+    chunks = iter_file_chunks(path, chunk_rows, **kwargs)
+    stream = chunks if rule is None else iter_resampled(chunks, rule, origin)
+    for bars in stream:
+        if 'price' in bars.columns:
+            raise ValueError("Tick data has to be resampled; pass a rule such as '1min'")
+        if lowercase:
+            bars = bars.rename(columns=str.lower)
+        yield bars
+
+
+def load_bars(path, rule=None, **kwargs):
+    """
+    Load a local CSV/Parquet file of bars or ticks as one OHLCV DataFrame for the strategies.
+
+    Example:
+        data = load_bars('ticks.csv.gz', rule='5min')
+        signals = Backtest(data, execute_rsi_strategy).run()
+
+    Accepts the same arguments as iter_bars; only the output bars are held in memory.
+    """
+    frames = list(iter_bars(path, rule, **kwargs))
+    if not frames:
+        columns = [column.lower() for column in OHLCV_COLUMNS] if kwargs.get('lowercase') else OHLCV_COLUMNS
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([]), dtype=float)
+    return pd.concat(frames) if len(frames) > 1 else frames[0]
@@ -1,6 +1,20 @@
+from collections import namedtuple
+
 import numpy as np
 import pandas as pd
-from scipy.optimize import minimize
+
+OPTIMIZER_BACKENDS = ('fast', 'slsqp')
+STRATEGIES = ('sharpe', 'sortino', 'max_return', 'min_volatility')
+FRONTIER_TARGETS = ('return', 'volatility')
+
+EfficientFrontier = namedtuple('EfficientFrontier', ['returns', 'volatilities', 'weights'])
+EfficientFrontier.__doc__ = """
+Portfolios along the efficient frontier, one per target.
+
+:param returns: Array of expected annual returns
+:param volatilities: Array of annual volatilities
+:param weights: DataFrame with one row of weights per frontier point and one column per asset
+"""
 
 def portfolio_performance(weights, returns, strategy='sharpe'):
     portfolio_return = np.sum(returns.mean() * weights) * 252
@@ -30,7 +44,226 @@ def objective_function(weights, returns, strategy='sharpe', risk_free_rate=0.02)
     elif strategy == 'min_volatility':
         return portfolio_performance(weights, returns, strategy='min_volatility')
 
-def optimize_portfolio(returns, strategy='sharpe', min_weight=0.05, max_weight=0.4, min_assets=3, risk_free_rate=0.02):
+def portfolio_moments(returns):
+    """
+    Annualized moments used by every objective, computed once.
+
+    :param returns: DataFrame of periodic asset returns
+    :return: (mean returns, covariance matrix, downside covariance matrix) as arrays,
+             matching portfolio_performance
+    """
+    downside_returns = returns.copy()
+    downside_returns[downside_returns > 0] = 0
+    mean = returns.mean().to_numpy() * 252
+    cov = returns.cov().to_numpy() * 252
+    downside_cov = downside_returns.cov().to_numpy() * 252
+    if not (np.isfinite(mean).all() and np.isfinite(cov).all() and np.isfinite(downside_cov).all()):
+        raise ValueError("Returns must give finite means and covariances for every asset")
+    return mean, cov, downside_cov
+
+def project_capped_simplex(v, lower, upper):
+    """
+    Euclidean projection of v onto {w : lower <= w <= upper, sum(w) == 1}.
+
+    The projection is clip(v - tau, lower, upper) for the shift tau where the clipped
+    weights sum to one. The sum is piecewise linear in tau with kinks at v - upper
+    and v - lower, so tau is found exactly from the sorted kinks.
+    """
+    num_assets = len(v)
+    sorted_v = np.sort(v)
+    cumulative = np.concatenate(([0.0], np.cumsum(sorted_v)))
+    enter = sorted_v - upper  # Weights below their cap for tau above these
+    leave = sorted_v - lower  # Weights at their floor for tau above these
+
+    def total(tau):
+        capped_end = np.searchsorted(enter, tau, 'left')
+        floored_end = np.searchsorted(leave, tau, 'right')
+        free = capped_end - floored_end
+        return ((num_assets - capped_end) * upper + floored_end * lower
+                + cumulative[capped_end] - cumulative[floored_end] - free * tau), capped_end, floored_end
+
+    kinks = np.sort(np.concatenate((enter, leave)))
+    sums = total(kinks)[0]
+    # sums is non-increasing; the solution lies between the last kink summing to >= 1 and the next
+    k = np.searchsorted(-sums, -1.0, 'right') - 1
+    if k < 0:
+        tau = kinks[0]
+    elif k >= len(kinks) - 1:
+        tau = kinks[-1]
+    else:
+        _, capped_end, floored_end = total(0.5 * (kinks[k] + kinks[k + 1]))
+        free = capped_end - floored_end
+        if free > 0:
+            tau = ((num_assets - capped_end) * upper + floored_end * lower
+                   + cumulative[capped_end] - cumulative[floored_end] - 1.0) / free
+        else:
+            tau = kinks[k]
+    return np.clip(v - tau, lower, upper)
+
+def _capped_simplex_projector(lower, upper):
+    """
+    project_capped_simplex for repeated projections of nearby points.
+
+    Newton steps on the shift tau start from the previous projection's shift and
+    usually land on the exact shift in one or two steps; otherwise the sort-based
+    projection is used.
+    """
+    state = {'tau': None}
+
+    def project(v):
+        tau = state['tau']
+        if tau is not None:
+            for _ in range(3):
+                shifted = v - tau
+                free = (shifted > lower) & (shifted < upper)
+                num_free = np.count_nonzero(free)
+                if not num_free:
+                    break
+                excess = np.clip(shifted, lower, upper).sum() - 1.0
+                if abs(excess) <= 1e-13:
+                    state['tau'] = tau
+                    return np.clip(shifted, lower, upper)
+                tau += excess / num_free
+        w = project_capped_simplex(v, lower, upper)
+        free = (w > lower) & (w < upper)
+        state['tau'] = np.mean(v[free] - w[free]) if free.any() else None
+        return w
+
+    return project
+
+def _spectral_projected_gradient(objective, x0, project, max_iter=10000, tol=1e-10, memory=10):
+    """
+    Minimize a smooth objective over a convex set with the nonmonotone spectral projected gradient method.
+
+    :param objective: Callable x -> (value, gradient)
+    :param x0: Starting point
+    :param project: Callable projecting a point onto the feasible set
+    :return: Approximate minimizer
+    """
+    x = project(x0)
+    f, g = objective(x)
+    history = [f]
+    step = 1.0 / max(np.abs(project(x - g) - x).max(), 1e-12)
+
+    for _ in range(max_iter):
+        d = project(x - step * g) - x
+        # |d| / min(step, 1) bounds the unit-step projected gradient from above
+        if np.abs(d).max() <= tol * max(1.0, np.abs(g).max()) * min(step, 1.0):
+            break
+        slope = g @ d
+        reference = max(history)
+
+        lam = 1.0
+        while True:
+            x_new = x + lam * d
+            f_new, g_new = objective(x_new)
+            if f_new <= reference + 1e-4 * lam * slope or lam < 1e-12:
+                break
+            lam *= 0.5
+
+        s_vec = x_new - x
+        y_vec = g_new - g
+        sy = s_vec @ y_vec
+        # Barzilai-Borwein step; without positive curvature the accepted step length is kept
+        step = np.clip((s_vec @ s_vec) / sy, 1e-12, 1e12) if sy > 0 else step * lam
+        x, f, g = x_new, f_new, g_new
+        history.append(f)
+        if len(history) > memory:
+            history.pop(0)
+    return x
+
+def _ratio_objective(mean, cov, risk_free_rate):
+    """Negative (return - risk free) / deviation and its gradient."""
+    def objective(w):
+        cov_w = cov @ w
+        deviation = np.sqrt(w @ cov_w)
+        excess = mean @ w - risk_free_rate
+        value = -excess / deviation
+        gradient = -(mean / deviation - excess * cov_w / deviation ** 3)
+        return value, gradient
+    return objective
+
+def _variance_objective(cov):
+    def objective(w):
+        cov_w = cov @ w
+        return w @ cov_w, 2 * cov_w
+    return objective
+
+def _max_return_weights(mean, lower, upper):
+    """Exact solution of the linear program: fill the highest returns up to the cap."""
+    weights = np.full(len(mean), lower, dtype=float)
+    budget = 1 - weights.sum()
+    for i in np.argsort(-mean, kind='stable'):
+        if budget <= 0:
+            break
+        add = min(upper - lower, budget)
+        weights[i] += add
+        budget -= add
+    return weights
+
+def fast_optimize_weights(moments, strategy='sharpe', min_weight=0.05, max_weight=0.4, risk_free_rate=0.02,
+                          x0=None):
+    """
+    Optimize weights in [min_weight, max_weight] summing to one from precomputed moments.
+
+    Min-volatility is a convex QP and the Sharpe and Sortino ratios are pseudo-convex
+    when some feasible portfolio beats the risk-free rate, so projected gradient steps
+    with analytic gradients reach the global optimum. Max-return is solved exactly.
+
+    :param moments: (mean, cov, downside_cov) from portfolio_moments
+    :param x0: Optional starting weights, e.g. a neighbouring solution
+    :return: Array of weights
+    """
+    mean, cov, downside_cov = moments
+    num_assets = len(mean)
+    if num_assets * min_weight > 1 + 1e-12 or num_assets * max_weight < 1 - 1e-12 or min_weight > max_weight:
+        raise ValueError(f"No weights of {num_assets} assets in [{min_weight}, {max_weight}] sum to 1")
+
+    if strategy == 'max_return':
+        return _max_return_weights(mean, min_weight, max_weight)
+    if strategy == 'min_volatility':
+        objective = _variance_objective(cov)
+    elif strategy == 'sharpe':
+        objective = _ratio_objective(mean, cov, risk_free_rate)
+    elif strategy == 'sortino':
+        objective = _ratio_objective(mean, downside_cov, risk_free_rate)
+    else:
+        raise ValueError(f"Unknown strategy '{strategy}'. Expected one of {STRATEGIES}")
+
+    if x0 is None:
+        x0 = np.full(num_assets, 1.0 / num_assets)
+    return _spectral_projected_gradient(objective, np.asarray(x0, dtype=float),
+                                        _capped_simplex_projector(min_weight, max_weight))
+
+def feasible_bounds(num_assets, min_weight, max_weight):
+    """
+    Widen weight bounds just enough for weights summing to one to exist.
+
+    E.g. min_weight=0.05 over 25 assets becomes 0.04, so equal weights are the only solution.
+
+    :return: (min_weight, max_weight)
+    """
+    if num_assets == 0:
+        return min_weight, max_weight
+    return min(min_weight, 1.0 / num_assets), max(max_weight, 1.0 / num_assets)
+
+def optimize_portfolio(returns, strategy='sharpe', min_weight=0.05, max_weight=0.4, min_assets=3, risk_free_rate=0.02,
+                       backend='fast'):
+    """
+    Optimize portfolio weights.
+
+    :param backend: 'fast' solves from precomputed moments with analytic gradients, first widening
+                    bounds no weights can satisfy with feasible_bounds;
+                    'slsqp' runs scipy's SLSQP on the original objective functions
+    """
+    if backend not in OPTIMIZER_BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'. Expected one of {OPTIMIZER_BACKENDS}")
+    if backend == 'fast':
+        if min_weight <= max_weight:
+            min_weight, max_weight = feasible_bounds(returns.shape[1], min_weight, max_weight)
+        weights = fast_optimize_weights(portfolio_moments(returns), strategy, min_weight, max_weight, risk_free_rate)
+        return _enforce_min_assets(weights, min_weight, min_assets)
+
     num_assets = returns.shape[1]
     
     # Constraints
@@ -45,11 +278,15 @@ def optimize_portfolio(returns, strategy='sharpe', min_weight=0.05, max_weight=0
     # Initial guess: equal weights
     init_guess = np.array([1.0 / num_assets] * num_assets)
     
+    # Imported on first use: scipy is slow to import and the fast backend does not need it
+    from scipy.optimize import minimize
     result = minimize(objective_function, init_guess, args=(returns, strategy, risk_free_rate),
                       method='SLSQP', bounds=bounds, constraints=constraints)
     
+    return _enforce_min_assets(result.x, min_weight, min_assets)
+
+def _enforce_min_assets(weights, min_weight, min_assets):
     # Ensure the result meets the minimum assets constraint
-    weights = result.x
     if np.sum(weights > min_weight) < min_assets:
         # If constraint not met, force top min_assets to have at least min_weight
         top_indices = np.argsort(weights)[-min_assets:]
@@ -58,7 +295,8 @@ def optimize_portfolio(returns, strategy='sharpe', min_weight=0.05, max_weight=0
     
     return weights
 
-def safe_optimize_portfolio(returns, strategy='sharpe', min_weight=0.05, max_weight=0.4, min_assets=3, risk_free_rate=0.02):
+def safe_optimize_portfolio(returns, strategy='sharpe', min_weight=0.05, max_weight=0.4, min_assets=3, risk_free_rate=0.02,
+                            backend='fast'):
     try:
         if returns.empty or returns.isna().all().all():
             raise ValueError("Returns data is empty or contains only NaN values")
@@ -66,8 +304,231 @@ def safe_optimize_portfolio(returns, strategy='sharpe', min_weight=0.05, max_wei
         if (returns == 0).all().all():
             raise ValueError("Returns data contains only zeros")
 
-        weights = optimize_portfolio(returns, strategy, min_weight, max_weight, min_assets, risk_free_rate)
+        weights = optimize_portfolio(returns, strategy, min_weight, max_weight, min_assets, risk_free_rate, backend)
         return weights
     except Exception as e:
         print(f"Error in portfolio optimization: {str(e)}")
-        return np.full(returns.shape[1], 1/returns.shape[1])  # Equal weights as fallback
\ No newline at end of file
+        return np.full(returns.shape[1], 1/returns.shape[1])  # Equal weights as fallback
+
+def _targeted_weights(moments, target, value, min_weight, max_weight, x0, multiplier=0.0, tol=1e-9):
+    """
+    One frontier point by the augmented Lagrangian method.
+
+    'return' minimizes variance with mean'w == value; 'volatility' maximizes mean'w
+    with w'cov w <= value**2. The budget and bounds are kept by projection, so only
+    the target constraint is relaxed.
+
+    :param x0: Starting weights, usually the neighbouring frontier point
+    :param multiplier: Starting Lagrange multiplier of the target constraint
+    :return: (weights, multiplier)
+    """
+    mean, cov, _ = moments
+    # Penalty scaled so both terms of the augmented objective start comparable
+    scale = max(np.trace(cov) / len(mean), 1e-12)
+    if target == 'return':
+        penalty = 10 * scale / max(np.var(mean), 1e-12)
+        constraint = lambda w: mean @ w - value
+        constraint_gradient = lambda w: mean
+        base = _variance_objective(cov)
+    else:
+        penalty = 10 / scale
+        constraint = lambda w: w @ cov @ w - value ** 2
+        constraint_gradient = lambda w: 2 * (cov @ w)
+        base = lambda w: (-(mean @ w), -mean)
+
+    project = _capped_simplex_projector(min_weight, max_weight)
+    weights = project(np.asarray(x0, dtype=float))
+    violation = np.inf
+    for _ in range(50):
+        def objective(w, multiplier=multiplier, penalty=penalty):
+            f, g = base(w)
+            h = constraint(w)
+            if target == 'volatility':
+                # Inequality constraint: only the active part is penalized
+                shifted = max(multiplier + penalty * h, 0.0)
+                return f + (shifted ** 2 - multiplier ** 2) / (2 * penalty), g + shifted * constraint_gradient(w)
+            return f + multiplier * h + 0.5 * penalty * h ** 2, g + (multiplier + penalty * h) * constraint_gradient(w)
+
+        weights = _spectral_projected_gradient(objective, weights, project, tol=tol)
+        h = constraint(weights)
+        if target == 'volatility':
+            multiplier = max(multiplier + penalty * h, 0.0)
+            h = max(h, -multiplier / penalty)
+        else:
+            multiplier += penalty * h
+        if abs(h) <= tol * max(1.0, abs(value)):
+            break
+        if abs(h) > 0.25 * violation:
+            penalty *= 10
+        violation = abs(h)
+    return weights, multiplier
+
+def _active_set_weights(moments, value, min_weight, max_weight, x0, max_iter=50):
+    """
+    Minimum variance weights with mean'w == value by a primal-dual active set method.
+
+    For a guess of which weights sit at their bounds, the remaining weights solve a
+    small linear KKT system; the guess is updated from the solution until it repeats,
+    at which point the weights are exactly optimal. Starting from the neighbouring
+    frontier point, this usually takes one or two solves.
+
+    :return: (weights, multiplier of the return constraint), or None if the method
+             does not settle or the system is singular
+    """
+    mean, cov, _ = moments
+    num_assets = len(mean)
+    constraints = np.vstack((np.ones(num_assets), mean))
+    targets = np.array([1.0, value])
+    scale = np.mean(np.diag(cov))
+    tolerance = 1e-12 * max(1.0, max_weight)
+    at_upper = x0 >= max_weight - tolerance
+    at_lower = (x0 <= min_weight + tolerance) & ~at_upper
+
+    for _ in range(max_iter):
+        free = ~(at_upper | at_lower)
+        num_free = np.count_nonzero(free)
+        if num_free < 2:
+            return None
+        weights = np.where(at_upper, max_weight, min_weight).astype(float)
+        kkt = np.zeros((num_free + 2, num_free + 2))
+        kkt[:num_free, :num_free] = cov[np.ix_(free, free)]
+        kkt[:num_free, num_free:] = constraints[:, free].T
+        kkt[num_free:, :num_free] = constraints[:, free]
+        rhs = np.concatenate((-cov[np.ix_(free, ~free)] @ weights[~free],
+                              targets - constraints[:, ~free] @ weights[~free]))
+        try:
+            solution = np.linalg.solve(kkt, rhs)
+        except np.linalg.LinAlgError:
+            return None
+        weights[free] = solution[:num_free]
+        multipliers = solution[num_free:]
+
+        gradient = cov @ weights + constraints.T @ multipliers
+        gradient[free] = 0.0
+        step = weights - gradient / scale
+        new_upper = step > max_weight + tolerance
+        new_lower = (step < min_weight - tolerance) & ~new_upper
+        if np.array_equal(new_upper, at_upper) and np.array_equal(new_lower, at_lower):
+            return np.clip(weights, min_weight, max_weight), multipliers[1]
+        at_upper, at_lower = new_upper, new_lower
+    return None
+
+def _volatility_target_weights(moments, value, min_weight, max_weight, x0, return_range):
+    """
+    Maximum return weights with volatility == value.
+
+    Safeguarded Newton steps on the target return of _active_set_weights: the variance
+    of the minimum variance portfolio grows with its return at rate -2 * multiplier.
+    Steps leaving the bracket around the solution fall back to bisection.
+
+    :return: Weights, or None if an active set solve fails
+    """
+    mean, cov, _ = moments
+    low, high = return_range
+    target_return = np.clip(mean @ x0, low, high)
+    weights = x0
+    for _ in range(100):
+        solved = _active_set_weights(moments, target_return, min_weight, max_weight, weights)
+        if solved is None:
+            return None
+        weights, multiplier = solved
+        excess = weights @ cov @ weights - value ** 2
+        if abs(excess) <= 1e-13 * value ** 2:
+            break
+        if excess < 0:
+            low = target_return
+        else:
+            high = target_return
+        slope = -2 * multiplier
+        step = target_return - excess / slope if slope > 0 else np.nan
+        target_return = step if low < step < high else 0.5 * (low + high)
+    return weights
+
+def _frontier_segment(moments, target, values, min_weight, max_weight, anchors, ends):
+    """
+    Solve consecutive targets, warm-starting each from the previous solution.
+
+    :param anchors: (minimum volatility weights, maximum return weights)
+    :param ends: Target values of the two anchors
+    """
+    min_vol_weights, max_return_weights = anchors
+    low, high = moments[0] @ min_vol_weights, moments[0] @ max_return_weights
+    weights = None
+    multiplier = 0.0
+    solutions = []
+    for value in values:
+        if value == ends[0] or value == ends[1]:
+            solutions.append((min_vol_weights if value == ends[0] else max_return_weights).copy())
+            continue
+        if weights is None:
+            # Mix of the two end portfolios: inside the bounds and close to the frontier
+            theta = 0.0 if high == low or target != 'return' else np.clip((value - low) / (high - low), 0, 1)
+            weights = (1 - theta) * min_vol_weights + theta * max_return_weights
+        if target == 'return':
+            solved = _active_set_weights(moments, value, min_weight, max_weight, weights)
+            if solved is not None:
+                solved = solved[0]
+        else:
+            solved = _volatility_target_weights(moments, value, min_weight, max_weight, weights, (low, high))
+        if solved is None:
+            weights, multiplier = _targeted_weights(moments, target, value, min_weight, max_weight, weights,
+                                                    multiplier)
+        else:
+            weights = solved
+        solutions.append(weights)
+    return solutions
+
+def efficient_frontier(returns, num_points=50, min_weight=0.0, max_weight=1.0, target='return', targets=None,
+                       workers=1, moments=None):
+    """
+    Compute the efficient frontier for many target returns or volatilities in one call.
+
+    Targets are solved in order within contiguous segments, each point warm-started
+    from its neighbour. Segments run in parallel when workers > 1.
+
+    :param returns: DataFrame of periodic asset returns
+    :param num_points: Number of evenly spaced targets between the minimum volatility
+                       and the maximum return portfolios, used when targets is None
+    :param target: 'return' for the minimum volatility at each target return,
+                   'volatility' for the maximum return at each target volatility
+    :param targets: Optional annual target values; values outside the frontier are clipped to its ends
+    :param workers: Number of parallel segments (joblib workers)
+    :param moments: Optional precomputed portfolio_moments(returns)
+    :return: EfficientFrontier
+    """
+    if target not in FRONTIER_TARGETS:
+        raise ValueError(f"Unknown target '{target}'. Expected one of {FRONTIER_TARGETS}")
+    moments = portfolio_moments(returns) if moments is None else moments
+    mean, cov, _ = moments
+
+    min_vol_weights = fast_optimize_weights(moments, 'min_volatility', min_weight, max_weight)
+    max_return_weights = _max_return_weights(mean, min_weight, max_weight)
+    if target == 'return':
+        ends = (mean @ min_vol_weights, mean @ max_return_weights)
+    else:
+        ends = (np.sqrt(min_vol_weights @ cov @ min_vol_weights), np.sqrt(max_return_weights @ cov @ max_return_weights))
+    if targets is None:
+        values = np.linspace(ends[0], ends[1], num_points)
+    else:
+        values = np.clip(np.asarray(targets, dtype=float), min(ends), max(ends))
+
+    order = np.argsort(values, kind='stable')
+    segments = [segment for segment in np.array_split(order, max(min(workers, len(values)), 1)) if len(segment)]
+    anchors = (min_vol_weights, max_return_weights)
+    if workers > 1 and len(segments) > 1:
+        import joblib
+        solved = joblib.Parallel(n_jobs=workers)(
+            joblib.delayed(_frontier_segment)(moments, target, values[segment], min_weight, max_weight, anchors, ends)
+            for segment in segments
+        )
+    else:
+        solved = [_frontier_segment(moments, target, values[segment], min_weight, max_weight, anchors, ends)
+                  for segment in segments]
+
+    weights = np.empty((len(values), len(mean)))
+    for segment, solutions in zip(segments, solved):
+        weights[segment] = solutions
+    frontier_returns = weights @ mean
+    frontier_volatilities = np.sqrt(np.einsum('ij,jk,ik->i', weights, cov, weights))
+    return EfficientFrontier(frontier_returns, frontier_volatilities,
+                             pd.DataFrame(weights, columns=returns.columns))
@@ -0,0 +1,325 @@
+# utils/streaming_indicators.py
+
+import math
+from collections import deque
+
+from config import (RSI_WINDOW, MACD_FAST, MACD_SLOW, MACD_SIGNAL, BOLLINGER_WINDOW, BOLLINGER_NUM_STD,
+                    STOCHASTIC_K_PERIOD, STOCHASTIC_D_PERIOD, CONVERSION_LINE_PERIOD, BASE_LINE_PERIOD,
+                    LEADING_SPAN_B_PERIOD)
+
+NAN = float('nan')
+
+
+def _field(bar, name):
+    """Read a price field from a bar given as a number, a mapping or a row with 'close' or 'Close'."""
+    if isinstance(bar, (int, float)):
+        return float(bar)
+    for key in (name, name.capitalize()):
+        try:
+            return float(bar[key])
+        except (KeyError, IndexError, TypeError):
+            continue
+    raise KeyError(f"Bar has no '{name}' field")
+
+
+class RollingMean:
+    """
+    O(1) rolling mean over a fixed window, ignoring NaNs like Series.rolling().mean().
+
+    Uses compensated (Kahan) running sums for the values entering and leaving the window.
+    """
+
+    __slots__ = ('window', 'min_periods', 'values', 'nobs', 'sum', 'neg_ct', 'compensation_add',
+                 'compensation_remove', 'same_count', 'prev_value')
+
+    def __init__(self, window, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.values = deque()
+        self.nobs = 0
+        self.sum = 0.0
+        self.neg_ct = 0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.same_count = 0
+        self.prev_value = None
+
+    def update(self, value):
+        if self.prev_value is None:
+            self.prev_value = value
+
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if not math.isnan(old):
+                self.nobs -= 1
+                y = -old - self.compensation_remove
+                t = self.sum + y
+                self.compensation_remove = t - self.sum - y
+                self.sum = t
+                if math.copysign(1.0, old) < 0:
+                    self.neg_ct -= 1
+
+        self.values.append(value)
+        if not math.isnan(value):
+            self.nobs += 1
+            y = value - self.compensation_add
+            t = self.sum + y
+            self.compensation_add = t - self.sum - y
+            self.sum = t
+            if math.copysign(1.0, value) < 0:
+                self.neg_ct += 1
+            if value == self.prev_value:
+                self.same_count += 1
+            else:
+                self.same_count = 1
+            self.prev_value = value
+
+        return self.value
+
+    @property
+    def value(self):
+        if self.nobs < self.min_periods or self.nobs == 0:
+            return NAN
+        if self.same_count >= self.nobs:
+            return self.prev_value
+        result = self.sum / self.nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+
+class RollingStd:
+    """O(1) rolling sample standard deviation using Welford's add/remove updates."""
+
+    __slots__ = ('window', 'min_periods', 'ddof', 'values', 'nobs', 'mean', 'ssqdm', 'compensation_add',
+                 'compensation_remove')
+
+    def __init__(self, window, min_periods=None, ddof=1):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.ddof = ddof
+        self.values = deque()
+        self.nobs = 0
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            old = self.values.popleft()
+            if not math.isnan(old):
+                self.nobs -= 1
+                if self.nobs:
+                    prev_mean = self.mean - self.compensation_remove
+                    y = old - self.compensation_remove
+                    t = y - self.mean
+                    self.compensation_remove = t + self.mean - y
+                    self.mean -= t / self.nobs
+                    self.ssqdm -= (old - prev_mean) * (old - self.mean)
+                else:
+                    self.mean = 0.0
+                    self.ssqdm = 0.0
+
+        self.values.append(value)
+        if not math.isnan(value):
+            self.nobs += 1
+            prev_mean = self.mean - self.compensation_add
+            y = value - self.compensation_add
+            t = y - self.mean
+            self.compensation_add = t + self.mean - y
+            self.mean += t / self.nobs
+            self.ssqdm += (value - prev_mean) * (value - self.mean)
+
+        return self.value
+
+    @property
+    def value(self):
+        if self.nobs < self.min_periods or self.nobs <= self.ddof:
+            return NAN
+        if self.nobs == 1:
+            return 0.0
+        return math.sqrt(max(self.ssqdm / (self.nobs - self.ddof), 0.0))
+
+
+class RollingExtreme:
+    """O(1) amortized rolling max (or min) using a monotonic deque."""
+
+    __slots__ = ('window', 'min_periods', 'is_max', 'candidates', 'valid', 'nobs', 'count')
+
+    def __init__(self, window, min_periods=None, is_max=True):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.is_max = is_max
+        self.candidates = deque()  # (position, value) pairs, best value first
+        self.valid = deque()
+        self.nobs = 0
+        self.count = 0
+
+    def update(self, value):
+        position = self.count
+        self.count += 1
+
+        if len(self.valid) == self.window:
+            self.nobs -= self.valid.popleft()
+        is_valid = not math.isnan(value)
+        self.valid.append(is_valid)
+        self.nobs += is_valid
+
+        while self.candidates and self.candidates[0][0] <= position - self.window:
+            self.candidates.popleft()
+        if is_valid:
+            if self.is_max:
+                while self.candidates and self.candidates[-1][1] <= value:
+                    self.candidates.pop()
+            else:
+                while self.candidates and self.candidates[-1][1] >= value:
+                    self.candidates.pop()
+            self.candidates.append((position, value))
+
+        return self.value
+
+    @property
+    def value(self):
+        if self.nobs < max(self.min_periods, 1) or not self.candidates:
+            return NAN
+        return self.candidates[0][1]
+
+
+class ExponentialMean:
+    """Recursive exponential moving average, equal to Series.ewm(span=span, adjust=False).mean()."""
+
+    __slots__ = ('alpha', 'value', 'old_wt')
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = NAN
+        self.old_wt = 1.0
+
+    def update(self, value):
+        is_observation = not math.isnan(value)
+        if not math.isnan(self.value):
+            # Missing values still decay the weight of the running average
+            self.old_wt *= 1.0 - self.alpha
+            if is_observation:
+                if self.value != value:
+                    self.value = (self.old_wt * self.value + self.alpha * value) / (self.old_wt + self.alpha)
+                self.old_wt = 1.0
+        elif is_observation:
+            self.value = value
+        return self.value
+
+
+class StreamingRSI:
+    """Incremental strategies.rsi_strategy.calculate_rsi."""
+
+    def __init__(self, period=RSI_WINDOW):
+        self.gain = RollingMean(period)
+        self.loss = RollingMean(period)
+        self.prev_close = None
+
+    def update(self, bar):
+        close = _field(bar, 'close')
+        delta = NAN if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-delta if delta < 0 else 0.0)
+        if math.isnan(gain) or math.isnan(loss) or loss == 0:
+            return NAN
+        return 100 - (100 / (1 + gain / loss))
+
+
+class StreamingMACD:
+    """Incremental strategies.macd_strategy.calculate_macd, returning (macd, signal_line)."""
+
+    def __init__(self, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+        self.fast = ExponentialMean(fast)
+        self.slow = ExponentialMean(slow)
+        self.signal = ExponentialMean(signal)
+
+    def update(self, bar):
+        close = _field(bar, 'close')
+        macd = self.fast.update(close) - self.slow.update(close)
+        return macd, self.signal.update(macd)
+
+
+class StreamingBollingerBands:
+    """Incremental strategies.bollinger_bands.calculate_bollinger_bands, returning (middle, upper, lower)."""
+
+    def __init__(self, window=BOLLINGER_WINDOW, num_std=BOLLINGER_NUM_STD):
+        self.num_std = num_std
+        self.mean = RollingMean(window)
+        self.std = RollingStd(window)
+
+    def update(self, bar):
+        close = _field(bar, 'close')
+        middle = self.mean.update(close)
+        std = self.std.update(close)
+        return middle, middle + (std * self.num_std), middle - (std * self.num_std)
+
+
+class StreamingStochasticOscillator:
+    """Incremental strategies.stochastic_oscillator_strategy.calculate_stochastic_oscillator, returning (%K, %D)."""
+
+    def __init__(self, k_period=STOCHASTIC_K_PERIOD, d_period=STOCHASTIC_D_PERIOD):
+        self.low_min = RollingExtreme(k_period, min_periods=1, is_max=False)
+        self.high_max = RollingExtreme(k_period, min_periods=1, is_max=True)
+        self.d_line = RollingMean(d_period, min_periods=1)
+
+    def update(self, bar):
+        low_min = self.low_min.update(_field(bar, 'low'))
+        high_max = self.high_max.update(_field(bar, 'high'))
+        close = _field(bar, 'close')
+
+        try:
+            k_line = 100 * (close - low_min) / (high_max - low_min)
+        except ZeroDivisionError:
+            k_line = NAN if close == low_min else math.copysign(math.inf, close - low_min)
+        if not math.isnan(k_line):
+            k_line = min(max(k_line, 0.0), 100.0)
+
+        return k_line, self.d_line.update(k_line)
+
+
+class StreamingIchimokuCloud:
+    """
+    Incremental strategies.ichimoku_cloud_strategy.calculate_ichimoku_cloud.
+
+    Returns a dict with the conversion line, base line and both leading spans of
+    the latest bar. The lagging span needs future closes, so it is not produced:
+    the latest close is the lagging span of the bar lagging_span_period bars back.
+    """
+
+    def __init__(self, conversion_line_period=CONVERSION_LINE_PERIOD, base_line_period=BASE_LINE_PERIOD,
+                 leading_span_b_period=LEADING_SPAN_B_PERIOD):
+        self.extremes = {
+            period: (RollingExtreme(period, is_max=True), RollingExtreme(period, is_max=False))
+            for period in {conversion_line_period, base_line_period, leading_span_b_period}
+        }
+        self.conversion_line_period = conversion_line_period
+        self.base_line_period = base_line_period
+        self.leading_span_b_period = leading_span_b_period
+        # Unshifted spans waiting base_line_period bars to be displaced forward
+        self.pending = deque([(NAN, NAN)] * base_line_period, maxlen=base_line_period + 1)
+
+    def update(self, bar):
+        high = _field(bar, 'high')
+        low = _field(bar, 'low')
+        midpoints = {}
+        for period, (period_high, period_low) in self.extremes.items():
+            midpoints[period] = (period_high.update(high) + period_low.update(low)) / 2
+
+        conversion_line = midpoints[self.conversion_line_period]
+        base_line = midpoints[self.base_line_period]
+        self.pending.append(((conversion_line + base_line) / 2, midpoints[self.leading_span_b_period]))
+        leading_span_a, leading_span_b = self.pending.popleft()
+
+        return {
+            'conversion_line': conversion_line,
+            'base_line': base_line,
+            'leading_span_a': leading_span_a,
+            'leading_span_b': leading_span_b,
+        }
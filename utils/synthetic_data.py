@@ -0,0 +1,186 @@
+# utils/synthetic_data.py
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+# Bars are produced in fixed internal blocks so the output does not depend on chunk_size
+_BLOCK_SIZE = 65536
+_TRADING_DAYS = 252
+
+DEFAULT_REGIMES = {
+    'mu': (0.10, -0.15),       # Annual drift in the calm and turbulent regimes
+    'sigma': (0.15, 0.45),     # Annual volatility in the calm and turbulent regimes
+    'switch_prob': (0.01, 0.05),  # Per-bar probability of leaving each regime
+}
+
+
+def periods_per_year(freq):
+    """Number of bars per year for a pandas frequency, counting 252 trading days."""
+    offset = to_offset(freq)
+    try:
+        bar = pd.Timedelta(offset)
+    except (TypeError, ValueError):
+        return _TRADING_DAYS  # Calendar offsets such as business days
+    return _TRADING_DAYS * (pd.Timedelta('1D') / bar)
+
+
+class _SymbolStream:
+    """Independent random streams and carried state for one symbol."""
+
+    def __init__(self, seed_sequence, s0, mu, sigma, regimes, dt):
+        returns, wicks, volume, regime = (np.random.default_rng(child) for child in seed_sequence.spawn(4))
+        self.returns_rng = returns
+        self.wicks_rng = wicks
+        self.volume_rng = volume
+        self.regime_rng = regime
+        self.log_close = np.log(s0)
+        self.mu = mu
+        self.sigma = sigma
+        self.regimes = regimes
+        self.dt = dt
+        self.regime = 0
+        self.remaining = None
+
+    def _regime_path(self, n):
+        path = np.empty(n, dtype=np.int8)
+        filled = 0
+        while filled < n:
+            if self.remaining is None or self.remaining == 0:
+                if self.remaining == 0:
+                    self.regime = 1 - self.regime
+                self.remaining = int(self.regime_rng.geometric(self.regimes['switch_prob'][self.regime]))
+            take = min(self.remaining, n - filled)
+            path[filled:filled + take] = self.regime
+            filled += take
+            self.remaining -= take
+        return path
+
+    def block(self, n):
+        if self.regimes is None:
+            mu = np.full(n, self.mu)
+            sigma = np.full(n, self.sigma)
+        else:
+            path = self._regime_path(n)
+            mu = np.asarray(self.regimes['mu'], dtype=float)[path]
+            sigma = np.asarray(self.regimes['sigma'], dtype=float)[path]
+
+        step_sigma = sigma * np.sqrt(self.dt)
+        shocks = self.returns_rng.standard_normal(n)
+        log_returns = (mu - 0.5 * sigma ** 2) * self.dt + step_sigma * shocks
+
+        log_close = self.log_close + np.cumsum(log_returns)
+        previous = np.concatenate(([self.log_close], log_close[:-1]))
+        self.log_close = log_close[-1]
+
+        # Opens gap slightly away from the previous close; wicks extend past the body
+        noise = self.wicks_rng.standard_normal((3, n))
+        close = np.exp(log_close)
+        open_ = np.exp(previous + 0.1 * step_sigma * noise[0])
+        high = np.maximum(open_, close) * np.exp(0.5 * step_sigma * np.abs(noise[1]))
+        low = np.minimum(open_, close) * np.exp(-0.5 * step_sigma * np.abs(noise[2]))
+
+        # Volume rises with the size of the move
+        activity = 1 + np.abs(shocks)
+        volume = np.round(1e6 * activity * self.volume_rng.lognormal(0.0, 0.5, n)).astype(np.int64)
+
+        return open_, high, low, close, volume
+
+
+def iter_ohlcv_chunks(n_bars, start='2000-01-03', freq='B', seed=None, s0=100.0, mu=0.05, sigma=0.2,
+                      model='gbm', regimes=None, chunk_size=1_000_000, lowercase=False, _seed_sequence=None):
+    """
+    Stream synthetic OHLCV bars for one symbol in chunks of at most chunk_size rows.
+
+    The output is fully determined by the seed and does not depend on chunk_size,
+    so arbitrarily long histories can be produced without holding them in memory.
+
+    :param n_bars: Total number of bars
+    :param start: Timestamp of the first bar
+    :param freq: pandas frequency of the bars, e.g. 'B', 'D', 'h' or 'min'
+    :param seed: Seed for the random streams
+    :param s0: Initial price
+    :param mu: Annual drift of the GBM model
+    :param sigma: Annual volatility of the GBM model
+    :param model: 'gbm' or 'regime' for a two-state regime-switching GBM
+    :param regimes: Regime parameters for model='regime', defaults to DEFAULT_REGIMES
+    :param chunk_size: Maximum rows per yielded DataFrame
+    :param lowercase: Use 'open/high/low/close/volume' column names instead of 'Open/High/...'
+    :return: Iterator of DataFrames with Open, High, Low, Close and Volume columns
+    """
+    if model not in ('gbm', 'regime'):
+        raise ValueError(f"Unknown model '{model}'. Expected 'gbm' or 'regime'")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    seed_sequence = _seed_sequence if _seed_sequence is not None else np.random.SeedSequence(seed)
+    if model == 'regime':
+        regimes = regimes or DEFAULT_REGIMES
+    else:
+        regimes = None
+    stream = _SymbolStream(seed_sequence, s0, mu, sigma, regimes, 1.0 / periods_per_year(freq))
+
+    columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+    if lowercase:
+        columns = [column.lower() for column in columns]
+
+    offset = to_offset(freq)
+    next_timestamp = pd.Timestamp(start)
+    buffer = None  # Generated bars not yielded yet
+    produced = 0
+
+    while produced < n_bars:
+        rows = min(chunk_size, n_bars - produced)
+        available = 0 if buffer is None else len(buffer[0])
+        if available < rows:
+            # Top up the buffer with whole internal blocks
+            blocks = [] if buffer is None else [buffer]
+            while available < rows:
+                size = min(_BLOCK_SIZE, n_bars - produced - available)
+                blocks.append(stream.block(size))
+                available += size
+            buffer = blocks[0] if len(blocks) == 1 else \
+                tuple(np.concatenate([block[i] for block in blocks]) for i in range(5))
+
+        index = pd.date_range(start=next_timestamp, periods=rows, freq=offset)
+        next_timestamp = index[-1] + offset
+        yield pd.DataFrame({column: array[:rows] for column, array in zip(columns, buffer)}, index=index)
+
+        buffer = tuple(array[rows:] for array in buffer)
+        produced += rows
+
+
+def generate_ohlcv(n_bars, start='2000-01-03', freq='B', seed=None, **kwargs):
+    """
+    Generate a synthetic OHLCV DataFrame for one symbol.
+
+    Accepts the same keyword arguments as iter_ohlcv_chunks.
+    """
+    chunks = list(iter_ohlcv_chunks(n_bars, start=start, freq=freq, seed=seed, **kwargs))
+    if not chunks:
+        columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+        if kwargs.get('lowercase'):
+            columns = [column.lower() for column in columns]
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([]))
+    return pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+
+
+def iter_universe(symbols, n_bars, seed=None, **kwargs):
+    """
+    Stream (symbol, chunk) pairs for many symbols, one symbol after another.
+
+    Every symbol has its own random streams derived from the seed, so a symbol's
+    history does not change when others are added or removed after it.
+    """
+    children = np.random.SeedSequence(seed).spawn(len(symbols))
+    for symbol, child in zip(symbols, children):
+        for chunk in iter_ohlcv_chunks(n_bars, _seed_sequence=child, **kwargs):
+            yield symbol, chunk
+
+
+def generate_universe(symbols, n_bars, seed=None, **kwargs):
+    """Generate a dict of symbol -> synthetic OHLCV DataFrame."""
+    frames = {}
+    for symbol, chunk in iter_universe(symbols, n_bars, seed=seed, **kwargs):
+        frames.setdefault(symbol, []).append(chunk)
+    return {symbol: pd.concat(chunks) if len(chunks) > 1 else chunks[0] for symbol, chunks in frames.items()}
@@ -0,0 +1,149 @@
+# utils/yahoo_client.py
+
+import random
+import time
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from config import YAHOO_CHART_URL, FETCH_MAX_WORKERS, FETCH_TIMEOUT, FETCH_RETRIES, FETCH_BACKOFF
+from utils.data_fetcher import FetchError
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+# Responses worth retrying: rate limiting and server-side failures
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+
+
+def parse_chart(payload):
+    """
+    Daily OHLCV frame of a Yahoo Finance chart response.
+
+    Bars are stamped with their session date in the exchange's time zone, like yfinance.
+
+    :param payload: Parsed JSON of /v8/finance/chart/<symbol>
+    :return: DataFrame with PRICE_COLUMNS indexed by date, empty if the range has no bars
+    :raises ValueError: If the response reports an error
+    """
+    chart = payload.get('chart') or {}
+    if chart.get('error'):
+        error = chart['error']
+        raise ValueError(error.get('description') or error.get('code') or str(error))
+    result = (chart.get('result') or [None])[0]
+    timestamps = (result or {}).get('timestamp')
+    if not timestamps:
+        return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name='Date'), dtype=float)
+
+    quote_ = result['indicators']['quote'][0]
+    adjusted = result['indicators'].get('adjclose') or [{}]
+    index = pd.to_datetime(np.asarray(timestamps, dtype=np.int64), unit='s', utc=True)
+    tz = result.get('meta', {}).get('exchangeTimezoneName')
+    if tz:
+        index = index.tz_convert(tz)
+    index = index.tz_localize(None).normalize().rename('Date')
+
+    columns = {'Open': quote_.get('open'), 'High': quote_.get('high'), 'Low': quote_.get('low'),
+               'Close': quote_.get('close'), 'Adj Close': adjusted[0].get('adjclose', quote_.get('close')),
+               'Volume': quote_.get('volume')}
+    # Missing values arrive as null; a float array turns them into NaN
+    frame = pd.DataFrame({column: np.array(values, dtype=float) for column, values in columns.items()}, index=index)
+    # Yahoo pads the range with empty bars and may repeat the live bar
+    frame = frame.dropna(subset=['Open', 'High', 'Low', 'Close'], how='all')
+    return frame[~frame.index.duplicated(keep='last')]
+
+
+def _error_description(response):
+    try:
+        error = response.json()['chart']['error']
+        description = error.get('description') or error.get('code')
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return ''
+    return f": {description}" if description else ''
+
+
+class YahooClient:
+    """
+    Yahoo Finance chart API client over one pooled HTTP session, an optional source
+    for fetch_data and fetch_many in place of yfinance.
+
+    Safe to share between threads: requests reuse up to max_connections keep-alive
+    connections, so a thread pool of that size pays the TCP and TLS handshakes once.
+    Timeouts, connection errors, 429 and 5xx responses are retried with exponential
+    backoff and jitter (or after the server's Retry-After); other errors fail at once.
+    """
+
+    def __init__(self, base_url=YAHOO_CHART_URL, timeout=FETCH_TIMEOUT, retries=FETCH_RETRIES,
+                 backoff=FETCH_BACKOFF, max_connections=FETCH_MAX_WORKERS, session=None):
+        """
+        :param base_url: Chart endpoint; the symbol is appended to it
+        :param timeout: Seconds to connect and to wait for each read
+        :param retries: Retries after a retryable failure
+        :param backoff: Seconds before the first retry, doubled for each later one
+        :param max_connections: Connections kept open per host
+        :param session: Optional requests.Session to use instead of a new one
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = USER_AGENT
+
+    def _delay(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.backoff * 2 ** self.retries)
+            except ValueError:
+                pass
+        return self.backoff * 2 ** attempt * random.uniform(0.5, 1.0)
+
+    def get_json(self, symbol, params):
+        """
+        GET the chart of symbol, retrying retryable failures.
+
+        :raises FetchError: After the last retry, or at once for other HTTP errors
+        """
+        url = self.base_url + quote(symbol, safe='')
+        for attempt in range(self.retries + 1):
+            response = None
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if response.ok:
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+                if response.status_code not in RETRY_STATUSES:
+                    raise FetchError(symbol, error + _error_description(response))
+            if attempt == self.retries:
+                raise FetchError(symbol, f"{error} (gave up after {attempt + 1} attempts)")
+            time.sleep(self._delay(attempt, response))
+
+    def download(self, symbol, start_date, end_date):
+        """
+        Daily OHLCV history of symbol over [start_date, end_date).
+
+        :return: DataFrame with PRICE_COLUMNS indexed by date
+        :raises FetchError: If the download fails or the response reports an error
+        """
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date)
+        params = {'period1': int(start.timestamp()), 'period2': int(end.timestamp()), 'interval': '1d',
+                  'events': 'div,splits', 'includeAdjustedClose': 'true'}
+        try:
+            frame = parse_chart(self.get_json(symbol, params))
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise FetchError(symbol, f"unexpected response: {e}") from e
+        return frame[(frame.index >= start.tz_localize(None)) & (frame.index < end.tz_localize(None))]
+
+    def close(self):
+        self.session.close()